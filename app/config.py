@@ -21,6 +21,71 @@ class Settings(BaseSettings):
     hf_tokenizer_name: str = Field("disabled", env="HF_TOKENIZER_NAME")
     hf_device: int = Field(-1, env="HF_DEVICE")  # -1 CPU, >=0 GPU id
     hf_score_threshold: float = Field(0.6, env="HF_SCORE_THRESHOLD")
+    hf_batch_max_size: int = Field(16, env="HF_BATCH_MAX_SIZE")  # rows per forward pass
+    hf_batch_max_wait_ms: float = Field(5.0, env="HF_BATCH_MAX_WAIT_MS")  # micro-batch window
+    hf_microbatch_enabled: bool = Field(True, env="HF_MICROBATCH_ENABLED")
+
+    # Detector signal cache keyed by normalized-text hash (TTLs in seconds)
+    detector_cache_enabled: bool = Field(True, env="DETECTOR_CACHE_ENABLED")
+    detector_cache_max_entries: int = Field(50000, env="DETECTOR_CACHE_MAX_ENTRIES")
+    detector_cache_path: str = Field("", env="DETECTOR_CACHE_PATH")  # optional SQLite tier
+    detector_cache_ttl_ai: float = Field(7 * 24 * 3600, env="DETECTOR_CACHE_TTL_AI")
+    detector_cache_ttl_family: float = Field(7 * 24 * 3600, env="DETECTOR_CACHE_TTL_FAMILY")
+    detector_cache_ttl_ollama: float = Field(24 * 3600, env="DETECTOR_CACHE_TTL_OLLAMA")
+
+    # MATTR feature: "legacy" (half-window steps, comparable with stored scores) or "exact" (step 1)
+    detector_mattr_mode: str = Field("legacy", env="DETECTOR_MATTR_MODE")
+    # Overall budget for one detect(); HF/Ollama results arriving later are dropped (0 = wait for all)
+    detector_deadline_ms: float = Field(30000, env="DETECTOR_DEADLINE_MS")
+    detector_signal_workers: int = Field(4, env="DETECTOR_SIGNAL_WORKERS")
+
+    # Behavioural lexicon: JSON {category: [terms] | {group: [terms]}} merged over the built-ins
+    lexicon_path: str = Field("", env="LEXICON_PATH")
+    lexicon_reload_seconds: float = Field(5.0, env="LEXICON_RELOAD_SECONDS")  # mtime poll interval
+    lexicon_max_positions: int = Field(100, env="LEXICON_MAX_POSITIONS")  # match offsets kept per text
+
+    # SQLite connection pool (WAL mode, one connection per worker thread)
+    sqlite_synchronous: str = Field("NORMAL", env="SQLITE_SYNCHRONOUS")
+    sqlite_cache_size_kib: int = Field(16384, env="SQLITE_CACHE_SIZE_KIB")
+    sqlite_mmap_size: int = Field(268435456, env="SQLITE_MMAP_SIZE")  # bytes
+    sqlite_busy_timeout_ms: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    # Write-behind persistence for intakes (single and batch): group commits off the request path
+    write_behind_enabled: bool = Field(False, env="WRITE_BEHIND_ENABLED")
+    write_behind_batch_rows: int = Field(256, env="WRITE_BEHIND_BATCH_ROWS")
+    write_behind_flush_ms: float = Field(20.0, env="WRITE_BEHIND_FLUSH_MS")
+    write_behind_max_pending: int = Field(10000, env="WRITE_BEHIND_MAX_PENDING")
+    # Retries of a failing batch before it is split and its poison rows dead-lettered
+    write_behind_max_retries: int = Field(3, env="WRITE_BEHIND_MAX_RETRIES")
+
+    # Near-duplicate detection (MinHash/LSH over word shingles); num_perm must divide by bands
+    near_duplicate_enabled: bool = Field(True, env="NEAR_DUPLICATE_ENABLED")
+    near_duplicate_num_perm: int = Field(64, env="NEAR_DUPLICATE_NUM_PERM")
+    near_duplicate_bands: int = Field(16, env="NEAR_DUPLICATE_BANDS")
+    near_duplicate_shingle_size: int = Field(3, env="NEAR_DUPLICATE_SHINGLE_SIZE")
+    near_duplicate_threshold: float = Field(0.7, env="NEAR_DUPLICATE_THRESHOLD")  # min estimated Jaccard
+
+    # Batch intake: posts analysed and committed together per chunk
+    batch_intake_chunk_size: int = Field(256, env="BATCH_INTAKE_CHUNK_SIZE")
+    # Larger batch requests are rejected with 413 before any item is analysed
+    batch_intake_max_items: int = Field(10000, env="BATCH_INTAKE_MAX_ITEMS")
+    batch_intake_max_bytes: int = Field(64 * 1024 * 1024, env="BATCH_INTAKE_MAX_BYTES")
+
+    # Background graph summary refresh for readers passing max_staleness (seconds)
+    graph_summary_refresh_seconds: float = Field(1.0, env="GRAPH_SUMMARY_REFRESH_SECONDS")
+    # Graph persistence: mutation log + snapshots under this directory (empty disables)
+    graph_store_path: str = Field("", env="GRAPH_STORE_PATH")
+    graph_snapshot_every: int = Field(200000, env="GRAPH_SNAPSHOT_EVERY")  # log records
+    # Graph retention window (0 disables each bound)
+    graph_retention_days: float = Field(0.0, env="GRAPH_RETENTION_DAYS")
+    graph_retention_max_content: int = Field(0, env="GRAPH_RETENTION_MAX_CONTENT")
+    graph_retention_sweep_seconds: float = Field(60.0, env="GRAPH_RETENTION_SWEEP_SECONDS")
+    # Copy-pasta links: content whose 64-bit SimHashes differ in at most max_distance bits
+    # (multi-index over `blocks` blocks; requires max_distance < blocks)
+    graph_simhash_enabled: bool = Field(True, env="GRAPH_SIMHASH_ENABLED")
+    graph_simhash_max_distance: int = Field(5, env="GRAPH_SIMHASH_MAX_DISTANCE")
+    graph_simhash_blocks: int = Field(6, env="GRAPH_SIMHASH_BLOCKS")
+    graph_simhash_min_tokens: int = Field(8, env="GRAPH_SIMHASH_MIN_TOKENS")
+    graph_near_duplicate_links: int = Field(5, env="GRAPH_NEAR_DUPLICATE_LINKS")  # per new post
     
     # Ollama Configuration (for semantic risk analysis)
     ollama_model: str = Field("llama3.2:3b", env="OLLAMA_MODEL")  # Lightweight and efficient
@@ -29,9 +94,25 @@ class Settings(BaseSettings):
     ollama_timeout: int = Field(30, env="OLLAMA_TIMEOUT")
     ollama_prompt_chars: int = Field(2000, env="OLLAMA_PROMPT_CHARS")
     ollama_timeout_ceiling: int = Field(90, env="OLLAMA_TIMEOUT_CEILING")
+    # Async client: requests in flight at once, and pause after a connection failure
+    ollama_max_concurrency: int = Field(4, env="OLLAMA_MAX_CONCURRENCY")
+    ollama_retry_seconds: float = Field(30.0, env="OLLAMA_RETRY_SECONDS")
     
     # Federated Blockchain Configuration
     federated_encryption_key: str = Field("LULSnIHlBjTSfWDfqVl0kTV9qXUFN0EpGbynAB_34TM=", env="BLOCK_ENCRYPTION_KEY")
+    # Block signature verification pool for audits and sync (0 workers = one per core);
+    # runs of fewer than min_parallel blocks are verified inline
+    federated_verify_workers: int = Field(0, env="FEDERATED_VERIFY_WORKERS")
+    federated_verify_chunk: int = Field(512, env="FEDERATED_VERIFY_CHUNK")
+    federated_verify_min_parallel: int = Field(4096, env="FEDERATED_VERIFY_MIN_PARALLEL")
+    # Delta sync: hash probes per fork-search round, blocks per suffix page, peer request timeout
+    federated_sync_fanout: int = Field(16, env="FEDERATED_SYNC_FANOUT")
+    federated_sync_batch: int = Field(1000, env="FEDERATED_SYNC_BATCH")
+    federated_peer_timeout: float = Field(3.0, env="FEDERATED_PEER_TIMEOUT")
+    # Block outbox: retry sweep interval, first retry delay (doubling per failure) and its cap, in seconds
+    federated_outbox_interval: float = Field(2.0, env="FEDERATED_OUTBOX_INTERVAL")
+    federated_outbox_backoff: float = Field(1.0, env="FEDERATED_OUTBOX_BACKOFF")
+    federated_outbox_max_backoff: float = Field(300.0, env="FEDERATED_OUTBOX_MAX_BACKOFF")
     federated_nodes: str = Field("http://localhost:8000,http://localhost:8001,http://localhost:8002,http://localhost:8003,http://localhost:8004", env="FEDERATED_NODES")
     
     # Sightengine Image Detection API
@@ -5,12 +5,12 @@ import json
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives.asymmetric.ed25519 import (
     Ed25519PrivateKey,
-    Ed25519PublicKey,
 )
 from cryptography.hazmat.primitives import serialization
 import hashlib
 
 from ..config import get_settings
+from .verify import verify_payload
 
 settings = get_settings()
 fernet = Fernet(settings.federated_encryption_key.encode())
@@ -44,9 +44,5 @@ def sign_payload(payload: str) -> str:
 
 
 def verify_signature(pubkey_hex: str, payload: str, sig_hex: str) -> bool:
-    try:
-        pub = Ed25519PublicKey.from_public_bytes(bytes.fromhex(pubkey_hex))
-        pub.verify(bytes.fromhex(sig_hex), payload.encode())
-        return True
-    except Exception:
-        return False
+    # Parsed public keys are cached per hex string
+    return verify_payload(pubkey_hex, payload.encode(), sig_hex)
@@ -1,32 +1,67 @@
 """
 Manages the blockchain state and validation logic.
 """
-import sqlite3
+import logging
+import threading
+import time
 from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..config import get_settings
+from ..storage.sqlite_pool import get_pool
 from .crypto import sha256, verify_signature
 from .ledger import Block
+from .verify import get_verifier
+
+logger = logging.getLogger(__name__)
+
+# Blocks read per query while validating or auditing (several verifier chunks)
+VALIDATE_BATCH = 8192
+
+
+@dataclass
+class ChainValidation:
+    valid: bool
+    # Verified-height checkpoint after the run (-1: nothing verified yet)
+    height: int
+    tip_hash: str
+    # Blocks hashed and signature-checked by this run
+    checked: int
+    first_invalid: Optional[int] = None
+
+
+def _block(row: Tuple) -> Block:
+    return Block(
+        index=row[0],
+        timestamp=row[1],
+        data_encrypted=row[2],
+        previous_hash=row[3],
+        hash=row[4],
+        signature=row[5],
+        public_key=row[6],
+    )
 
 
 class LedgerManager:
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None):
         settings = get_settings()
-        # For blockchain nodes, always store the ledger in ./data/federated_ledger.db
-        self.ledger_db_path = "data/federated_ledger.db"
+        # For blockchain nodes, store the ledger in ./data/federated_ledger.db unless told otherwise
+        self.ledger_db_path = db_path or "data/federated_ledger.db"
+        self._pool = get_pool(self.ledger_db_path)
+        self._audit_lock = threading.Lock()
+        self._audit_thread: Optional[threading.Thread] = None
+        self._audit_status: Dict[str, Any] = {"running": False}
         self._initialise()
 
     @contextmanager
     def _cursor(self):
-        conn = sqlite3.connect(self.ledger_db_path)
-        try:
-            cur = conn.cursor()
+        with self._pool.cursor() as cur:
             yield cur
-            conn.commit()
-        finally:
-            conn.close()
+
+    def unit_of_work(self):
+        return self._pool.unit_of_work()
 
     def _initialise(self):
         with self._cursor() as cur:
@@ -43,6 +78,18 @@ class LedgerManager:
                 )
             """
             )
+            # Highest block verified from genesis, and its hash; blocks at or below
+            # it are only re-checked by a full audit
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ledger_checkpoint (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    height INTEGER NOT NULL,
+                    tip_hash TEXT NOT NULL,
+                    verified_at REAL NOT NULL
+                )
+            """
+            )
             cur.execute("SELECT idx FROM blocks WHERE idx=0")
             if cur.fetchone() is None:
                 genesis = Block(
@@ -58,63 +105,266 @@ class LedgerManager:
                 self.save_block(genesis)
 
     def get_chain(self) -> List[Block]:
+        """Every block in order. Loads the whole chain; prefer the indexed accessors below."""
+        return list(self.iter_blocks())
+
+    def get_block(self, index: int) -> Optional[Block]:
         with self._cursor() as cur:
-            rows = cur.execute("SELECT * FROM blocks ORDER BY idx").fetchall()
-            return [
-                Block(
-                    index=r[0],
-                    timestamp=r[1],
-                    data_encrypted=r[2],
-                    previous_hash=r[3],
-                    hash=r[4],
-                    signature=r[5],
-                    public_key=r[6],
-                )
-                for r in rows
-            ]
+            row = cur.execute("SELECT * FROM blocks WHERE idx=?", (index,)).fetchone()
+        return _block(row) if row is not None else None
+
+    def get_tip(self) -> Block:
+        """Highest-index block (the genesis block on a fresh ledger)."""
+        with self._cursor() as cur:
+            row = cur.execute("SELECT * FROM blocks ORDER BY idx DESC LIMIT 1").fetchone()
+        return _block(row)
+
+    def get_range(self, start: int, limit: int) -> List[Block]:
+        """Up to ``limit`` blocks with ``idx >= start``, in order."""
+        return list(self.iter_blocks(start, limit))
+
+    def iter_blocks(self, start: int = 0, limit: Optional[int] = None) -> Iterator[Block]:
+        """Blocks with ``idx >= start`` in order, read lazily in keyset-paginated batches."""
+        remaining = limit
+        for batch in self._iter_batches(start):
+            if remaining is not None:
+                batch = batch[:remaining]
+                remaining -= len(batch)
+            yield from batch
+            if remaining is not None and remaining <= 0:
+                return
+
+    def chain_length(self) -> int:
+        with self._cursor() as cur:
+            row = cur.execute("SELECT MAX(idx) FROM blocks").fetchone()
+        return 0 if row[0] is None else row[0] + 1
 
     def get_latest_block(self) -> Block:
-        return self.get_chain()[-1]
+        return self.get_tip()
 
     def save_block(self, block: Block):
+        self.save_blocks([block])
+
+    def save_blocks(self, blocks: Iterable[Block]) -> None:
+        """Insert blocks with one executemany on one connection."""
         with self._cursor() as cur:
-            cur.execute(
+            cur.executemany(
                 """
                 INSERT INTO blocks (idx, ts, data_encrypted, previous_hash, hash, signature, public_key)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-                (
-                    block.index,
-                    block.timestamp,
-                    block.data_encrypted,
-                    block.previous_hash,
-                    block.hash,
-                    block.signature,
-                    block.public_key,
-                ),
+                [
+                    (
+                        block.index,
+                        block.timestamp,
+                        block.data_encrypted,
+                        block.previous_hash,
+                        block.hash,
+                        block.signature,
+                        block.public_key,
+                    )
+                    for block in blocks
+                ],
             )
 
-    def validate_chain(self, chain: List[Block]) -> bool:
-        for i in range(1, len(chain)):
-            current = chain[i]
-            previous = chain[i - 1]
+    def replace_chain(self, chain: List[Block], verified: bool = False) -> None:
+        """
+        Swap the stored chain for ``chain`` in a single transaction.
 
-            if current.previous_hash != previous.hash:
-                return False
-            if current.hash != sha256(current.payload()):
+        The checkpoint is dropped, or moved to the new tip when the caller has
+        just validated ``chain`` in full (``verified=True``).
+        """
+        with self.unit_of_work():
+            with self._cursor() as cur:
+                cur.execute("DELETE FROM blocks")
+                cur.execute("DELETE FROM ledger_checkpoint")
+            self.save_blocks(chain)
+            if verified and chain:
+                self._set_checkpoint(chain[-1].index, chain[-1].hash)
+
+    def replace_suffix(self, fork: int, blocks: List[Block], verified: bool = False) -> None:
+        """
+        Replace every block above ``fork`` with ``blocks`` in a single transaction.
+
+        A checkpoint above the fork is pulled back to it. When the checkpoint
+        then sits at the fork and ``blocks`` were validated against it
+        (``verified=True``), it moves to the new tip.
+        """
+        with self.unit_of_work():
+            with self._cursor() as cur:
+                cur.execute("DELETE FROM blocks WHERE idx > ?", (fork,))
+            self.save_blocks(blocks)
+            height, _ = self.checkpoint()
+            if height > fork:
+                self._set_checkpoint(fork, self.get_block(fork).hash)
+                height = fork
+            if verified and blocks and height == fork:
+                self._set_checkpoint(blocks[-1].index, blocks[-1].hash)
+
+    def hashes_at(self, indexes: Iterable[int]) -> Dict[int, str]:
+        """Block hash per requested index; indexes past the tip are left out."""
+        wanted = sorted(set(indexes))
+        if not wanted:
+            return {}
+        with self._cursor() as cur:
+            rows = cur.execute(
+                f"SELECT idx, hash FROM blocks WHERE idx IN ({','.join('?' * len(wanted))})", wanted
+            ).fetchall()
+        return dict(rows)
+
+    def validate_chain(self, chain: List[Block], start: int = 1) -> bool:
+        """
+        Check links, hashes and signatures of ``chain[start:]`` (blocks before ``start`` are trusted).
+
+        Links are checked here; hashes and signatures go to the shared
+        BlockVerifier, which spreads long chains over its process pool.
+        """
+        start = max(1, start)
+        for i in range(start, len(chain)):
+            if chain[i].previous_hash != chain[i - 1].hash:
                 return False
-            if not verify_signature(current.public_key, current.payload(), current.signature):
+        return get_verifier().first_invalid(chain[start:]) is None
+
+    def verified_prefix(self, chain: List[Block]) -> int:
+        """How many leading blocks of ``chain`` equal locally verified blocks (at or below the checkpoint)."""
+        height, _ = self.checkpoint()
+        count = 0
+        for local, block in zip(self.iter_blocks(), chain[: height + 1]):
+            if local != block:
+                break
+            count += 1
+        return count
+
+    def checkpoint(self) -> Tuple[int, str]:
+        """Verified height and tip hash; (-1, "") before the first validation."""
+        with self._cursor() as cur:
+            row = cur.execute("SELECT height, tip_hash FROM ledger_checkpoint WHERE id=0").fetchone()
+        return (row[0], row[1]) if row else (-1, "")
+
+    def validate_incremental(self) -> ChainValidation:
+        """
+        Validate the stored chain by re-checking only the blocks above the checkpoint.
+
+        The checkpoint block must still carry the recorded hash; every later
+        block is checked against its predecessor (index, link, hash, signature)
+        and the checkpoint advances to the last valid block. Cost depends on
+        the blocks added since the last run, not on chain length.
+        """
+        height, tip_hash = self.checkpoint()
+        previous = None
+        if height >= 0:
+            previous = self.get_block(height)
+            if previous is None or previous.hash != tip_hash:
+                return ChainValidation(False, height, tip_hash, 0, first_invalid=height)
+        return self._verify_from(previous, height + 1)
+
+    def audit_chain(self) -> ChainValidation:
+        """
+        Re-verify every block from genesis, in batches, ignoring the checkpoint.
+
+        On success the checkpoint moves to the tip; on failure it is pulled back
+        below the first invalid block so incremental validation fails too.
+        """
+        result = self._verify_from(None, 0)
+        if not result.valid and result.height < 0:
+            # Genesis itself is invalid: nothing is verified
+            with self._cursor() as cur:
+                cur.execute("DELETE FROM ledger_checkpoint")
+        return result
+
+    def start_audit(self) -> bool:
+        """Run ``audit_chain`` on a background thread; False if one is already running."""
+        with self._audit_lock:
+            if self._audit_thread is not None and self._audit_thread.is_alive():
                 return False
-        return True
+            self._audit_status = {"running": True, "started_at": time.time()}
+            self._audit_thread = threading.Thread(target=self._run_audit, name="ledger-audit", daemon=True)
+            self._audit_thread.start()
+            return True
+
+    def audit_status(self) -> Dict[str, Any]:
+        with self._audit_lock:
+            return dict(self._audit_status)
+
+    def _run_audit(self) -> None:
+        started = time.perf_counter()
+        try:
+            result: Dict[str, Any] = asdict(self.audit_chain())
+        except Exception as exc:
+            logger.warning(f"Ledger audit failed: {exc}")
+            result = {"error": str(exc)}
+        result.update(running=False, finished_at=time.time(), duration_s=time.perf_counter() - started)
+        with self._audit_lock:
+            self._audit_status.update(result)
+
+    def _verify_from(self, previous: Optional[Block], start: int) -> ChainValidation:
+        """Check blocks from index ``start`` on, advancing the checkpoint as far as they are valid."""
+        verifier = get_verifier()
+        checked = 0
+        first_invalid: Optional[int] = None
+        last = previous
+        for batch in self._iter_batches(start):
+            # Links and indexes in order here; hashes and signatures in bulk
+            signed_from = 0
+            linked = len(batch)
+            for position, block in enumerate(batch):
+                if last is None and position == 0:
+                    # Genesis carries no signature; its hash must still match its payload
+                    if block.index != 0 or block.hash != sha256(block.payload()):
+                        linked = 0
+                        break
+                    signed_from = 1
+                    continue
+                before = batch[position - 1] if position else last
+                if block.index != before.index + 1 or block.previous_hash != before.hash:
+                    linked = position
+                    break
+            bad = verifier.first_invalid(batch[signed_from:linked])
+            valid_until = linked if bad is None else signed_from + bad
+            checked += min(valid_until + 1, len(batch))
+            if valid_until:
+                last = batch[valid_until - 1]
+            if valid_until < len(batch):
+                first_invalid = batch[valid_until].index
+                break
+        if last is not None and last is not previous:
+            self._set_checkpoint(last.index, last.hash)
+        height, tip_hash = (last.index, last.hash) if last is not None else (-1, "")
+        return ChainValidation(first_invalid is None, height, tip_hash, checked, first_invalid)
+
+    def _iter_batches(self, start: int) -> Iterator[List[Block]]:
+        """Blocks with ``idx >= start`` in order, as keyset-paginated batches."""
+        after = start - 1
+        while True:
+            with self._cursor() as cur:
+                rows = cur.execute(
+                    "SELECT * FROM blocks WHERE idx > ? ORDER BY idx LIMIT ?", (after, VALIDATE_BATCH)
+                ).fetchall()
+            if not rows:
+                return
+            yield [_block(r) for r in rows]
+            after = rows[-1][0]
+
+    def _set_checkpoint(self, height: int, tip_hash: str) -> None:
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ledger_checkpoint (id, height, tip_hash, verified_at) VALUES (0, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    height=excluded.height, tip_hash=excluded.tip_hash, verified_at=excluded.verified_at
+                """,
+                (height, tip_hash, time.time()),
+            )
 
     def validate_block(self, block: Block, previous_block: Block) -> bool:
         if block.index != previous_block.index + 1:
             return False
         if block.previous_hash != previous_block.hash:
             return False
-        if block.hash != sha256(block.payload()):
+        payload = block.payload()
+        if block.hash != sha256(payload):
             return False
-        if not verify_signature(block.public_key, block.payload(), block.signature):
+        if not verify_signature(block.public_key, payload, block.signature):
             return False
         return True
 
@@ -128,6 +378,7 @@ class LedgerManager:
         """Delete all blocks and reinitialize with genesis block only."""
         with self._cursor() as cur:
             cur.execute("DELETE FROM blocks")
+            cur.execute("DELETE FROM ledger_checkpoint")
             # Recreate genesis block
             genesis = Block(
                 index=0,
@@ -1,26 +1,39 @@
 """
 Federated Node for P2P communication and chain synchronization.
 """
-import requests
-from typing import Set
-from dataclasses import asdict
+from typing import Callable, Iterable, Optional, Set
+
+import httpx
 
 from ..config import get_settings
 from .ledger import Block
+from .peers import PeerClient
 
 
 class Node:
-    def __init__(self):
+    def __init__(
+        self,
+        nodes: Optional[Iterable[str]] = None,
+        my_url: Optional[str] = None,
+        db_path: Optional[str] = None,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ):
         settings = get_settings()
-        self.nodes: Set[str] = {u.strip().rstrip("/") for u in settings.federated_nodes.split(",") if u.strip()}
-        self.my_url = settings.node_url.rstrip("/")
+        urls = settings.federated_nodes.split(",") if nodes is None else nodes
+        self.nodes: Set[str] = {u.strip().rstrip("/") for u in urls if u.strip()}
+        self.my_url = (my_url or settings.node_url).rstrip("/")
+        # Peer calls and the block outbox; the outbox lives next to the ledger by default
+        self.client = PeerClient(self.peers, db_path or "data/federated_ledger.db", client_factory=client_factory)
+
+    @property
+    def peers(self) -> Set[str]:
+        return {url for url in self.nodes if url != self.my_url}
+
+    def broadcast_block(self, block: Block) -> int:
+        """
+        Queue a new block for every other node and deliver it in the background.
 
-    def broadcast_block(self, block: Block):
-        """Broadcasts a new block to all other nodes in the network."""
-        for node_url in self.nodes:
-            if node_url != self.my_url:
-                try:
-                    requests.post(f"{node_url}/api/v1/federated/receive_block", json=asdict(block), timeout=2)
-                except requests.RequestException:
-                    # Log or handle failed broadcast to a node
-                    pass
+        Must run on the event loop. Returns the number of peers it was queued for;
+        failed deliveries are retried from the persistent outbox.
+        """
+        return self.client.broadcast(block)
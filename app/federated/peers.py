@@ -0,0 +1,320 @@
+"""
+Async peer client for federated nodes.
+
+One pooled ``httpx.AsyncClient`` carries every call to peers. Reads such as
+validation polls and tip probes fan out to all peers at once, so a slow or
+dead peer costs one timeout in total rather than one per peer. Block
+broadcasts go through a persistent per-peer outbox: ``broadcast`` records one
+row per peer and returns, and delivery runs in the background. A peer's
+blocks are delivered in index order. After a failure, that peer's queue waits
+with exponential backoff and is retried, surviving restarts.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
+
+import httpx
+
+from ..config import get_settings
+from ..storage.sqlite_pool import get_pool
+from .ledger import Block
+
+logger = logging.getLogger(__name__)
+
+API = "/api/v1/federated"
+
+
+class PeerClient:
+    """
+    Calls to the peers of one node, plus the outbox of blocks they have not yet accepted.
+
+    The HTTP client is created lazily on the running loop by ``client_factory``
+    and recreated if the loop changes, like ``AsyncOllamaClient``. Outbox rows
+    live in ``db_path``, normally the ledger file.
+
+    Delivery results:
+    - a 2xx response removes the row;
+    - a 4xx response (the peer's chain conflicts) also removes it and counts
+      as rejected, since resending cannot help and the peer needs
+      ``sync_chain``;
+    - a timeout, connection error or 5xx keeps the row and every later block
+      for that peer, due after ``backoff * 2**(attempts - 1)`` seconds, capped
+      at ``max_backoff``.
+    """
+
+    def __init__(
+        self,
+        peers: Iterable[str],
+        db_path: str,
+        timeout: Optional[float] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ) -> None:
+        settings = get_settings()
+        self.peers: List[str] = sorted(peers)
+        self.timeout = float(timeout if timeout is not None else settings.federated_peer_timeout)
+        self.backoff = float(backoff if backoff is not None else settings.federated_outbox_backoff)
+        self.max_backoff = float(max_backoff if max_backoff is not None else settings.federated_outbox_max_backoff)
+        self.client_factory = client_factory or self._default_client
+        self._pool = get_pool(db_path)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._draining: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._retry_task: Optional[asyncio.Task] = None
+        self.health: Dict[str, Dict[str, Any]] = {peer: self._empty_health() for peer in self.peers}
+        self._initialise()
+
+    def _initialise(self) -> None:
+        with self._pool.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS peer_outbox (
+                    peer TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    block TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    last_error TEXT,
+                    PRIMARY KEY (peer, idx)
+                )
+            """
+            )
+
+    # ------------------------------------------------------------------ reads
+
+    def session(self) -> httpx.AsyncClient:
+        """The shared client for the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            # A client left on a previous (closed) loop is dropped with it
+            self._http = self.client_factory()
+            self._loop = loop
+        return self._http
+
+    async def get_json(self, peer: str, path: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        response = await self._request("GET", peer, path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_all(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Union[dict, Exception]]:
+        """``GET path`` on every peer at once: the JSON body, or the exception, per peer."""
+        results = await asyncio.gather(
+            *(self.get_json(peer, path, params) for peer in self.peers), return_exceptions=True
+        )
+        return dict(zip(self.peers, results))
+
+    async def probe(self, local_height: int) -> None:
+        """Refresh each peer's tip height and its lag behind ``local_height``."""
+        for peer, tip in (await self.get_all("/tip")).items():
+            if isinstance(tip, dict) and "height" in tip:
+                self.health[peer]["height"] = tip["height"]
+                self.health[peer]["lag_blocks"] = local_height - tip["height"]
+
+    # ---------------------------------------------------------------- outbox
+
+    def enqueue(self, block: Block) -> int:
+        """Persist ``block`` for delivery to every peer; the number of rows queued."""
+        now = time.time()
+        payload = json.dumps(asdict(block))
+        with self._pool.cursor() as cur:
+            # A peer that is backing off keeps its retry time for the new block too
+            cur.executemany(
+                """
+                INSERT OR IGNORE INTO peer_outbox (peer, idx, block, enqueued_at, next_attempt)
+                VALUES (?, ?, ?, ?, MAX(?, COALESCE((SELECT MAX(next_attempt) FROM peer_outbox WHERE peer=?), 0)))
+            """,
+                [(peer, block.index, payload, now, now, peer) for peer in self.peers],
+            )
+        return len(self.peers)
+
+    def broadcast(self, block: Block) -> int:
+        """Queue ``block`` for every peer and start delivering it in the background."""
+        queued = self.enqueue(block)
+        if queued:
+            task = asyncio.get_running_loop().create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return queued
+
+    async def flush(self) -> Dict[str, int]:
+        """Deliver every due outbox row, all peers at once; blocks delivered per peer."""
+        now = time.time()
+        with self._pool.cursor() as cur:
+            due = [row[0] for row in cur.execute(
+                "SELECT DISTINCT peer FROM peer_outbox WHERE next_attempt <= ?", (now,)
+            ).fetchall()]
+        peers = [peer for peer in due if peer in self.peers and peer not in self._draining]
+        delivered = await asyncio.gather(*(self._drain(peer) for peer in peers))
+        return dict(zip(peers, delivered))
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Retry due outbox rows every ``interval`` seconds on the running loop."""
+        if self._retry_task is None and self.peers:
+            interval = interval if interval is not None else get_settings().federated_outbox_interval
+            self._retry_task = asyncio.get_running_loop().create_task(self._retry_loop(max(0.05, interval)))
+
+    async def aclose(self) -> None:
+        """Stop the retry loop and in-flight deliveries (their rows stay queued) and close the client."""
+        tasks = list(self._tasks)
+        if self._retry_task is not None:
+            tasks.append(self._retry_task)
+            self._retry_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-peer health, delivery counters and outbox backlog."""
+        now = time.time()
+        with self._pool.cursor() as cur:
+            backlog = {
+                row[0]: row[1:]
+                for row in cur.execute(
+                    """
+                    SELECT peer, COUNT(*), MIN(enqueued_at), MIN(next_attempt), MAX(attempts), MIN(idx)
+                    FROM peer_outbox GROUP BY peer
+                """
+                ).fetchall()
+            }
+        report = {}
+        for peer in self.peers:
+            health = dict(self.health[peer])
+            requests = health.pop("requests")
+            latency_total = health.pop("latency_total_ms")
+            pending, oldest, next_attempt, attempts, first_pending = backlog.get(peer, (0, None, None, 0, None))
+            report[peer] = {
+                **health,
+                "requests": requests,
+                "avg_latency_ms": round(latency_total / requests, 2) if requests else None,
+                "pending": pending,
+                "first_pending_index": first_pending,
+                "oldest_pending_s": round(now - oldest, 3) if oldest is not None else None,
+                "retry_in_s": round(max(0.0, next_attempt - now), 3) if next_attempt is not None else None,
+                "attempts": attempts,
+            }
+        return report
+
+    # -------------------------------------------------------------- internals
+
+    async def _drain(self, peer: str) -> int:
+        """Send ``peer``'s queued blocks in index order until one fails."""
+        self._draining.add(peer)
+        delivered = 0
+        try:
+            with self._pool.cursor() as cur:
+                rows = cur.execute(
+                    "SELECT idx, block, attempts FROM peer_outbox WHERE peer=? ORDER BY idx", (peer,)
+                ).fetchall()
+            for index, payload, attempts in rows:
+                try:
+                    response = await self._request("POST", peer, "/receive_block", content=payload)
+                except httpx.HTTPError as exc:
+                    self._defer(peer, index, attempts + 1, f"{type(exc).__name__}: {exc}")
+                    break
+                if response.status_code >= 500:
+                    self._defer(peer, index, attempts + 1, f"HTTP {response.status_code}")
+                    break
+                with self._pool.cursor() as cur:
+                    cur.execute("DELETE FROM peer_outbox WHERE peer=? AND idx=?", (peer, index))
+                if response.is_success:
+                    delivered += 1
+                    self.health[peer]["delivered"] += 1
+                else:
+                    self.health[peer]["rejected"] += 1
+                    logger.warning(f"Peer {peer} rejected block {index}: {response.text[:200]}")
+        finally:
+            self._draining.discard(peer)
+        return delivered
+
+    def _defer(self, peer: str, index: int, attempts: int, error: str) -> None:
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+        with self._pool.cursor() as cur:
+            cur.execute(
+                "UPDATE peer_outbox SET attempts=?, last_error=? WHERE peer=? AND idx=?",
+                (attempts, error, peer, index),
+            )
+            # Later blocks wait with it so the peer still receives them in order
+            cur.execute("UPDATE peer_outbox SET next_attempt=? WHERE peer=?", (time.time() + delay, peer))
+        logger.warning(f"Delivery of block {index} to {peer} failed ({error}); retry in {delay:.1f}s")
+
+    async def _request(self, method: str, peer: str, path: str, **kwargs) -> httpx.Response:
+        """
+        One call to ``peer``, recorded in its health entry. ``timeout`` bounds the
+        whole call (httpx timeouts apply per read), so a peer that trickles bytes
+        still fails on time.
+        """
+        health = self.health.setdefault(peer, self._empty_health())
+        if method == "POST":
+            kwargs.setdefault("headers", {"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            try:
+                response = await asyncio.wait_for(
+                    self.session().request(method, f"{peer}{API}{path}", timeout=self.timeout, **kwargs),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                raise httpx.TimeoutException(f"no response within {self.timeout:.1f}s") from None
+        except httpx.HTTPError as exc:
+            health.update(
+                reachable=False,
+                failures=health["failures"] + 1,
+                consecutive_failures=health["consecutive_failures"] + 1,
+                last_failure_at=time.time(),
+                last_error=f"{type(exc).__name__}: {exc}",
+            )
+            raise
+        latency = (time.perf_counter() - started) * 1000.0
+        health.update(
+            reachable=True,
+            requests=health["requests"] + 1,
+            latency_total_ms=health["latency_total_ms"] + latency,
+            last_latency_ms=round(latency, 2),
+            consecutive_failures=0,
+            last_success_at=time.time(),
+        )
+        return response
+
+    async def _retry_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as exc:  # keep retrying; a broken database shows up in the log
+                logger.error(f"Peer outbox flush failed: {exc}")
+
+    def _default_client(self) -> httpx.AsyncClient:
+        connections = max(10, 4 * len(self.peers))
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        )
+
+    @staticmethod
+    def _empty_health() -> Dict[str, Any]:
+        return {
+            "reachable": None,
+            "requests": 0,
+            "latency_total_ms": 0.0,
+            "last_latency_ms": None,
+            "failures": 0,
+            "consecutive_failures": 0,
+            "last_success_at": None,
+            "last_failure_at": None,
+            "last_error": None,
+            "delivered": 0,
+            "rejected": 0,
+            "height": None,
+            "lag_blocks": None,
+        }
@@ -0,0 +1,228 @@
+"""
+Federated ledger API routes.
+
+``create_router`` binds the routes to one LedgerManager and Node, so several
+in-process apps (each with its own ledger file) can talk to each other, e.g.
+in tests through ``httpx.ASGITransport``. Peers are called through the
+node's PeerClient.
+"""
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..config import get_settings
+from .crypto import decrypt_data, encrypt_data, sha256
+from .ledger import Block
+from .manager import LedgerManager
+from .node import Node
+from .sync import COMPACT_FIELDS, MAX_HASH_PROBES, ChainSync
+
+
+def create_router(ledger: LedgerManager, node: Node) -> APIRouter:
+    """Federated routes for ``ledger`` and ``node``."""
+    settings = get_settings()
+    router = APIRouter(prefix="/api/v1/federated", tags=["federated"])
+
+    @router.post("/add_block")
+    async def add_federated_block(payload: dict):
+        """Add a new block to the federated ledger and queue it for every peer (delivered in the background)."""
+        prev_block = ledger.get_tip()
+
+        encrypted_data = encrypt_data(payload)
+        new_block = Block.create_new(
+            index=prev_block.index + 1,
+            data_encrypted=encrypted_data,
+            previous_hash=prev_block.hash
+        )
+
+        ledger.save_block(new_block)
+        queued = node.broadcast_block(new_block)
+
+        return {"message": "Block added to federated ledger", "block": asdict(new_block), "queued_peers": queued}
+
+    @router.post("/receive_block")
+    async def receive_federated_block(block_data: dict):
+        """Receive and validate a block from a peer node."""
+        tip = ledger.get_tip()
+
+        incoming_block = Block(
+            index=block_data["index"],
+            timestamp=block_data["timestamp"],
+            data_encrypted=block_data["data_encrypted"],
+            previous_hash=block_data["previous_hash"],
+            public_key=block_data["public_key"],
+            hash=block_data["hash"],
+            signature=block_data["signature"]
+        )
+
+        # Check if block already exists
+        if incoming_block.index <= tip.index:
+            existing_block = ledger.get_block(incoming_block.index)
+            if existing_block is not None and existing_block.hash == incoming_block.hash:
+                return {"message": "Block already exists"}
+            else:
+                raise HTTPException(status_code=400, detail="Block index conflict")
+
+        # Validate block integrity (hash and signature)
+        if incoming_block.hash != sha256(incoming_block.payload()):
+            raise HTTPException(status_code=400, detail="Invalid block hash")
+
+        # For new blocks, check if it follows the previous block
+        if incoming_block.index == tip.index + 1:
+            if incoming_block.previous_hash != tip.hash:
+                raise HTTPException(status_code=400, detail="Previous hash mismatch")
+
+        ledger.save_block(incoming_block)
+        return {"message": "Block accepted"}
+
+    @router.get("/tip")
+    async def get_federated_tip():
+        """Tip height and hash, the first message of a delta sync."""
+        tip = ledger.get_tip()
+        return {"height": tip.index, "hash": tip.hash, "length": tip.index + 1}
+
+    @router.get("/hashes")
+    async def get_federated_hashes(at: str = Query(..., description="Comma-separated block indexes")):
+        """Block hashes at the given indexes, for fork-point search; unknown indexes are omitted."""
+        try:
+            indexes = [int(index) for index in at.split(",") if index.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="at must be comma-separated integers")
+        if len(indexes) > MAX_HASH_PROBES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_HASH_PROBES} indexes per request")
+        return {"hashes": ledger.hashes_at(indexes)}
+
+    @router.get("/chain")
+    async def get_federated_chain(
+        start: int = Query(0, alias="from", ge=0),
+        limit: Optional[int] = Query(None, ge=1),
+        compact: bool = False,
+    ):
+        """
+        Stream blocks from index ``from`` (default: the whole chain), at most ``limit`` of them.
+
+        ``length`` is the full chain length; ``next`` is the ``from`` of the following
+        page, or null when the page reaches the tip. ``compact=true`` sends each block
+        as an array in ``fields`` order instead of an object.
+        """
+        length = ledger.chain_length()
+
+        def body():
+            fields = f'"fields": {json.dumps(COMPACT_FIELDS)}, ' if compact else ""
+            yield f'{{"length": {length}, "from": {start}, {fields}"chain": ['
+            last = None
+            for block in ledger.iter_blocks(start, limit):
+                row = [getattr(block, field) for field in COMPACT_FIELDS] if compact else asdict(block)
+                yield ("," if last is not None else "") + json.dumps(row, separators=(",", ":"))
+                last = block.index
+            following = last + 1 if last is not None and last + 1 < length and limit is not None else None
+            yield f'], "next": {json.dumps(following)}}}'
+
+        return StreamingResponse(body(), media_type="application/json")
+
+    @router.get("/validate")
+    async def validate_federated_chain():
+        """Validate the local chain and check network consensus (all peers polled at once)."""
+        validation, replies = await asyncio.gather(
+            run_in_threadpool(ledger.validate_incremental), node.client.get_all("/validate_local")
+        )
+        self_valid = validation.valid
+
+        # An unreachable peer or an unreadable reply counts as tampered
+        results = {
+            node_url: isinstance(reply, dict) and bool(reply.get("valid", False))
+            for node_url, reply in replies.items()
+        }
+        tampered = [node_url for node_url, is_valid in results.items() if not is_valid]
+
+        network_valid = self_valid and all(results.values())
+
+        return {
+            "self_valid": self_valid,
+            "nodes": results,
+            "network_valid": network_valid,
+            "tampered_nodes": tampered,
+            "chain_length": ledger.chain_length(),
+            "verified_height": validation.height,
+        }
+
+    @router.get("/validate_local")
+    async def validate_local_chain():
+        """Local chain validation endpoint for peer nodes (blocks above the verified checkpoint only)."""
+        validation = await run_in_threadpool(ledger.validate_incremental)
+        return asdict(validation)
+
+    @router.post("/audit", status_code=202)
+    async def start_ledger_audit():
+        """Re-verify the whole chain from genesis on a background thread."""
+        started = ledger.start_audit()
+        return {"started": started, **ledger.audit_status()}
+
+    @router.get("/audit")
+    async def ledger_audit_status():
+        return ledger.audit_status()
+
+    @router.post("/reset_chain")
+    async def reset_blockchain():
+        """Reset blockchain to genesis block only. WARNING: Deletes all blocks!"""
+        try:
+            ledger.reset_chain()
+            return {"message": "Blockchain reset to genesis block", "blocks": ledger.chain_length()}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to reset chain: {str(e)}")
+
+    @router.get("/decrypt_block/{block_index}")
+    async def decrypt_federated_block(block_index: int):
+        """Decrypt a specific block's data (requires proper authorization in production)."""
+        block = ledger.get_block(block_index) if block_index >= 0 else None
+        if block is None:
+            raise HTTPException(status_code=404, detail="Block not found")
+
+        try:
+            decrypted = decrypt_data(block.data_encrypted)
+            return {"block_index": block_index, "data": decrypted}
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Decryption failed: {str(e)}")
+
+    @router.get("/peers")
+    async def federated_peer_health(probe: bool = False):
+        """
+        Per-peer health, delivery counters and outbox backlog. ``probe=true``
+        first asks every peer for its tip (at once) to refresh heights and lag.
+        """
+        height = ledger.get_tip().index
+        if probe:
+            await node.client.probe(height)
+        return {"node": node.my_url, "height": height, "peers": node.client.stats()}
+
+    @router.post("/sync_chain")
+    async def sync_chain_from_network():
+        """
+        Catch up with the longest valid peer chain by delta sync: exchange tips,
+        find the fork point, fetch only the blocks above it and swap them in
+        with one transaction.
+        """
+        sync = ChainSync(
+            ledger,
+            node.client.session(),
+            fanout=settings.federated_sync_fanout,
+            batch_size=settings.federated_sync_batch,
+        )
+        result = await sync.sync(sorted(node.peers))
+
+        if result is None:
+            raise HTTPException(status_code=400, detail="No longer valid chains found in network")
+
+        return {
+            "message": "Chain synced successfully",
+            "new_length": result.new_length,
+            "synced_from": result.peer,
+            **asdict(result),
+        }
+
+    return router
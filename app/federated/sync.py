@@ -0,0 +1,167 @@
+"""
+Delta chain sync between federated nodes.
+
+A node asks each peer for its tip, locates the fork point by comparing block
+hashes at a few probe heights per round, and downloads only the blocks above
+the fork. The new suffix is validated against the local fork block and then
+swapped in with one transaction. Rounds, bytes and time grow with the
+divergence and with log(chain length), not with the chain length itself.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from .ledger import Block
+from .manager import LedgerManager
+
+logger = logging.getLogger(__name__)
+
+API = "/api/v1/federated"
+# Fields of a block row in compact chain pages, in order
+COMPACT_FIELDS = ("index", "timestamp", "data_encrypted", "previous_hash", "hash", "signature", "public_key")
+# Most indexes one /hashes request may ask for
+MAX_HASH_PROBES = 256
+
+
+@dataclass
+class SyncResult:
+    peer: str
+    fork_point: int
+    fetched: int
+    new_length: int
+    rounds: int
+    bytes_received: int
+    duration_ms: float
+
+
+class SyncError(Exception):
+    """A peer's chain could not be adopted (unreachable, unrelated or invalid)."""
+
+
+class ChainSync:
+    """
+    Client side of the delta sync protocol, over an ``httpx.AsyncClient``.
+
+    ``find_fork_point`` narrows the last common height with ``fanout`` probes
+    per round; the first round includes genesis and the shorter tip, so a peer
+    that only extends the local chain costs one round.
+    """
+
+    def __init__(self, ledger: LedgerManager, client: httpx.AsyncClient, fanout: int = 16, batch_size: int = 1000):
+        self.ledger = ledger
+        self.client = client
+        self.fanout = max(1, min(fanout, MAX_HASH_PROBES - 2))
+        self.batch_size = max(1, batch_size)
+        self.bytes_received = 0
+
+    async def sync(self, peers: Iterable[str]) -> Optional[SyncResult]:
+        """
+        Adopt the longest valid peer chain that is longer than ours, or any valid
+        one if ours fails validation (repairing it from the first bad block).
+        None if no peer qualifies.
+        """
+        local_length = self.ledger.chain_length()
+        validation = await asyncio.to_thread(self.ledger.validate_incremental)
+        trusted = None if validation.valid else validation.first_invalid - 1
+        peers = list(peers)
+        replies = await asyncio.gather(*(self._get_json(peer, "/tip") for peer in peers), return_exceptions=True)
+        tips: List[Tuple[int, str]] = []  # (peer chain length, peer)
+        for peer, tip in zip(peers, replies):
+            if isinstance(tip, BaseException):
+                logger.warning(f"Sync: peer {peer} tip unavailable: {tip}")
+                continue
+            if tip["length"] > local_length or trusted is not None:
+                tips.append((tip["length"], peer))
+        for length, peer in sorted(tips, reverse=True):
+            try:
+                return await self.sync_from(peer, length - 1, trusted)
+            except (SyncError, httpx.HTTPError, ValueError, KeyError) as exc:
+                logger.warning(f"Sync from {peer} failed: {exc}")
+        return None
+
+    async def sync_from(self, peer: str, peer_height: int, trusted_height: Optional[int] = None) -> SyncResult:
+        """
+        Fetch and adopt ``peer``'s blocks above the fork point. Local blocks above
+        ``trusted_height`` (known bad) are never treated as common; without it
+        the peer chain must be longer than ours.
+        """
+        started = time.perf_counter()
+        self.bytes_received = 0
+        fork, rounds = await self.find_fork_point(peer, peer_height, trusted_height)
+        if fork < 0:
+            raise SyncError(f"{peer} does not share our genesis block")
+        suffix = await self.fetch_suffix(peer, fork + 1)
+        if not suffix or suffix[-1].index < peer_height:
+            raise SyncError(f"{peer} returned a truncated suffix")
+        if trusted_height is None and fork + len(suffix) + 1 <= self.ledger.chain_length():
+            raise SyncError(f"{peer} chain is no longer than ours")
+        anchor = self.ledger.get_block(fork)
+        expected = range(fork + 1, fork + 1 + len(suffix))
+        if any(block.index != index for block, index in zip(suffix, expected)):
+            raise SyncError(f"{peer} returned non-contiguous blocks")
+        if not self.ledger.validate_chain([anchor] + suffix):
+            raise SyncError(f"{peer} returned an invalid suffix above block {fork}")
+        self.ledger.replace_suffix(fork, suffix, verified=True)
+        return SyncResult(
+            peer=peer,
+            fork_point=fork,
+            fetched=len(suffix),
+            new_length=suffix[-1].index + 1,
+            rounds=rounds,
+            bytes_received=self.bytes_received,
+            duration_ms=(time.perf_counter() - started) * 1000.0,
+        )
+
+    async def find_fork_point(
+        self, peer: str, peer_height: int, trusted_height: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Highest index where our block hash equals the peer's (-1: none), and the rounds it took."""
+        local_height = self.ledger.chain_length() - 1
+        if trusted_height is not None:
+            local_height = min(local_height, trusted_height)
+        matched = -1
+        mismatched = min(peer_height, local_height) + 1
+        rounds = 0
+        while mismatched - matched > 1:
+            span = mismatched - matched - 1
+            probes = {matched + -(-span * k // self.fanout) for k in range(1, self.fanout + 1)}
+            if matched < 0:
+                probes.add(0)
+            probes = sorted(probe for probe in probes if matched < probe < mismatched)
+            theirs = await self.peer_hashes(peer, probes)
+            ours = self.ledger.hashes_at(probes)
+            rounds += 1
+            for probe in probes:
+                if ours.get(probe) is not None and ours.get(probe) == theirs.get(probe):
+                    matched = probe
+                else:
+                    # Hashes commit to the whole prefix: nothing above a mismatch can match
+                    mismatched = probe
+                    break
+        return matched, rounds
+
+    async def peer_hashes(self, peer: str, indexes: List[int]) -> Dict[int, str]:
+        data = await self._get_json(peer, "/hashes", params={"at": ",".join(map(str, indexes))})
+        return {int(index): block_hash for index, block_hash in data["hashes"].items()}
+
+    async def fetch_suffix(self, peer: str, start: int) -> List[Block]:
+        """Blocks from ``start`` to the peer's tip, in compact pages of ``batch_size``."""
+        blocks: List[Block] = []
+        following: Optional[int] = start
+        while following is not None:
+            page = await self._get_json(
+                peer, "/chain", params={"from": following, "limit": self.batch_size, "compact": "true"}
+            )
+            blocks.extend(Block(**dict(zip(COMPACT_FIELDS, row))) for row in page["chain"])
+            following = page["next"]
+        return blocks
+
+    async def _get_json(self, peer: str, path: str, params: Optional[Dict[str, object]] = None) -> dict:
+        response = await self.client.get(f"{peer}{API}{path}", params=params)
+        response.raise_for_status()
+        self.bytes_received += len(response.content)
+        return response.json()
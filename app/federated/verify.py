@@ -0,0 +1,130 @@
+"""
+Batch hash and signature verification for ledger blocks.
+
+Kept free of settings and key material so process-pool workers import it
+cheaply.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+# (hash, public_key, signature, payload): one block, with its payload serialized once
+SignedItem = Tuple[str, str, str, bytes]
+
+
+@lru_cache(maxsize=4096)
+def _public_key(pubkey_hex: str) -> Ed25519PublicKey:
+    # A node signs many blocks with one key; parse it once per process
+    return Ed25519PublicKey.from_public_bytes(bytes.fromhex(pubkey_hex))
+
+
+def verify_payload(pubkey_hex: str, payload: bytes, sig_hex: str) -> bool:
+    try:
+        _public_key(pubkey_hex).verify(bytes.fromhex(sig_hex), payload)
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+def first_invalid_item(items: Sequence[SignedItem]) -> Optional[int]:
+    """Position of the first item whose hash or signature does not match its payload."""
+    for position, (block_hash, public_key, signature, payload) in enumerate(items):
+        if hashlib.sha256(payload).hexdigest() != block_hash:
+            return position
+        if not verify_payload(public_key, payload, signature):
+            return position
+    return None
+
+
+class BlockVerifier:
+    """
+    Verifies block hashes and Ed25519 signatures across a process pool.
+
+    Each payload is serialized once. Chunks of ``chunk_size`` blocks go to the
+    workers, with at most two chunks per worker in flight. Results are read in
+    chain order, and nothing more is submitted after the first failing chunk.
+    Inputs shorter than ``min_parallel`` blocks, or ``workers <= 1``, are
+    checked inline. The pool is started on first use with the ``spawn``
+    method, so it is safe to create from a threaded server.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = 512, min_parallel: int = 4096) -> None:
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.min_parallel = min_parallel
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def first_invalid(self, blocks: Sequence) -> Optional[int]:
+        """Position in ``blocks`` of the first block with a bad hash or signature, or None."""
+        items: List[SignedItem] = [
+            (block.hash, block.public_key, block.signature, block.payload().encode()) for block in blocks
+        ]
+        if self.workers <= 1 or len(items) < self.min_parallel:
+            return first_invalid_item(items)
+
+        pool = self._executor()
+        pending: Deque[Tuple[int, Future]] = deque()
+        next_start = 0
+        while pending or next_start < len(items):
+            while next_start < len(items) and len(pending) < self.workers * 2:
+                chunk = items[next_start : next_start + self.chunk_size]
+                pending.append((next_start, pool.submit(first_invalid_item, chunk)))
+                next_start += self.chunk_size
+            offset, future = pending.popleft()
+            position = future.result()
+            if position is not None:
+                for _, later in pending:
+                    later.cancel()
+                return offset + position
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+
+_verifier: Optional[BlockVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier() -> BlockVerifier:
+    """Shared verifier configured from settings; every LedgerManager uses the same pool."""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            from ..config import get_settings
+
+            settings = get_settings()
+            _verifier = BlockVerifier(
+                workers=settings.federated_verify_workers,
+                chunk_size=settings.federated_verify_chunk,
+                min_parallel=settings.federated_verify_min_parallel,
+            )
+        return _verifier
+
+
+def close_verifier() -> None:
+    global _verifier
+    with _verifier_lock:
+        if _verifier is not None:
+            _verifier.close()
+            _verifier = None
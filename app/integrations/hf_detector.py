@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from functools import lru_cache
-from typing import Dict, Optional, Tuple, Any
+from typing import Any, Dict, List, Optional, Tuple
 
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 from peft import PeftModel, PeftConfig
 
+from .micro_batch import MicroBatcher
+
 # Keep your project config import
 try:
     from ..config import get_settings
@@ -23,14 +26,24 @@ class AIDetector:
     Dual-model detector for AI-generated content:
     1. AI vs Human detection using DeBERTa v3 LoRA (ShoaibSSM/ai_vs_human_detector_deberta_v3_lora)
     2. Model Family detection for AI-generated text (XOmar/model_family_detector_deberta_v3_balanced)
+
+    Inputs are grouped into token-length buckets so padding only happens among
+    texts of similar length, and concurrent ``analyze_text`` callers can share a
+    forward pass through a micro-batching queue.
     """
 
+    # Upper token-length bound of each padding bucket (inputs are truncated at 512)
+    LENGTH_BUCKETS = (64, 128, 256, 512)
+
     def __init__(self) -> None:
         self.settings = get_settings()
         self._ai_human_model = None
         self._ai_human_tokenizer = None
         self._family_model = None
         self._family_tokenizer = None
+        self._max_batch_size = int(getattr(self.settings, "hf_batch_max_size", 16))
+        self._batcher: Optional[MicroBatcher] = None
+        self._batcher_lock = threading.Lock()
 
         # Allow overriding the adapter checkpoint via env for flexibility
         self._ai_human_adapter_id = os.getenv(
@@ -150,40 +163,8 @@ class AIDetector:
             return None
 
         try:
-            # Tokenize (Let tokenizer handle truncation properly)
-            inputs = self._ai_human_tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self._device)
-
-            with torch.no_grad():
-                outputs = self._ai_human_model(**inputs)
-                probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
-
-            # Dynamic Label Mapping (Safety check)
-            id2label = self._ai_human_model.config.id2label
-            
-            # Find which index corresponds to "AI" or "LABEL_1"
-            ai_index = 1 # Default
-            for idx, label in id2label.items():
-                if "AI" in str(label).upper() or "LABEL_1" in str(label).upper():
-                    ai_index = int(idx)
-                    break
-            
-            human_index = 1 - ai_index # Assuming binary 0/1
-
-            ai_prob = float(probabilities[0][ai_index].item())
-            human_prob = float(probabilities[0][human_index].item())
-
-            return {
-                "ai_probability": ai_prob,
-                "human_probability": human_prob,
-                "is_ai": ai_prob > 0.5,
-                "verdict": "AI" if ai_prob > 0.5 else "Human"
-            }
+            probabilities = self._classify(self._ai_human_model, self._ai_human_tokenizer, [text])
+            return self._ai_human_result(probabilities[0])
 
         except Exception as exc:
             logger.error(f"AI/Human detection failed: {exc}")
@@ -197,35 +178,8 @@ class AIDetector:
             return None
 
         try:
-            inputs = self._family_tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self._device)
-
-            with torch.no_grad():
-                outputs = self._family_model(**inputs)
-                probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
-
-            id2label = self._family_model.config.id2label
-
-            # Create readable probability dict
-            all_probs = {
-                id2label[i]: float(probabilities[0][i].item())
-                for i in sorted(id2label.keys()) # Ensure order
-            }
-
-            top_idx = int(torch.argmax(probabilities[0]).item())
-            family = id2label[top_idx]
-            confidence = float(probabilities[0][top_idx].item())
-
-            return {
-                "family": family,
-                "confidence": confidence,
-                "all_probabilities": all_probs
-            }
+            probabilities = self._classify(self._family_model, self._family_tokenizer, [text])
+            return self._family_result(probabilities[0])
 
         except Exception as exc:
             logger.error(f"Model family detection failed: {exc}")
@@ -236,7 +190,14 @@ class AIDetector:
         Full pipeline: 
         1. Check AI vs Human.
         2. If AI > 50%, check Family.
+
+        With micro-batching enabled the text joins the shared queue, so requests
+        arriving from different threads are scored in one forward pass.
         """
+        batcher = self._micro_batcher()
+        if batcher is not None:
+            return batcher.submit(text)
+
         ai_result = self.detect_ai_human(text)
         
         family_result = None
@@ -246,6 +207,156 @@ class AIDetector:
         
         return ai_result, family_result
 
+    def analyze_batch(self, texts: List[str]) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Batched variant of ``analyze_text``.
+
+        Non-empty texts are scored by the AI/Human model in length buckets; the
+        family model then runs only over the subset flagged as AI. Output is
+        aligned with ``texts`` and uses the same per-item dict shape.
+        """
+        results: List[Tuple[Optional[Dict], Optional[Dict]]] = [(None, None)] * len(texts)
+        if not self.available:
+            return results
+
+        positions = [i for i, text in enumerate(texts) if text.strip()]
+        if not positions:
+            return results
+
+        try:
+            probabilities = self._classify(
+                self._ai_human_model,
+                self._ai_human_tokenizer,
+                [texts[i] for i in positions],
+            )
+        except Exception as exc:
+            logger.error(f"Batched AI/Human detection failed: {exc}")
+            return results
+
+        ai_results = {pos: self._ai_human_result(row) for pos, row in zip(positions, probabilities)}
+        for pos, ai_result in ai_results.items():
+            results[pos] = (ai_result, None)
+
+        flagged = [pos for pos, ai_result in ai_results.items() if ai_result["is_ai"]]
+        if flagged and self._family_model:
+            try:
+                family_probabilities = self._classify(
+                    self._family_model,
+                    self._family_tokenizer,
+                    [texts[i] for i in flagged],
+                )
+                for pos, row in zip(flagged, family_probabilities):
+                    results[pos] = (ai_results[pos], self._family_result(row))
+            except Exception as exc:
+                logger.error(f"Batched model family detection failed: {exc}")
+
+        return results
+
+    def close(self) -> None:
+        """Flush and stop the micro-batching worker, if one was started."""
+        with self._batcher_lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+
+    def _micro_batcher(self) -> Optional[MicroBatcher]:
+        if not self.available or not getattr(self.settings, "hf_microbatch_enabled", False):
+            return None
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = MicroBatcher(
+                    self.analyze_batch,
+                    max_batch_size=self._max_batch_size,
+                    max_wait_ms=getattr(self.settings, "hf_batch_max_wait_ms", 5.0),
+                    name="hf-micro-batcher",
+                )
+            return self._batcher
+
+    def _classify(self, model, tokenizer, texts: List[str]) -> List[Any]:
+        """
+        Score ``texts`` with length-bucketed forward passes.
+
+        Everything is tokenized once without padding; each bucket is then padded
+        only to its own longest member. Returns softmax rows aligned with ``texts``.
+        """
+        # Tokenize (Let tokenizer handle truncation properly)
+        encodings = tokenizer(texts, truncation=True, max_length=512)
+        keys = list(encodings.keys())
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+
+        rows: List[Any] = [None] * len(texts)
+        for bucket in self._length_buckets(lengths, self._max_batch_size):
+            features = [{key: encodings[key][i] for key in keys} for i in bucket]
+            inputs = tokenizer.pad(features, return_tensors="pt").to(self._device)
+
+            with torch.no_grad():
+                outputs = model(**inputs)
+                probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
+
+            for i, row in zip(bucket, probabilities):
+                rows[i] = row
+        return rows
+
+    @classmethod
+    def _length_buckets(cls, lengths: List[int], max_batch_size: int) -> List[List[int]]:
+        """Group indices by length bucket, sorted by length, at most ``max_batch_size`` per group."""
+        max_batch_size = max(1, max_batch_size)
+        buckets: List[List[int]] = []
+        current: List[int] = []
+        current_bound = None
+        for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+            bound = next((b for b in cls.LENGTH_BUCKETS if lengths[index] <= b), cls.LENGTH_BUCKETS[-1])
+            if current and (bound != current_bound or len(current) >= max_batch_size):
+                buckets.append(current)
+                current = []
+            current.append(index)
+            current_bound = bound
+        if current:
+            buckets.append(current)
+        return buckets
+
+    def _ai_human_result(self, probabilities) -> Dict[str, Any]:
+        # Dynamic Label Mapping (Safety check)
+        id2label = self._ai_human_model.config.id2label
+        
+        # Find which index corresponds to "AI" or "LABEL_1"
+        ai_index = 1 # Default
+        for idx, label in id2label.items():
+            if "AI" in str(label).upper() or "LABEL_1" in str(label).upper():
+                ai_index = int(idx)
+                break
+        
+        human_index = 1 - ai_index # Assuming binary 0/1
+
+        ai_prob = float(probabilities[ai_index].item())
+        human_prob = float(probabilities[human_index].item())
+
+        return {
+            "ai_probability": ai_prob,
+            "human_probability": human_prob,
+            "is_ai": ai_prob > 0.5,
+            "verdict": "AI" if ai_prob > 0.5 else "Human"
+        }
+
+    def _family_result(self, probabilities) -> Dict[str, Any]:
+        id2label = self._family_model.config.id2label
+
+        # Create readable probability dict
+        all_probs = {
+            id2label[i]: float(probabilities[i].item())
+            for i in sorted(id2label.keys()) # Ensure order
+        }
+
+        top_idx = int(torch.argmax(probabilities).item())
+        family = id2label[top_idx]
+        confidence = float(probabilities[top_idx].item())
+
+        return {
+            "family": family,
+            "confidence": confidence,
+            "all_probabilities": all_probs
+        }
+
 @lru_cache(maxsize=1)
 def get_ai_detector() -> AIDetector:
     """Singleton accessor."""
@@ -0,0 +1,97 @@
+"""
+Micro-batching queue that lets concurrent callers share one batched call.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect items submitted from any thread and hand them to ``handler`` in batches.
+
+    A batch is flushed once it holds ``max_batch_size`` items or ``max_wait_ms``
+    has passed since its first item arrived, whichever comes first. ``handler``
+    receives a list of items and must return a list of results in the same order.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], List[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._handler = handler
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[T, Future]]]" = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: T, timeout: Optional[float] = None) -> R:
+        """Queue ``item`` and block until its batch has been processed."""
+        return self.submit_async(item).result(timeout=timeout)
+
+    def submit_async(self, item: T) -> "Future[R]":
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: "Future[R]" = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        """Stop accepting work, flush what is queued and join the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[T, Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self._handler([item for item, _ in batch])
+        except Exception as exc:  # noqa: BLE001 - propagate to every waiting caller
+            logger.error(f"Micro-batch of {len(batch)} items failed: {exc}")
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
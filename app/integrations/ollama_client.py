@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import httpx
 
 try:
     import ollama
@@ -16,88 +20,101 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Sampling options shared by the sync and async clients
+GENERATE_OPTIONS = {
+    'temperature': 0.3,  # Lower temperature for more consistent scoring
+    'top_p': 0.9,
+    'num_predict': 150,  # Limit response length for efficiency
+}
+
 
 class OllamaClient:
     """
     Python wrapper to query a local Ollama model for qualitative risk scoring.
-    Uses the official Ollama Python library for efficient async communication.
-    Expects Ollama server to be running on localhost:11434.
+    Uses the official Ollama Python library against ``OLLAMA_HOST``. The server
+    is not contacted until the first assessment, so startup never waits on it.
+    After a refused connection or a timeout, calls return None without trying
+    for ``retry_seconds``, so a down or hung server costs one timeout rather
+    than one per call. See AsyncOllamaClient for the non-blocking variant.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, retry_seconds: Optional[float] = None) -> None:
         self.settings = get_settings()
         self.available = OLLAMA_AVAILABLE and self.settings.ollama_enabled
-        
+        self.retry_seconds = float(
+            retry_seconds if retry_seconds is not None else self.settings.ollama_retry_seconds
+        )
+        self._client = None
+        self._down_until = 0.0
+
         if not OLLAMA_AVAILABLE and self.settings.ollama_enabled:
             logger.error(
                 "Ollama is enabled in config but the library is not installed. "
                 "Run: pip install ollama"
             )
-        
-        if self.available:
-            # Test connection to Ollama server
-            try:
-                ollama.list()
-                logger.info(f"Ollama client initialized successfully with model: {self.settings.ollama_model}")
-            except Exception as e:
-                logger.warning(f"Ollama server not accessible: {e}")
-                self.available = False
 
     def risk_assessment(self, text: str) -> Optional[float]:
         """
         Analyze text for disinformation risk using Ollama LLM.
         Returns a risk score between 0.0 and 1.0.
         """
-        if not self.available:
+        if not self.available or time.monotonic() < self._down_until:
             return None
-            
-        # Truncate/sample text if too long
-        limit = max(256, int(self.settings.ollama_prompt_chars))
-        if len(text) <= limit:
-            snippet = text
-        else:
-            head = text[: limit // 2]
-            tail = text[-(limit // 2) :]
-            snippet = f"{head}\n...\n{tail}"
-        
-        # Construct analysis prompt
+
+        snippet = self._snippet(text)
         prompt = self._build_prompt(snippet)
-        
+
         try:
-            # Call Ollama with timeout handling
-            response = ollama.generate(
+            if self._client is None:
+                # One client (and connection pool) for the process
+                self._client = ollama.Client(host=self.settings.ollama_host, timeout=self.settings.ollama_timeout)
+            response = self._client.generate(
                 model=self.settings.ollama_model,
                 prompt=prompt,
-                options={
-                    'temperature': 0.3,  # Lower temperature for more consistent scoring
-                    'top_p': 0.9,
-                    'num_predict': 150,  # Limit response length for efficiency
-                }
+                options=GENERATE_OPTIONS,
             )
-            
+
             if not response or 'response' not in response:
                 logger.warning(f"Ollama returned empty response for model {self.settings.ollama_model}")
                 return None
-            
-            output = response['response'].strip()
-            logger.debug(f"Ollama raw response (first 200 chars): {output[:200]}")
-            logger.info("Ollama raw response (full): %s", output)
-            
-            # Extract risk score from response
-            risk_score = self._parse_risk_score(output)
-            
-            if risk_score is not None:
-                logger.info(
-                    f"Ollama risk assessment: {risk_score:.2%} "
-                    f"(model: {self.settings.ollama_model}, chars: {len(snippet)})"
-                )
-            
-            return risk_score
-            
+
+            return self._score_output(response['response'], snippet)
+
+        except (ConnectionError, httpx.ConnectError, httpx.TimeoutException) as e:
+            self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning(
+                f"Ollama unreachable at {self.settings.ollama_host} ({e}); "
+                f"skipping calls for {self.retry_seconds:.0f}s"
+            )
+            return None
         except Exception as e:
             logger.warning(f"Ollama risk assessment failed: {e}")
             return None
 
+    def _snippet(self, text: str) -> str:
+        """Truncate/sample text if too long: head and tail around an ellipsis."""
+        limit = max(256, int(self.settings.ollama_prompt_chars))
+        if len(text) <= limit:
+            return text
+        head = text[: limit // 2]
+        tail = text[-(limit // 2) :]
+        return f"{head}\n...\n{tail}"
+
+    def _score_output(self, output: str, snippet: str) -> Optional[float]:
+        output = output.strip()
+        logger.debug(f"Ollama raw response (first 200 chars): {output[:200]}")
+        logger.info("Ollama raw response (full): %s", output)
+
+        # Extract risk score from response
+        risk_score = self._parse_risk_score(output)
+
+        if risk_score is not None:
+            logger.info(
+                f"Ollama risk assessment: {risk_score:.2%} "
+                f"(model: {self.settings.ollama_model}, chars: {len(snippet)})"
+            )
+        return risk_score
+
     def _build_prompt(self, snippet: str) -> str:
         """Construct a detailed prompt for risk assessment."""
         return f"""You are an expert counter-disinformation analyst. Analyze the following content for potential risks including:
@@ -189,3 +206,140 @@ JSON response:"""
                 return payload
             index = end
         return None
+
+
+class AsyncOllamaClient(OllamaClient):
+    """
+    Non-blocking Ollama client for the event loop.
+
+    Calls ``POST /api/generate`` over one pooled ``httpx.AsyncClient`` (created
+    lazily on the running loop, recreated if the loop changes), so a slow
+    model holds a coroutine rather than a worker thread. At most
+    ``max_concurrency`` requests are in flight; callers beyond that queue on a
+    semaphore, and the wait counts against their deadline. Each call is bounded
+    by ``min(timeout, OLLAMA_TIMEOUT)`` and returns None when it runs out;
+    cancelling the caller cancels the request and frees its slot. After a
+    connection failure, calls return None without trying for
+    ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retry_seconds: Optional[float] = None,
+    ) -> None:
+        # The async path speaks HTTP directly and does not need the ollama library
+        self.settings = get_settings()
+        self.available = self.settings.ollama_enabled
+        self.host = (host or self.settings.ollama_host).rstrip("/")
+        self.max_concurrency = max(1, max_concurrency or self.settings.ollama_max_concurrency)
+        self.timeout = float(timeout if timeout is not None else self.settings.ollama_timeout)
+        self.retry_seconds = float(
+            retry_seconds if retry_seconds is not None else self.settings.ollama_retry_seconds
+        )
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._down_until = 0.0
+        self.in_flight = 0
+        self.counters = {"calls": 0, "completed": 0, "timeouts": 0, "errors": 0, "cancelled": 0, "skipped": 0}
+
+    async def risk_assessment(self, text: str, timeout: Optional[float] = None) -> Optional[float]:
+        """Risk score 0.0-1.0, or None if disabled, unreachable, failed or past the deadline."""
+        if not self.available:
+            return None
+        if time.monotonic() < self._down_until:
+            self.counters["skipped"] += 1
+            return None
+        budget = self.timeout if timeout is None else min(timeout, self.timeout)
+        self.counters["calls"] += 1
+        try:
+            risk = await asyncio.wait_for(self._generate(text), budget)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            logger.warning(f"Ollama risk assessment timed out after {budget:.1f}s")
+            return None
+        except asyncio.CancelledError:
+            self.counters["cancelled"] += 1
+            raise
+        except (httpx.HTTPError, ValueError) as e:
+            self.counters["errors"] += 1
+            if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning(f"Ollama risk assessment failed: {e}")
+            return None
+        self.counters["completed"] += 1
+        return risk
+
+    async def probe(self) -> bool:
+        """Check the server answers ``GET /api/tags``; clears the connection-failure backoff."""
+        if not self.available:
+            return False
+        http, _ = self._session()
+        try:
+            response = await http.get("/api/tags", timeout=min(5.0, self.timeout))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Ollama server not accessible at {self.host}: {e}")
+            return False
+        self._down_until = 0.0
+        logger.info(f"Ollama reachable at {self.host} (model: {self.settings.ollama_model})")
+        return True
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.available,
+            "host": self.host,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "backing_off": time.monotonic() < self._down_until,
+            **self.counters,
+        }
+
+    async def _generate(self, text: str) -> Optional[float]:
+        http, semaphore = self._session()
+        snippet = self._snippet(text)
+        async with semaphore:
+            self.in_flight += 1
+            try:
+                response = await http.post(
+                    "/api/generate",
+                    json={
+                        "model": self.settings.ollama_model,
+                        "prompt": self._build_prompt(snippet),
+                        "stream": False,
+                        "options": GENERATE_OPTIONS,
+                    },
+                )
+                response.raise_for_status()
+                data = response.json()
+            finally:
+                self.in_flight -= 1
+        if not isinstance(data, dict) or not data.get("response"):
+            logger.warning(f"Ollama returned empty response for model {self.settings.ollama_model}")
+            return None
+        return self._score_output(data["response"], snippet)
+
+    def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            # Clients and semaphores are bound to the loop that created them; a client
+            # left on a previous (closed) loop is dropped with it
+            self._http = httpx.AsyncClient(
+                base_url=self.host,
+                timeout=httpx.Timeout(self.timeout, connect=min(5.0, self.timeout)),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._http, self._semaphore
@@ -1,12 +1,16 @@
 import json
+import time
+from typing import Any, List, Optional, Tuple
 
 from fastapi import Depends, FastAPI, HTTPException, Request, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
 from .config import Settings, get_settings
 from .schemas import (
+    BatchThroughput,
     ContentIntake,
     BaseModel,
     DetectionResult,
@@ -17,10 +21,11 @@ from .schemas import (
 )
 from .services.orchestrator import AnalysisOrchestrator
 from .storage.database import Database
+from .storage.sqlite_pool import close_pools
 from .federated.manager import LedgerManager
 from .federated.node import Node
-from .federated.ledger import Block
-from .federated.crypto import encrypt_data, decrypt_data, sha256
+from .federated.routes import create_router
+from .federated.verify import close_verifier
 from .heatmap import router as heatmap_router, record_point
 from .auth.middleware import role_protection
 
@@ -31,7 +36,7 @@ orchestrator = AnalysisOrchestrator()
 database_l1 = Database()  # Write-enabled connection
 database_l2 = Database()  # Read-only connection (simulated)
 ledger = LedgerManager()
-node = Node()
+node = Node(db_path=ledger.ledger_db_path)
 
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +59,18 @@ async def startup_event():
         database._initialise()
     except Exception as e:
         print(f"Database initialization warning: {e}")
+    # Retry block deliveries left in the outbox (including from before a restart)
+    node.client.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush background workers (micro-batch queues, writers) before exit."""
+    await orchestrator.aclose()
+    await node.client.aclose()
+    orchestrator.close()
+    close_verifier()
+    close_pools()
 
 
 def get_app_settings() -> Settings:
@@ -76,12 +93,8 @@ async def submit_content(
     # Use L1 DB connection for all uploads
     db_conn = database_l1
     # Require region from intake
-    region = None
-    try:
-        region = (payload.metadata.region if payload.metadata else None)
-    except Exception:
-        region = None
-    if not region or not str(region).strip():
+    region = _intake_region(payload)
+    if region is None:
         raise HTTPException(status_code=400, detail="Region (city/district) is required.")
 
     result = await orchestrator.process_intake(payload)
@@ -91,22 +104,150 @@ async def submit_content(
         score = result.composite_score
         norm = int(round(score * 100)) if 0 <= score <= 1 else int(round(score))
         norm = max(0, min(100, norm))
-        record_point(str(region).strip(), norm)
+        record_point(region, norm)
     except Exception:
         pass
 
     return result
 
 
+def _intake_region(payload: ContentIntake):
+    try:
+        region = payload.metadata.region if payload.metadata else None
+    except Exception:
+        region = None
+    if not region or not str(region).strip():
+        return None
+    return str(region).strip()
+
+
+BatchItems = Tuple[List[Tuple[int, ContentIntake, str]], List[Tuple[int, str]], int]
+
+
+async def _read_batch_items(request: Request) -> BatchItems:
+    """
+    Parse a batch into ``(accepted (index, intake, region), rejected (index, error), item count)``.
+
+    Accepts a JSON array, ``{"items": [...]}``, or NDJSON (one intake per line).
+    NDJSON is validated line by line as the body streams in, so only the
+    parsed intakes are held. Bodies over BATCH_INTAKE_MAX_BYTES or with more
+    than BATCH_INTAKE_MAX_ITEMS items are rejected with 413.
+    """
+    limits = get_settings()
+    max_items = max(1, limits.batch_intake_max_items)
+    max_bytes = max(1, limits.batch_intake_max_bytes)
+    accepted: List[Tuple[int, ContentIntake, str]] = []
+    rejected: List[Tuple[int, str]] = []
+
+    def admit(index: int, item: Any) -> None:
+        if index >= max_items:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {max_items} items.")
+        try:
+            intake = ContentIntake.parse_obj(item)
+        except Exception as error:
+            rejected.append((index, str(error)))
+            return
+        region = _intake_region(intake)
+        if region is None:
+            rejected.append((index, "Region (city/district) is required."))
+            return
+        accepted.append((index, intake, region))
+
+    received = 0
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            count = 0
+            pending = b""
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Batch exceeds {max_bytes} bytes.")
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        admit(count, json.loads(line))
+                        count += 1
+            if pending.strip():
+                admit(count, json.loads(pending))
+                count += 1
+            return accepted, rejected, count
+
+        body = bytearray()
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {max_bytes} bytes.")
+            body += chunk
+        data = json.loads(bytes(body) or b"[]")
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise HTTPException(status_code=400, detail=f"Malformed batch payload: {error}")
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Batch payload must be a list of intakes.")
+    if len(data) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_items} items.")
+    for index, item in enumerate(data):
+        admit(index, item)
+    return accepted, rejected, len(data)
+
+
+@app.post("/api/v1/intake/batch")
+async def submit_content_batch(
+    request: Request,
+    _: Settings = Depends(get_app_settings),
+):
+    """Analyse many intakes in one pass, streaming one NDJSON line per item."""
+    user_id = await role_protection(request, "upload")
+    accepted, rejected, item_count = await _read_batch_items(request)
+
+    async def result_stream():
+        started = time.perf_counter()
+        for index, error in rejected:
+            yield json.dumps({"index": index, "error": error}) + "\n"
+
+        position = 0
+        async for result in orchestrator.process_batch([intake for _, intake, _ in accepted]):
+            index, _, region = accepted[position]
+            position += 1
+            try:
+                score = result.composite_score
+                norm = int(round(score * 100)) if 0 <= score <= 1 else int(round(score))
+                record_point(region, max(0, min(100, norm)))
+            except Exception:
+                pass
+            yield f'{{"index": {index}, "result": {result.json()}}}\n'
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        per_item_ms = elapsed_ms / position if position else 0.0
+        single_ms = orchestrator.single_post_latency_ms()
+        throughput = BatchThroughput(
+            items=item_count,
+            processed=position,
+            rejected=len(rejected),
+            elapsed_ms=round(elapsed_ms, 3),
+            items_per_second=round(position / (elapsed_ms / 1000.0), 3) if elapsed_ms else 0.0,
+            per_item_ms=round(per_item_ms, 3),
+            single_post_per_item_ms=round(single_ms, 3) if single_ms is not None else None,
+            speedup_vs_single_post=(
+                round(single_ms / per_item_ms, 3) if single_ms is not None and per_item_ms else None
+            ),
+        )
+        yield json.dumps({"throughput": throughput.dict()}) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
 @app.get("/api/v1/cases/{intake_id}", response_model=DetectionResult)
-async def get_case(request: Request, intake_id: str):
+async def get_case(request: Request, intake_id: str, max_staleness: Optional[float] = None):
     # Role check: Only allow users with 'dashboard' permission
     user_id = await role_protection(request, "dashboard")
     # Use L2 DB connection for dashboard/logs
     record = database_l2.fetch_case(intake_id)
     if not record:
         raise HTTPException(status_code=404, detail="Case not found")
-    graph_snapshot = orchestrator.graph.summary()
+    graph_snapshot = await run_in_threadpool(orchestrator.graph.summary, max_staleness)
     # reconstruct result for client convenience
     return DetectionResult.parse_obj(
         {
@@ -120,6 +261,7 @@ async def get_case(request: Request, intake_id: str):
             "summary": record.get("summary"),
             "findings": (record.get("breakdown", {}).get("heuristics") or [])[:5],
             "decision_reason": record.get("decision_reason"),
+            "near_duplicate_cluster": record.get("near_duplicate_cluster"),
         }
     )
 
@@ -133,226 +275,81 @@ async def request_sharing_package(request_payload: SharingRequest) -> SharingPac
 
 
 @app.get("/api/v1/integrations/threat-intel", response_model=ThreatIntelFeed)
-async def threat_intel_feed() -> ThreatIntelFeed:
-    return orchestrator.graph.threat_intel_feed()
+async def threat_intel_feed(max_staleness: Optional[float] = None) -> ThreatIntelFeed:
+    # max_staleness (seconds) serves the background-refreshed snapshot instead
+    return await run_in_threadpool(orchestrator.graph.threat_intel_feed, max_staleness)
 
 
 @app.get("/api/v1/integrations/siem", response_model=SIEMCorrelationPayload)
-async def siem_feed() -> SIEMCorrelationPayload:
-    return orchestrator.graph.siem_payload()
+async def siem_feed(max_staleness: Optional[float] = None) -> SIEMCorrelationPayload:
+    return await run_in_threadpool(orchestrator.graph.siem_payload, max_staleness)
 
 
-@app.get("/api/v1/events/stream")
-async def stream_events():
-    async def event_generator():
-        async for event in orchestrator.stream_events():
-            yield f"data: {json.dumps(event)}\n\n"
+@app.get("/api/v1/metrics/detector-cache")
+async def detector_cache_metrics():
+    return orchestrator.detector.cache_stats()
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
 
+@app.get("/api/v1/metrics/ollama")
+async def ollama_metrics():
+    return orchestrator.detector.ollama_stats()
 
-class FingerprintCheckPayload(BaseModel):
-    text: str
 
+@app.get("/api/v1/metrics/lexicon")
+async def lexicon_metrics():
+    return orchestrator.detector.lexicon.stats()
 
-@app.post("/api/v1/fingerprint/check")
-async def fingerprint_check(payload: FingerprintCheckPayload):
-    matches = orchestrator.check_fingerprint(payload.text)
-    return {"matches": matches}
 
+@app.post("/api/v1/lexicon/reload")
+async def reload_lexicon():
+    if not orchestrator.detector.lexicon.path:
+        raise HTTPException(status_code=400, detail="LEXICON_PATH is not configured")
+    reloaded = await run_in_threadpool(orchestrator.detector.lexicon.reload)
+    return {"reloaded": reloaded, **orchestrator.detector.lexicon.stats()}
 
-# ==================== Federated Blockchain Routes ====================
 
-@app.post("/api/v1/federated/add_block")
-async def add_federated_block(payload: dict):
-    """Add a new block to the federated ledger and broadcast to peers."""
-    chain = ledger.get_chain()
-    prev_block = chain[-1]
-    
-    encrypted_data = encrypt_data(payload)
-    new_block = Block.create_new(
-        index=len(chain),
-        data_encrypted=encrypted_data,
-        previous_hash=prev_block.hash
-    )
-    
-    ledger.save_block(new_block)
-    node.broadcast_block(new_block)
-    
-    from dataclasses import asdict
-    return {"message": "Block added to federated ledger", "block": asdict(new_block)}
+@app.get("/api/v1/metrics/graph")
+async def graph_metrics():
+    return orchestrator.graph.stats()
 
 
-@app.post("/api/v1/federated/receive_block")
-async def receive_federated_block(block_data: dict):
-    """Receive and validate a block from a peer node."""
-    chain = ledger.get_chain()
-    
-    incoming_block = Block(
-        index=block_data["index"],
-        timestamp=block_data["timestamp"],
-        data_encrypted=block_data["data_encrypted"],
-        previous_hash=block_data["previous_hash"],
-        public_key=block_data["public_key"],
-        hash=block_data["hash"],
-        signature=block_data["signature"]
-    )
-    
-    # Check if block already exists
-    if incoming_block.index < len(chain):
-        existing_block = chain[incoming_block.index]
-        if existing_block.hash == incoming_block.hash:
-            return {"message": "Block already exists"}
-        else:
-            raise HTTPException(status_code=400, detail="Block index conflict")
-    
-    # Validate block integrity (hash and signature)
-    if incoming_block.hash != sha256(incoming_block.payload()):
-        raise HTTPException(status_code=400, detail="Invalid block hash")
-    
-    # For new blocks, check if it follows the previous block
-    if incoming_block.index == len(chain):
-        prev_block = chain[-1]
-        if incoming_block.previous_hash != prev_block.hash:
-            raise HTTPException(status_code=400, detail="Previous hash mismatch")
-    
-    ledger.save_block(incoming_block)
-    return {"message": "Block accepted"}
-
+@app.get("/api/v1/metrics/near-duplicates")
+async def near_duplicate_metrics():
+    if orchestrator.near_duplicates is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.near_duplicates.stats()}
 
-@app.get("/api/v1/federated/chain")
-async def get_federated_chain():
-    """Retrieve the entire federated blockchain."""
-    from dataclasses import asdict
-    chain = ledger.get_chain()
-    return {"chain": [asdict(block) for block in chain], "length": len(chain)}
 
+@app.get("/api/v1/metrics/write-behind")
+async def write_behind_metrics():
+    if orchestrator.write_behind is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.write_behind.stats()}
 
-@app.get("/api/v1/federated/validate")
-async def validate_federated_chain():
-    """Validate the local chain and check network consensus."""
-    import requests
-    
-    chain = ledger.get_chain()
-    self_valid = ledger.validate_chain(chain)
-    
-    results = {}
-    tampered = []
-    
-    for node_url in node.nodes:
-        if node_url != node.my_url:
-            try:
-                resp = requests.get(f"{node_url}/api/v1/federated/validate_local", timeout=2)
-                is_valid = resp.json().get("valid", False)
-                results[node_url] = is_valid
-                if not is_valid:
-                    tampered.append(node_url)
-            except Exception:
-                results[node_url] = False
-                tampered.append(node_url)
-    
-    network_valid = self_valid and all(results.values())
-    
-    return {
-        "self_valid": self_valid,
-        "nodes": results,
-        "network_valid": network_valid,
-        "tampered_nodes": tampered,
-        "chain_length": len(chain)
-    }
 
+@app.get("/api/v1/events/stream")
+async def stream_events():
+    async def event_generator():
+        async for event in orchestrator.stream_events():
+            yield f"data: {json.dumps(event)}\n\n"
 
-@app.get("/api/v1/federated/validate_local")
-async def validate_local_chain():
-    """Local chain validation endpoint for peer nodes."""
-    chain = ledger.get_chain()
-    return {"valid": ledger.validate_chain(chain)}
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
-@app.post("/api/v1/federated/reset_chain")
-async def reset_blockchain():
-    """Reset blockchain to genesis block only. WARNING: Deletes all blocks!"""
-    try:
-        ledger.reset_chain()
-        return {"message": "Blockchain reset to genesis block", "blocks": 1}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to reset chain: {str(e)}")
+class FingerprintCheckPayload(BaseModel):
+    text: str
 
 
-@app.get("/api/v1/federated/decrypt_block/{block_index}")
-async def decrypt_federated_block(block_index: int):
-    """Decrypt a specific block's data (requires proper authorization in production)."""
-    chain = ledger.get_chain()
-    if block_index >= len(chain) or block_index < 0:
-        raise HTTPException(status_code=404, detail="Block not found")
-    
-    block = chain[block_index]
-    try:
-        decrypted = decrypt_data(block.data_encrypted)
-        return {"block_index": block_index, "data": decrypted}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Decryption failed: {str(e)}")
+@app.post("/api/v1/fingerprint/check")
+async def fingerprint_check(payload: FingerprintCheckPayload):
+    matches = orchestrator.check_fingerprint(payload.text)
+    near_duplicates = orchestrator.check_near_duplicates(payload.text)
+    return {"matches": matches, "near_duplicates": [match.dict() for match in near_duplicates]}
 
 
-@app.post("/api/v1/federated/sync_chain")
-async def sync_chain_from_network():
-    """Sync local chain from a trusted peer node (fixes corrupted chains)."""
-    import requests
-    from dataclasses import asdict
-    
-    # Try to get the longest valid chain from peers
-    longest_chain = None
-    max_length = 0
-    
-    for node_url in node.nodes:
-        if node_url != node.my_url:
-            try:
-                resp = requests.get(f"{node_url}/api/v1/federated/chain", timeout=3)
-                data = resp.json()
-                peer_chain = [Block(**b) for b in data["chain"]]
-                
-                # Validate the peer's chain
-                if ledger.validate_chain(peer_chain) and len(peer_chain) > max_length:
-                    longest_chain = peer_chain
-                    max_length = len(peer_chain)
-            except Exception:
-                continue
-    
-    if longest_chain is None:
-        raise HTTPException(status_code=400, detail="No valid chains found in network")
-    
-    # Replace local chain with the longest valid one
-    # WARNING: This deletes and rebuilds the local blockchain!
-    import sqlite3
-    conn = sqlite3.connect(ledger.ledger_db_path)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM blocks")
-    conn.commit()
-    
-    for block in longest_chain:
-        ledger.save_block(block)
-    
-    conn.close()
-    
-    return {
-        "message": "Chain synced successfully",
-        "new_length": len(longest_chain),
-        "synced_from": "network_consensus"
-    }
-
+# ==================== Federated Blockchain Routes ====================
 
-@app.post("/api/v1/federated/reset_chain")
-async def reset_blockchain():
-    """Reset the blockchain to only genesis block. WARNING: Deletes all blocks!"""
-    try:
-        ledger.reset_chain()
-        chain = ledger.get_chain()
-        return {
-            "message": "Blockchain reset to genesis block",
-            "blocks_remaining": len(chain)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to reset chain: {str(e)}")
+app.include_router(create_router(ledger, node))
 
 
 @app.post("/api/v1/image/analyze")
@@ -1,17 +1,39 @@
+import asyncio
 import logging
 import math
 import re
-import statistics
-from collections import Counter
-from typing import Dict, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import chain
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
 
 from ..config import get_settings
 from ..integrations.hf_detector import get_ai_detector
-from ..integrations.ollama_client import OllamaClient
-from ..schemas import ContentIntake, DetectionBreakdown
+from ..integrations.ollama_client import AsyncOllamaClient, OllamaClient
+from ..schemas import ContentIntake, DetectionBreakdown, LexiconHit
+from ..storage.signal_cache import SignalCache
+from .features import FeatureExtractor, TextFeatures
+from .lexicon import ReloadingLexicon
 
 logger = logging.getLogger(__name__)
 
+# Model signals that run alongside feature extraction and may miss the deadline
+SIGNALS = ("ai", "ollama")
+
+
+def _timed(function: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+async def _timed_async(awaitable: Awaitable[Any]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = await awaitable
+    return result, (time.perf_counter() - started) * 1000.0
+
 
 class DetectorEngine:
     """
@@ -53,21 +75,21 @@ class DetectorEngine:
 
     # Valence words for emotional manipulation (positive/negative extremes)
     HIGH_VALENCE_WORDS = {
-        "positive": {"amazing", "incredible", "brilliant", "genius, ", "hero"},
+        "positive": {"amazing", "incredible", "brilliant", "genius", "hero"},
         "negative": {"disaster", "catastrophe", "evil", "corrupt", "traitor", "fake"},
     }
 
-    # Expanded CTA phrases
-    CTA_PATTERNS = [
-        r"click\s+(here|now|link)",
-        r"sign\s+up",
-        r"donate\s+(now|today)",
-        r"forward\s+(this|to)",
-        r"share\s+(this|now)",
-        r"join\s+(us|today)",
-        r"act\s+(now|fast)",
-        r"read\s+(more|full)",
-    ]
+    # Expanded CTA phrases, grouped: each group counts once however many of its phrases match
+    CTA_PHRASES = {
+        "click": ["click here", "click now", "click link"],
+        "sign-up": ["sign up"],
+        "donate": ["donate now", "donate today"],
+        "forward": ["forward this", "forward to"],
+        "share": ["share this", "share now"],
+        "join": ["join us", "join today"],
+        "act": ["act now", "act fast"],
+        "read": ["read more", "read full"],
+    }
 
     def __init__(self) -> None:
         self.settings = get_settings()
@@ -87,6 +109,17 @@ class DetectorEngine:
         }
         self.bias = -0.25  # Slightly less negative bias for balance
 
+        # Urgency/valence/CTA terms compiled into one automaton; LEXICON_PATH adds or overrides categories
+        self.lexicon = ReloadingLexicon(
+            self.builtin_lexicon(),
+            path=self.settings.lexicon_path,
+            reload_seconds=self.settings.lexicon_reload_seconds,
+            max_positions=self.settings.lexicon_max_positions,
+        )
+        self._features = FeatureExtractor(
+            self.FUNCTION_WORDS, self.lexicon, mattr_mode=self.settings.detector_mattr_mode
+        )
+
         self._ai_detector = get_ai_detector()
 
         # Safely initialize Ollama client so the engine doesn't crash if Ollama isn't running
@@ -95,20 +128,280 @@ class DetectorEngine:
         except Exception as e:
             logger.warning(f"Failed to initialize Ollama client: {e}")
             self._ollama_client = None
+        # Awaited by detect_async/detect_batch_async; the sync client above serves detect/detect_batch
+        self._ollama_async = AsyncOllamaClient()
+        # Runs the HF and sync Ollama calls of detect() while the caller extracts features
+        self._signal_pool = ThreadPoolExecutor(
+            max_workers=max(1, self.settings.detector_signal_workers), thread_name_prefix="detector-signal"
+        )
+
+        # Content-hash cache in front of the model calls (copy-paste campaigns)
+        self._cache: Optional[SignalCache] = None
+        if self.settings.detector_cache_enabled:
+            self._cache = SignalCache(
+                max_entries=self.settings.detector_cache_max_entries,
+                ttl_seconds={
+                    "ai": self.settings.detector_cache_ttl_ai,
+                    "family": self.settings.detector_cache_ttl_family,
+                    "ollama": self.settings.detector_cache_ttl_ollama,
+                },
+                model_tags=self._model_tags(),
+                disk_path=self.settings.detector_cache_path or None,
+            )
+
+    @classmethod
+    def builtin_lexicon(cls) -> Dict[str, object]:
+        """Lexicon categories read by the behavioural score, from the class-level word lists."""
+        return {
+            "urgency": sorted(cls.URGENCY_WORDS),
+            "valence_positive": sorted(cls.HIGH_VALENCE_WORDS["positive"]),
+            "valence_negative": sorted(cls.HIGH_VALENCE_WORDS["negative"]),
+            "cta": cls.CTA_PHRASES,
+        }
+
+    def close(self) -> None:
+        """Release background workers held by the model integrations."""
+        self._signal_pool.shutdown(wait=False, cancel_futures=True)
+        close = getattr(self._ai_detector, "close", None)
+        if close is not None:
+            close()
+
+    async def aclose(self) -> None:
+        """Close the async Ollama client's connection pool."""
+        await self._ollama_async.aclose()
+
+    def ollama_stats(self) -> Dict[str, object]:
+        """Concurrency, timeout and error counters of the async Ollama client."""
+        return self._ollama_async.stats()
+
+    def cache_stats(self) -> Dict[str, object]:
+        """Hit/miss/eviction counters of the model signal cache."""
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
 
     def detect(self, intake: ContentIntake) -> Tuple[float, str, DetectionBreakdown]:
+        """
+        Score one intake. The HF and Ollama calls start in the signal pool before
+        features are extracted here; whichever has not finished by
+        DETECTOR_DEADLINE_MS is dropped (left to finish and fill the cache) and
+        the blend renormalizes over the signals that arrived.
+        """
+        started = time.perf_counter()
         text = intake.text
-        features = self._extract_features(text)
+        cache_key = self._cache_key(text)
+        futures = {}
+        if getattr(self._ai_detector, "available", False):
+            futures["ai"] = self._signal_pool.submit(_timed, self._ai_detection, text, cache_key)
+        if self._ollama_client is not None and getattr(self._ollama_client, "available", True):
+            futures["ollama"] = self._signal_pool.submit(_timed, self._ollama_risk_assessment, text, cache_key)
+        features, features_ms = _timed(self._features.extract, text)
+        done = wait(futures.values(), timeout=self._remaining(started))[0] if futures else set()
+        results = {name: future.result() for name, future in futures.items() if future in done}
+        return self._finish(intake, features, features_ms, results, set(futures) - set(results), started)
+
+    async def detect_async(self, intake: ContentIntake) -> Tuple[float, str, DetectionBreakdown]:
+        """
+        ``detect`` for the event loop: the Ollama request is awaited and the
+        CPU-bound features and HF models run in worker threads, all under
+        DETECTOR_DEADLINE_MS. A late Ollama request is cancelled.
+        """
+        started = time.perf_counter()
+        text = intake.text
+        cache_key = self._cache_key(text)
+        tasks = {}
+        if getattr(self._ai_detector, "available", False):
+            tasks["ai"] = asyncio.ensure_future(asyncio.to_thread(_timed, self._ai_detection, text, cache_key))
+        if self._ollama_async.available:
+            tasks["ollama"] = asyncio.ensure_future(_timed_async(self._ollama_risk_async(text, cache_key)))
+        try:
+            features, features_ms = await asyncio.to_thread(_timed, self._features.extract, text)
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=self._remaining(started))
+            results = {name: task.result() for name, task in tasks.items() if task.done()}
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return self._finish(intake, features, features_ms, results, set(tasks) - set(results), started)
+
+    def _remaining(self, started: float) -> Optional[float]:
+        """Seconds left of the detection deadline, or None without one."""
+        if self.settings.detector_deadline_ms <= 0:
+            return None
+        return max(0.0, started + self.settings.detector_deadline_ms / 1000.0 - time.perf_counter())
+
+    def _finish(
+        self,
+        intake: ContentIntake,
+        features: TextFeatures,
+        features_ms: float,
+        results: Dict[str, Tuple[Any, float]],
+        timed_out: Iterable[str],
+        started: float,
+    ) -> Tuple[float, str, DetectionBreakdown]:
+        ai_result, model_family_result = results["ai"][0] if "ai" in results else (None, None)
+        ollama_risk = results["ollama"][0] if "ollama" in results else None
+        timed_out = [name for name in SIGNALS if name in set(timed_out)]
+        if timed_out:
+            logger.warning(f"Detection deadline ({self.settings.detector_deadline_ms} ms) missed by: {timed_out}")
+        timings = {"features": features_ms, **{name: elapsed for name, (_, elapsed) in results.items()}}
+        composite, classification, breakdown = self._compose(
+            intake, features, ai_result, model_family_result, ollama_risk
+        )
+        timings["total"] = (time.perf_counter() - started) * 1000.0
+        breakdown.timed_out_signals = timed_out
+        breakdown.stage_timings_ms = {name: round(elapsed, 3) for name, elapsed in timings.items()}
+        return composite, classification, breakdown
+
+    def detect_batch(
+        self, intakes: List[ContentIntake]
+    ) -> List[Tuple[float, str, DetectionBreakdown]]:
+        """
+        Score many intakes at once.
+
+        The batch's uncached Ollama calls (one per distinct text) start in the
+        signal pool. Feature extraction then runs over the whole batch and the
+        HF detector receives every text in a single padded batch. Ollama answers
+        still missing at DETECTOR_DEADLINE_MS are dropped for their items, which
+        report ``timed_out_signals`` as ``detect`` does. Otherwise per-item
+        results match what ``detect`` would return for each intake on its own.
+        """
+        started = time.perf_counter()
+        texts = [intake.text for intake in intakes]
+        cache_keys = [self._cache_key(text) for text in texts]
+        risks: Dict[int, Optional[float]] = {}
+        pending: Dict[str, List[int]] = {}
+        if self._ollama_client is not None and getattr(self._ollama_client, "available", True):
+            risks, pending = self._cached_ollama_batch(texts, cache_keys)
+        futures = {
+            group: self._signal_pool.submit(self._ollama_risk_assessment, texts[indexes[0]])
+            for group, indexes in pending.items()
+        }
+        features, ai_results = self._batch_models(texts, cache_keys)
+        done = wait(futures.values(), timeout=self._remaining(started))[0] if futures else set()
+        fresh = {}
+        for group, future in futures.items():
+            if future in done:
+                fresh[group] = future.result()
+            else:
+                future.cancel()  # still queued: never sent; already running: left to finish
+        self._store_ollama_batch(cache_keys, pending, fresh)
+        return self._compose_batch(intakes, features, ai_results, risks, pending, fresh)
+
+    async def detect_batch_async(
+        self, intakes: List[ContentIntake]
+    ) -> List[Tuple[float, str, DetectionBreakdown]]:
+        """
+        ``detect_batch`` for the event loop: the batch's uncached Ollama requests
+        are awaited together on the async client (at most OLLAMA_MAX_CONCURRENCY
+        in flight) while features and the HF batch run in a worker thread.
+        Requests still running at DETECTOR_DEADLINE_MS are cancelled.
+        """
+        started = time.perf_counter()
+        texts = [intake.text for intake in intakes]
+        cache_keys = [self._cache_key(text) for text in texts]
+        risks: Dict[int, Optional[float]] = {}
+        pending: Dict[str, List[int]] = {}
+        if self._ollama_async.available:
+            risks, pending = await asyncio.to_thread(self._cached_ollama_batch, texts, cache_keys)
+        tasks = {
+            group: asyncio.ensure_future(self._ollama_async.risk_assessment(texts[indexes[0]]))
+            for group, indexes in pending.items()
+        }
+        try:
+            features, ai_results = await asyncio.to_thread(self._batch_models, texts, cache_keys)
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=self._remaining(started))
+            fresh = {group: task.result() for group, task in tasks.items() if task.done()}
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        await asyncio.to_thread(self._store_ollama_batch, cache_keys, pending, fresh)
+        return self._compose_batch(intakes, features, ai_results, risks, pending, fresh)
+
+    def _batch_models(
+        self, texts: List[str], cache_keys: List[Optional[str]]
+    ) -> Tuple[List[TextFeatures], List[Tuple[Optional[Dict], Optional[Dict]]]]:
+        features = [self._features.extract(text) for text in texts]
+        return features, self._ai_detection_batch(texts, cache_keys)
+
+    def _cached_ollama_batch(
+        self, texts: List[str], cache_keys: List[Optional[str]]
+    ) -> Tuple[Dict[int, Optional[float]], Dict[str, List[int]]]:
+        """Cached Ollama risks by item, and the remaining items grouped by text (repeats are asked once)."""
+        cached: Dict[int, Optional[float]] = {}
+        pending: Dict[str, List[int]] = {}
+        for index, (text, cache_key) in enumerate(zip(texts, cache_keys)):
+            group = cache_key if cache_key is not None else text
+            if group in pending:
+                pending[group].append(index)
+                continue
+            if cache_key is not None:
+                hit, risk = self._cache.get(cache_key, "ollama")
+                if hit:
+                    cached[index] = risk
+                    continue
+            pending[group] = [index]
+        return cached, pending
+
+    def _store_ollama_batch(
+        self, cache_keys: List[Optional[str]], pending: Dict[str, List[int]], fresh: Dict[str, Optional[float]]
+    ) -> None:
+        if self._cache is None:
+            return
+        for group, risk in fresh.items():
+            cache_key = cache_keys[pending[group][0]]
+            # A timeout or outage is not a verdict; only cache real scores
+            if cache_key is not None and risk is not None:
+                self._cache.put(cache_key, "ollama", risk)
+
+    def _compose_batch(
+        self,
+        intakes: List[ContentIntake],
+        features: List[TextFeatures],
+        ai_results: List[Tuple[Optional[Dict], Optional[Dict]]],
+        risks: Dict[int, Optional[float]],
+        pending: Dict[str, List[int]],
+        fresh: Dict[str, Optional[float]],
+    ) -> List[Tuple[float, str, DetectionBreakdown]]:
+        timed_out = set()
+        for group, indexes in pending.items():
+            if group in fresh:
+                risks.update((index, fresh[group]) for index in indexes)
+            else:
+                timed_out.update(indexes)
+        if timed_out:
+            logger.warning(
+                f"Detection deadline ({self.settings.detector_deadline_ms} ms) missed by ollama "
+                f"for {len(timed_out)} of {len(intakes)} batch items"
+            )
+        results = []
+        for index, (intake, feats, (ai_result, family_result)) in enumerate(zip(intakes, features, ai_results)):
+            composite, classification, breakdown = self._compose(
+                intake, feats, ai_result, family_result, risks.get(index)
+            )
+            if index in timed_out:
+                breakdown.timed_out_signals = ["ollama"]
+            results.append((composite, classification, breakdown))
+        return results
 
+    def _compose(
+        self,
+        intake: ContentIntake,
+        text_features: TextFeatures,
+        ai_result: Optional[Dict],
+        model_family_result: Optional[Dict],
+        ollama_risk: Optional[float],
+    ) -> Tuple[float, str, DetectionBreakdown]:
         # 1. Base Stylometric Score
+        features = text_features.stylometric
         stylometric_score = self._score_features(features)
 
         # 2. Heuristics & Behavioral Analysis
         heuristics = self._run_heuristics(intake, features)
-        behavior_score = self._calculate_behavioral_risk(intake, features, heuristics)
+        behavior_score = self._calculate_behavioral_risk(intake, text_features, heuristics)
 
         # 3. AI Detection (Hugging Face / Local Model)
-        ai_result, model_family_result = self._ai_detection(text)
         ai_score: Optional[float] = None
         model_family: Optional[str] = None
         model_family_confidence: Optional[float] = None
@@ -129,7 +422,6 @@ class DetectorEngine:
                 )
 
         # 4. Semantic Risk (Ollama)
-        ollama_risk = self._ollama_risk_assessment(text)
         if ollama_risk is not None:
             heuristics.append(
                 f"Ollama semantic analysis: {ollama_risk:.1%} risk "
@@ -162,83 +454,17 @@ class DetectorEngine:
             ollama_risk=ollama_risk,
             stylometric_anomalies={k: round(v, 3) for k, v in features.items()},
             heuristics=heuristics,
+            lexicon_hits={k: v for k, v in text_features.lexicon.hits.items() if v},
+            lexicon_matches=[
+                LexiconHit(category=m.category, term=m.term, start=m.start, end=m.end)
+                for m in text_features.lexicon.matches
+            ],
         )
 
         return composite, classification, breakdown
 
     def _extract_features(self, text: str) -> Dict[str, float]:
-        tokens = self._tokenize(text)
-        token_count = len(tokens) or 1
-
-        # Sentence segmentation (improved: handle abbreviations better)
-        sentences = re.split(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s", text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sentence_lengths = [len(self._tokenize(s)) for s in sentences]
-        if not sentence_lengths:
-            sentence_lengths = [token_count]
-
-        # Basic Stats
-        avg_token_length = sum(len(t) for t in tokens) / token_count
-
-        # Enhanced Lexical Diversity: MATTR approximation (window=50, robust for short texts)
-        matt_r = self._calculate_mattr(tokens, window=50)
-
-        # Hapax Legomena (words appearing once)
-        counts = Counter(tokens)
-        hapax = sum(1 for _, count in counts.items() if count == 1)
-        hapax_ratio = hapax / token_count
-
-        # Variance statistics
-        try:
-            sentence_length_var = statistics.variance(sentence_lengths)
-        except statistics.StatisticsError:
-            sentence_length_var = 0.0
-
-        # Structural features
-        uppercase_tokens = sum(1 for t in tokens if t.isupper() and len(t) > 1)
-        function_words = sum(1 for t in tokens if t.lower() in self.FUNCTION_WORDS)
-
-        # Repetition Rate (N-gram redundancy)
-        trigrams = list(zip(tokens, tokens[1:], tokens[2:]))
-        if trigrams:
-            unique_trigrams = len(set(trigrams))
-            repetition_rate = 1.0 - (unique_trigrams / len(trigrams))
-        else:
-            repetition_rate = 0.0
-
-        # Character-level Shannon Entropy
-        char_counts = Counter(text)
-        char_probs = [count / len(text) for count in char_counts.values()] if text else []
-        char_entropy = -sum(p * math.log2(p) for p in char_probs) if char_probs else 0.0
-
-        # Readability Proxy (ARI Approximation)
-        char_count = sum(len(t) for t in tokens)
-        avg_chars_per_word = char_count / token_count
-        avg_words_per_sent = token_count / max(len(sentences), 1)
-        readability = (4.71 * avg_chars_per_word) + (0.5 * avg_words_per_sent) - 21.43
-
-        # Punctuation Variety (normalized diversity of ! ? . , ; : etc.)
-        punct_types = set(re.findall(r'[!?.;,:\-–—()"]', text))
-        punct_variety = len(punct_types) / 8.0  # Max 8 common types
-
-        # Vocabulary Richness (HHI proxy: sum (freq^2) normalized; lower = more uniform/AI)
-        freq_squares = sum((count / token_count) ** 2 for count in counts.values())
-        vocabulary_richness = 1.0 - freq_squares  # 1 - HHI, higher = richer
-
-        return {
-            "avg_token_length": avg_token_length,
-            "mattr": matt_r,
-            "hapax_ratio": hapax_ratio,
-            "sentence_length_var": sentence_length_var,
-            "burstiness": self._calculate_burstiness(sentence_lengths),
-            "function_word_ratio": function_words / token_count,
-            "uppercase_ratio": uppercase_tokens / token_count,
-            "repetition_rate": repetition_rate,
-            "entropy": char_entropy,
-            "readability_score": max(0, readability),
-            "punctuation_variety": punct_variety,
-            "vocabulary_richness": vocabulary_richness,
-        }
+        return self._features.extract(text).stylometric
 
     def _score_features(self, features: Dict[str, float]) -> float:
         normalized = self._normalize_features(features)
@@ -250,6 +476,49 @@ class DetectorEngine:
 
         return score
 
+    # Column order of feature_matrix / linguistic_scores (the keys _normalize_features reads)
+    FEATURE_COLUMNS = (
+        "avg_token_length", "mattr", "sentence_length_var", "burstiness", "function_word_ratio",
+        "uppercase_ratio", "repetition_rate", "entropy", "readability_score",
+        "punctuation_variety", "vocabulary_richness",
+    )
+
+    @classmethod
+    def feature_matrix(cls, features: Iterable[Mapping[str, float]]) -> np.ndarray:
+        """(n, len(FEATURE_COLUMNS)) float64 matrix of feature dicts; missing keys become 0 like ``.get``."""
+        rows = features if isinstance(features, list) else list(features)
+        values = np.fromiter(
+            chain.from_iterable((row.get(name, 0) for name in cls.FEATURE_COLUMNS) for row in rows),
+            dtype=np.float64,
+            count=len(rows) * len(cls.FEATURE_COLUMNS),
+        )
+        return values.reshape(len(rows), len(cls.FEATURE_COLUMNS))
+
+    def linguistic_scores(
+        self,
+        features: Union[np.ndarray, Iterable[Mapping[str, float]]],
+        chunk_rows: int = 65536,
+    ) -> np.ndarray:
+        """
+        Columnar ``_sigmoid(_score_features(f))`` for many feature rows, e.g. to
+        re-score stored cases after the weights change.
+
+        Takes feature dicts or a ``feature_matrix``. Normalization, weights, bias
+        and sigmoid run as array operations over chunks of ``chunk_rows`` rows;
+        results agree with the scalar path to floating-point tolerance.
+        """
+        matrix = features if isinstance(features, np.ndarray) else self.feature_matrix(features)
+        scores = np.empty(len(matrix), dtype=np.float64)
+        for start in range(0, len(matrix), max(1, chunk_rows)):
+            normalized = self._normalize_matrix(matrix[start : start + chunk_rows])
+            # Same accumulation order as _score_features
+            linear = np.full(len(normalized["mattr"]), self.bias)
+            for name, weight in self.weights.items():
+                linear += weight * normalized[name]
+            with np.errstate(over="ignore"):
+                scores[start : start + chunk_rows] = 1 / (1 + np.exp(-linear))
+        return scores
+
     def _run_heuristics(
         self,
         intake: ContentIntake,
@@ -300,16 +569,16 @@ class DetectorEngine:
     def _calculate_behavioral_risk(
         self,
         intake: ContentIntake,
-        features: Dict[str, float],
+        text_features: TextFeatures,
         heuristics: List[str],
     ) -> float:
         """
         Calculates a risk score based on intent, urgency, and context.
         Improvements: Regex for CTAs, valence counting, narrative drift, length-aware capping.
+        Lexical counts and coherence come precomputed from the FeatureExtractor pass.
         """
         boost = 0.0
-        text_lower = intake.text.lower()
-        text_len = len(text_lower)
+        text_len = text_features.lowered_length
 
         # 1. Geo-Political Context
         if intake.metadata:
@@ -318,14 +587,9 @@ class DetectorEngine:
                 boost += 0.15
 
         # 2. Urgency & Emotional Manipulation (Enhanced)
-        urgency_hits = sum(1 for word in self.URGENCY_WORDS if word in text_lower)
-        valence_hits = sum(
-            1
-            for group in self.HIGH_VALENCE_WORDS.values()
-            for word in group
-            if word in text_lower
-        )
-        exclamations = text_lower.count("!") + text_lower.count("?")
+        urgency_hits = text_features.urgency_hits
+        valence_hits = text_features.valence_hits
+        exclamations = text_features.exclamations
 
         emotional_boost = min(
             (urgency_hits + valence_hits + exclamations / 4.0) / max(text_len / 120, 1),
@@ -338,8 +602,8 @@ class DetectorEngine:
                 f"{valence_hits} valence words, and {exclamations} exclamations."
             )
 
-        # 3. Call To Action (CTA) Detection (Regex-enhanced)
-        cta_hits = sum(re.search(pattern, text_lower) is not None for pattern in self.CTA_PATTERNS)
+        # 3. Call To Action (CTA) Detection (distinct lexicon groups)
+        cta_hits = text_features.cta_hits
         if cta_hits > 0:
             cta_boost = min(cta_hits * 0.1, 0.2)
             boost += cta_boost
@@ -348,31 +612,18 @@ class DetectorEngine:
             )
 
         # 4. Aggressive Formatting (length-normalized)
-        upper_ratio = features.get("uppercase_ratio", 0)
+        upper_ratio = text_features.stylometric.get("uppercase_ratio", 0)
         if upper_ratio > 0.08:
             boost += min(upper_ratio * 2.5, 0.15)
             heuristics.append("Aggressive use of capitalization.")
 
         # 5. Narrative Alignment & Coherence (topic drift proxy)
-        sentences = re.split(r"[.!?]+", text_lower)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        if len(sentences) > 3:
-            sent_keywords = [set(re.findall(r"\b[a-z]{4,}\b", s)) for s in sentences]
-
-            overlaps = 0.0
-            count_pairs = 0
-            for i, k1 in enumerate(sent_keywords):
-                for k2 in sent_keywords[i + 1 :]:
-                    if k1 or k2:
-                        overlaps += len(k1 & k2) / max(len(k1), len(k2) or 1)
-                        count_pairs += 1
-
-            coherence = overlaps / count_pairs if count_pairs else 1.0
-            if coherence < 0.35:
-                boost += 0.1
-                heuristics.append(
-                    "Low narrative coherence (potential topic drift in disinfo)."
-                )
+        coherence = text_features.coherence
+        if coherence is not None and coherence < 0.35:
+            boost += 0.1
+            heuristics.append(
+                "Low narrative coherence (potential topic drift in disinfo)."
+            )
 
         # Dynamic cap based on text length (short texts less reliable)
         if boost > 0.0:
@@ -404,6 +655,23 @@ class DetectorEngine:
             "vocabulary_richness": features.get("vocabulary_richness", 0),
         }
 
+    def _normalize_matrix(self, matrix: np.ndarray) -> Dict[str, np.ndarray]:
+        """``_normalize_features`` over FEATURE_COLUMNS-ordered rows, one array per feature."""
+        column = {name: matrix[:, index] for index, name in enumerate(self.FEATURE_COLUMNS)}
+        return {
+            "avg_token_length": np.minimum(column["avg_token_length"] / 8.0, 1.0),
+            "mattr": column["mattr"],
+            "sentence_length_var": 1 / (1 + np.exp(-2.0 * (column["sentence_length_var"] / 50.0 - 0.5))),
+            "burstiness": column["burstiness"],
+            "function_word_ratio": np.minimum(column["function_word_ratio"] * 2.0, 1.0),
+            "uppercase_ratio": np.minimum(column["uppercase_ratio"] * 3.0, 1.0),
+            "repetition_rate": np.minimum(column["repetition_rate"] * 5.0, 1.0),
+            "entropy": np.minimum(column["entropy"] / 5.0, 1.0),
+            "readability_score": np.minimum(column["readability_score"] / 20.0, 1.0),
+            "punctuation_variety": column["punctuation_variety"],
+            "vocabulary_richness": column["vocabulary_richness"],
+        }
+
     def _blend_scores(
         self,
         base_prob: float,
@@ -477,39 +745,6 @@ class DetectorEngine:
         # Improved tokenizer that handles contractions slightly better
         return re.findall(r"\b[\w'-]+\b", text)
 
-    @staticmethod
-    def _calculate_burstiness(sentence_lengths: List[int]) -> float:
-        """
-        Calculates coefficient of variation of sentence lengths.
-        High variation = Human (Burstiness). Low variation = AI (Monotony).
-        """
-        if not sentence_lengths or len(sentence_lengths) < 2:
-            return 0.0
-        mean = statistics.mean(sentence_lengths)
-        stdev = statistics.stdev(sentence_lengths)
-        if mean == 0:
-            return 0.0
-        return min(stdev / mean, 1.0)
-
-    @staticmethod
-    def _calculate_mattr(tokens: List[str], window: int = 50) -> float:
-        """Approximate Moving-Average Type-Token Ratio (MATTR) for robust diversity."""
-        if len(tokens) < window:
-            return len(set(tokens)) / len(tokens) if tokens else 0.0
-
-        total_types = 0.0
-        num_windows = 0
-        step = max(window // 2, 1)
-
-        for i in range(0, len(tokens), step):  # Overlapping windows
-            window_tokens = tokens[i : i + window]
-            if window_tokens:
-                types = len(set(window_tokens))
-                total_types += types / len(window_tokens)
-                num_windows += 1
-
-        return total_types / num_windows if num_windows else 0.0
-
     @staticmethod
     def _sigmoid(x: float) -> float:
         return 1 / (1 + math.exp(-x))
@@ -524,20 +759,100 @@ class DetectorEngine:
             return "medium-risk"
         return "low-risk"
 
-    def _ai_detection(self, text: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    def _model_tags(self) -> Dict[str, str]:
+        """Identify the models behind each cached signal; a change invalidates it."""
+        settings = get_settings()
+        hf_tag = f"{settings.hf_model_name}|{getattr(self._ai_detector, '_ai_human_adapter_id', '')}"
+        return {"ai": hf_tag, "family": hf_tag, "ollama": settings.ollama_model}
+
+    def _cache_key(self, text: str) -> Optional[str]:
+        if self._cache is None:
+            return None
+        return self._cache.key_for(text)
+
+    def _ai_detection(
+        self, text: str, cache_key: Optional[str] = None
+    ) -> Tuple[Optional[Dict], Optional[Dict]]:
         if not getattr(self._ai_detector, "available", False):
             return None, None
-        return self._ai_detector.analyze_text(text)
-
-    def _ollama_risk_assessment(self, text: str) -> Optional[float]:
+        if cache_key is None:
+            return self._ai_detector.analyze_text(text)
+
+        hit, ai_result = self._cache.get(cache_key, "ai")
+        if not hit:
+            ai_result, family_result = self._ai_detector.analyze_text(text)
+            self._cache.put(cache_key, "ai", ai_result)
+            self._cache.put(cache_key, "family", family_result)
+            return ai_result, family_result
+        return ai_result, self._cached_family(text, cache_key, ai_result)
+
+    def _ai_detection_batch(
+        self, texts: List[str], cache_keys: Optional[List[Optional[str]]] = None
+    ) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        if not getattr(self._ai_detector, "available", False):
+            return [(None, None)] * len(texts)
+        if self._cache is None or cache_keys is None:
+            return self._ai_detector.analyze_batch(texts)
+
+        results: List[Tuple[Optional[Dict], Optional[Dict]]] = [(None, None)] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for index, (text, cache_key) in enumerate(zip(texts, cache_keys)):
+            if cache_key in pending:
+                pending[cache_key].append(index)
+                continue
+            hit, ai_result = self._cache.get(cache_key, "ai")
+            if hit:
+                results[index] = (ai_result, self._cached_family(text, cache_key, ai_result))
+            else:
+                pending[cache_key] = [index]
+
+        # Repeats within the batch are scored once
+        if pending:
+            fresh = self._ai_detector.analyze_batch([texts[indexes[0]] for indexes in pending.values()])
+            for (cache_key, indexes), (ai_result, family_result) in zip(pending.items(), fresh):
+                self._cache.put(cache_key, "ai", ai_result)
+                self._cache.put(cache_key, "family", family_result)
+                for index in indexes:
+                    results[index] = (ai_result, family_result)
+        return results
+
+    def _cached_family(self, text: str, cache_key: str, ai_result: Optional[Dict]) -> Optional[Dict]:
+        if not ai_result or not ai_result.get("is_ai", False):
+            return None
+        hit, family_result = self._cache.get(cache_key, "family")
+        if not hit:
+            family_result = self._ai_detector.detect_model_family(text)
+            self._cache.put(cache_key, "family", family_result)
+        return family_result
+
+    async def _ollama_risk_async(self, text: str, cache_key: Optional[str] = None) -> Optional[float]:
+        """``_ollama_risk_assessment`` over the async client; cache lookups may touch disk, so run in a thread."""
+        if cache_key is not None:
+            hit, risk = await asyncio.to_thread(self._cache.get, cache_key, "ollama")
+            if hit:
+                return risk
+        risk = await self._ollama_async.risk_assessment(text)
+        # A timeout or outage is not a verdict; only cache real scores
+        if cache_key is not None and risk is not None:
+            await asyncio.to_thread(self._cache.put, cache_key, "ollama", risk)
+        return risk
+
+    def _ollama_risk_assessment(self, text: str, cache_key: Optional[str] = None) -> Optional[float]:
         """
         Use Ollama for semantic/contextual risk assessment.
         Returns risk score 0.0-1.0 if available, None otherwise.
         """
         if self._ollama_client is None:
             return None
+        if cache_key is not None:
+            hit, risk = self._cache.get(cache_key, "ollama")
+            if hit:
+                return risk
         try:
-            return self._ollama_client.risk_assessment(text)
+            risk = self._ollama_client.risk_assessment(text)
         except Exception as e:
             logger.warning(f"Ollama risk assessment failed: {e}")
             return None
+        if cache_key is not None:
+            self._cache.put(cache_key, "ollama", risk)
+        return risk
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import math
+import re
+import statistics
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from .lexicon import LexiconScan, ReloadingLexicon
+
+_TOKEN_RE = re.compile(r"\b[\w'-]+\b")
+# Sentence split of the stylometric features (keeps abbreviations together)
+_SENTENCE_RE = re.compile(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s")
+# Coarser split and keyword pattern of the narrative coherence check
+_CLAUSE_RE = re.compile(r"[.!?]+")
+_KEYWORD_RE = re.compile(r"\b[a-z]{4,}\b")
+_PUNCTUATION = frozenset('!?.;,:-–—()"')
+
+MATTR_MODES = ("legacy", "exact")
+
+# Below this many sentences the pairwise loop beats building the incidence matrix
+_MATRIX_MIN_SENTENCES = 24
+_MATRIX_ROW_BLOCK = 256
+
+
+@dataclass
+class TextFeatures:
+    """Everything DetectorEngine derives from the text alone, computed once per intake."""
+
+    stylometric: Dict[str, float]
+    lexicon: LexiconScan
+    urgency_hits: int
+    valence_hits: int
+    exclamations: int
+    cta_hits: int
+    lowered_length: int
+    # Mean keyword overlap between clause pairs; None when there are 3 clauses or fewer
+    coherence: Optional[float]
+
+
+class FeatureExtractor:
+    """
+    Single-pass stylometric and behavioural feature extraction.
+
+    The text is split into sentences once and each sentence is tokenized once:
+    tokens never cross a sentence split (it consumes a whitespace character), so
+    the concatenated sentence tokens are the tokens of the whole text and their
+    counts are the sentence lengths. One Counter over the tokens feeds hapax,
+    uppercase, function-word, length and richness statistics, and one Counter
+    over the characters feeds entropy, punctuation variety and exclamations.
+
+    Urgency, valence and call-to-action terms come from one scan of the
+    lexicon automaton. Clause coherence (pairwise keyword overlap of the
+    lowercased text) uses a clause-by-keyword incidence matrix for long texts
+    instead of a Python loop over every clause pair.
+
+    Stylometric results are the same numbers as the original per-feature
+    passes, including the order of floating-point sums.
+    """
+
+    def __init__(
+        self, function_words: Iterable[str], lexicon: ReloadingLexicon, mattr_mode: str = "legacy"
+    ) -> None:
+        if mattr_mode not in MATTR_MODES:
+            raise ValueError(f"mattr_mode must be one of {MATTR_MODES}, got {mattr_mode!r}")
+        self.function_words = frozenset(function_words)
+        self.lexicon = lexicon
+        self._mattr = exact_mattr if mattr_mode == "exact" else mattr
+
+    def extract(self, text: str) -> TextFeatures:
+        char_counts = Counter(text)
+        lowered = text.lower()
+        scan = self.lexicon.scan(text)
+        return TextFeatures(
+            stylometric=self._stylometric(text, char_counts),
+            lexicon=scan,
+            urgency_hits=scan.hits.get("urgency", 0),
+            valence_hits=scan.hits.get("valence_positive", 0) + scan.hits.get("valence_negative", 0),
+            # Lowercasing never adds or removes "!" or "?"
+            exclamations=char_counts["!"] + char_counts["?"],
+            cta_hits=scan.hits.get("cta", 0),
+            lowered_length=len(lowered),
+            coherence=self._coherence(lowered),
+        )
+
+    def _stylometric(self, text: str, char_counts: Counter) -> Dict[str, float]:
+        tokens: List[str] = []
+        sentence_lengths: List[int] = []
+        for sentence in _SENTENCE_RE.split(text):
+            sentence_tokens = _TOKEN_RE.findall(sentence)
+            if sentence_tokens:
+                tokens.extend(sentence_tokens)
+                sentence_lengths.append(len(sentence_tokens))
+            elif sentence and not sentence.isspace():
+                sentence_lengths.append(0)
+        sentence_count = len(sentence_lengths)
+        token_count = len(tokens) or 1
+        if not sentence_lengths:
+            sentence_lengths = [token_count]
+
+        counts = Counter(tokens)
+        char_count = 0
+        hapax = 0
+        uppercase_tokens = 0
+        function_words = 0
+        for token, count in counts.items():
+            char_count += len(token) * count
+            if count == 1:
+                hapax += 1
+            if len(token) > 1 and token.isupper():
+                uppercase_tokens += count
+            if token.lower() in self.function_words:
+                function_words += count
+        # sum() rather than += : float sum() is compensated on Python 3.12+
+        freq_squares = sum((count / token_count) ** 2 for count in counts.values())
+
+        if len(tokens) >= 3:
+            trigrams = len(tokens) - 2
+            unique_trigrams = len(set(zip(tokens, islice(tokens, 1, None), islice(tokens, 2, None))))
+            repetition_rate = 1.0 - (unique_trigrams / trigrams)
+        else:
+            repetition_rate = 0.0
+
+        try:
+            sentence_length_var = statistics.variance(sentence_lengths)
+        except statistics.StatisticsError:
+            sentence_length_var = 0.0
+
+        char_probs = [count / len(text) for count in char_counts.values()] if text else []
+        char_entropy = -sum(p * math.log2(p) for p in char_probs) if char_probs else 0.0
+
+        avg_chars_per_word = char_count / token_count
+        avg_words_per_sent = token_count / max(sentence_count, 1)
+        readability = (4.71 * avg_chars_per_word) + (0.5 * avg_words_per_sent) - 21.43
+
+        return {
+            "avg_token_length": char_count / token_count,
+            "mattr": self._mattr(tokens, window=50),
+            "hapax_ratio": hapax / token_count,
+            "sentence_length_var": sentence_length_var,
+            "burstiness": burstiness(sentence_lengths),
+            "function_word_ratio": function_words / token_count,
+            "uppercase_ratio": uppercase_tokens / token_count,
+            "repetition_rate": repetition_rate,
+            "entropy": char_entropy,
+            "readability_score": max(0, readability),
+            "punctuation_variety": len(_PUNCTUATION.intersection(char_counts)) / 8.0,
+            "vocabulary_richness": 1.0 - freq_squares,
+        }
+
+    @staticmethod
+    def _coherence(lowered: str) -> Optional[float]:
+        clauses = [clause.strip() for clause in _CLAUSE_RE.split(lowered)]
+        keywords = [set(_KEYWORD_RE.findall(clause)) for clause in clauses if clause]
+        if len(keywords) <= 3:
+            return None
+        if len(keywords) < _MATRIX_MIN_SENTENCES:
+            return _pairwise_coherence(keywords)
+        return _matrix_coherence(keywords)
+
+
+def _pairwise_coherence(keywords: List[Set[str]]) -> float:
+    overlaps = 0.0
+    count_pairs = 0
+    for i, k1 in enumerate(keywords):
+        for k2 in keywords[i + 1 :]:
+            if k1 or k2:
+                overlaps += len(k1 & k2) / max(len(k1), len(k2) or 1)
+                count_pairs += 1
+    return overlaps / count_pairs if count_pairs else 1.0
+
+
+def _matrix_coherence(keywords: List[Set[str]]) -> float:
+    """``_pairwise_coherence`` with pair intersections from incidence-matrix products."""
+    n = len(keywords)
+    sizes = np.fromiter((len(k) for k in keywords), dtype=np.int64, count=n)
+    empty = int((sizes == 0).sum())
+    # Pairs of two keyword-less clauses are skipped by the loop
+    count_pairs = n * (n - 1) // 2 - empty * (empty - 1) // 2
+    if not count_pairs:
+        return 1.0
+
+    # Keywords in a single clause never contribute to an intersection
+    frequency = Counter(word for k in keywords for word in k)
+    columns: Dict[str, int] = {}
+    for word, count in frequency.items():
+        if count > 1:
+            columns[word] = len(columns)
+    rows: List[int] = []
+    cells: List[int] = []
+    for row, k in enumerate(keywords):
+        for word in k:
+            column = columns.get(word)
+            if column is not None:
+                rows.append(row)
+                cells.append(column)
+    if not rows:
+        return 0.0
+    incidence = np.zeros((n, len(columns)), dtype=np.float32)
+    incidence[rows, cells] = 1.0
+
+    # Pairs sharing no keyword add exactly 0.0, so only the others are summed.
+    # Row blocks bound memory; nonzero() yields pairs in the loop's (i, j > i)
+    # order and cumsum adds left to right, so the rounding matches the loop.
+    total = 0.0
+    for start in range(0, n - 1, _MATRIX_ROW_BLOCK):
+        # float32 counts are exact far beyond any clause's keyword count
+        shared = np.triu(incidence[start : start + _MATRIX_ROW_BLOCK] @ incidence.T, start + 1)
+        first, second = np.nonzero(shared)
+        if len(first):
+            ratios = shared[first, second].astype(np.int64) / np.maximum(sizes[first + start], sizes[second])
+            total = float(np.cumsum(np.concatenate(([total], ratios)))[-1])
+    return total / count_pairs
+
+
+def burstiness(sentence_lengths: List[int]) -> float:
+    """
+    Calculates coefficient of variation of sentence lengths.
+    High variation = Human (Burstiness). Low variation = AI (Monotony).
+    """
+    if not sentence_lengths or len(sentence_lengths) < 2:
+        return 0.0
+    mean = statistics.mean(sentence_lengths)
+    stdev = statistics.stdev(sentence_lengths)
+    if mean == 0:
+        return 0.0
+    return min(stdev / mean, 1.0)
+
+
+def mattr(tokens: List[str], window: int = 50) -> float:
+    """
+    Approximate Moving-Average Type-Token Ratio (MATTR) for robust diversity.
+
+    Windows advance by half their width and the trailing ones are truncated, so
+    this is not the textbook MATTR; it is the "legacy" mode that historical
+    scores were computed with.
+    """
+    if len(tokens) < window:
+        return len(set(tokens)) / len(tokens) if tokens else 0.0
+
+    total_types = 0.0
+    num_windows = 0
+    step = max(window // 2, 1)
+
+    for i in range(0, len(tokens), step):  # Overlapping windows
+        window_tokens = tokens[i : i + window]
+        if window_tokens:
+            types = len(set(window_tokens))
+            total_types += types / len(window_tokens)
+            num_windows += 1
+
+    return total_types / num_windows if num_windows else 0.0
+
+
+def exact_mattr(tokens: List[str], window: int = 50) -> float:
+    """
+    Exact MATTR: mean type-token ratio over every full window at step 1.
+
+    One pass with a rolling token count map, so it costs O(n) whatever the
+    window. Texts shorter than the window use their plain type-token ratio,
+    as ``mattr`` does.
+    """
+    if len(tokens) < window:
+        return len(set(tokens)) / len(tokens) if tokens else 0.0
+
+    counts: Dict[str, int] = {}
+    for token in tokens[:window]:
+        counts[token] = counts.get(token, 0) + 1
+    types = len(counts)
+    total_types = types
+    for leaving, entering in zip(tokens, islice(tokens, window, None)):
+        if leaving != entering:
+            remaining = counts[leaving] - 1
+            if remaining:
+                counts[leaving] = remaining
+            else:
+                del counts[leaving]
+                types -= 1
+            seen = counts.get(entering, 0)
+            if not seen:
+                types += 1
+            counts[entering] = seen + 1
+        total_types += types
+    windows = len(tokens) - window + 1
+    return total_types / (windows * window)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+class Component:
+    """Aggregates for one connected component, kept on its union-find root."""
+
+    __slots__ = ("first", "size", "score_sum", "members")
+
+    def __init__(self, first: int, node: str, kind: str) -> None:
+        self.first = first  # insertion sequence of the earliest member
+        self.size = 1
+        self.score_sum = 0.0
+        self.members: Dict[str, List[str]] = {kind: [node]}
+
+    def of_kind(self, kind: str) -> List[str]:
+        return self.members.get(kind, [])
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.size if self.size else 0.0
+
+
+class ComponentTracker:
+    """
+    Disjoint-set forest over graph slots, maintained as edges are added.
+
+    Edges are never removed during ingest, so components only ever merge there.
+    Retention eviction is the exception: it retires the affected components and
+    ``split`` rebuilds them from the surviving adjacency. Each
+    root carries its members grouped by node kind (the ``kind::`` prefix) and a
+    running sum of member GNN scores, so community and cluster snapshots cost
+    O(components) instead of a full ``nx.connected_components`` traversal.
+    Components are yielded in the order networkx would produce them: by the
+    earliest-inserted member.
+    """
+
+    KINDS = ("content", "actor", "narrative", "region")
+
+    def __init__(self) -> None:
+        self._parent: List[int] = []
+        self._seq: List[int] = []
+        self._components: Dict[int, Component] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._components)
+
+    def add(self, slot: int, node: str) -> None:
+        """Register ``node`` (stored at index ``slot``) as a singleton component."""
+        while len(self._parent) <= slot:
+            self._parent.append(len(self._parent))
+            self._seq.append(-1)
+        self._parent[slot] = slot
+        self._seq[slot] = self._next_seq
+        self._components[slot] = Component(self._next_seq, node, self.kind_of(node))
+        self._next_seq += 1
+
+    def find(self, slot: int) -> int:
+        parent = self._parent
+        root = slot
+        while parent[root] != root:
+            root = parent[root]
+        while parent[slot] != root:
+            parent[slot], slot = root, parent[slot]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the components of ``a`` and ``b``; returns the surviving root."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        big, small = self._components[root_a], self._components[root_b]
+        if big.size < small.size:
+            root_a, root_b, big, small = root_b, root_a, small, big
+        self._parent[root_b] = root_a
+        big.size += small.size
+        big.score_sum += small.score_sum
+        big.first = min(big.first, small.first)
+        for kind, nodes in small.members.items():
+            big.members.setdefault(kind, []).extend(nodes)
+        del self._components[root_b]
+        return root_a
+
+    def members_of(self, root: int) -> Iterator[str]:
+        for nodes in self._components[root].members.values():
+            yield from nodes
+
+    def retire(self, roots: Iterable[int]) -> None:
+        """Forget components that are about to be rebuilt by ``split``."""
+        for root in roots:
+            self._components.pop(root, None)
+
+    def split(
+        self,
+        slots: Iterable[int],
+        neighbors: Sequence[Set[int]],
+        nodes: Sequence[Optional[str]],
+        scores: Sequence[float],
+    ) -> None:
+        """Re-derive components for ``slots`` (the survivors of retired components) by BFS."""
+        pending = set(slots)
+        for start in sorted(pending, key=self._seq.__getitem__):
+            if start not in pending:
+                continue
+            pending.discard(start)
+            members = [start]
+            for slot in members:
+                for neighbor in neighbors[slot]:
+                    if neighbor in pending:
+                        pending.discard(neighbor)
+                        members.append(neighbor)
+            members.sort(key=self._seq.__getitem__)
+            root = members[0]
+            component = Component(self._seq[root], nodes[root], self.kind_of(nodes[root]))
+            component.size = len(members)
+            component.score_sum = sum(scores[slot] for slot in members)
+            self._parent[root] = root
+            for slot in members[1:]:
+                self._parent[slot] = root
+                node = nodes[slot]
+                component.members.setdefault(self.kind_of(node), []).append(node)
+            self._components[root] = component
+
+    def add_score(self, slot: int, delta: float) -> None:
+        self._components[self.find(slot)].score_sum += delta
+
+    def component_of(self, slot: int) -> Component:
+        return self._components[self.find(slot)]
+
+    def components(self) -> Iterator[Component]:
+        return iter(sorted(self._components.values(), key=lambda component: component.first))
+
+    @classmethod
+    def kind_of(cls, node: str) -> str:
+        kind = node.split("::", 1)[0]
+        return kind if kind in cls.KINDS and kind != node else "other"
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class GraphIndex:
+    """
+    Persistent node index with incrementally maintained two-hop GNN scores.
+
+    Each node keeps a stable integer slot; adjacency is stored sparsely as a
+    neighbour set per slot, so memory is O(V + E) instead of the dense V x V
+    matrix. The projection computed here is the same as the original dense one:
+
+        neigh_i = mean(feat_j . w_n for j in N(i))
+        ctx_i   = 0.5 * mean(neigh_j for j in N(i))
+        score_i = sigmoid(feat_i . w_f + neigh_i + ctx_i + bias)
+
+    Neighbour sums are updated by deltas when a node's features change or an
+    edge is added, and only the nodes whose inputs moved (at most two hops
+    away) are marked dirty and re-scored on the next ``flush``.
+    """
+
+    def __init__(
+        self,
+        feature_weights: Sequence[float],
+        neighbor_weights: Sequence[float],
+        bias: float,
+    ) -> None:
+        self.feature_weights = tuple(float(w) for w in feature_weights)
+        self.neighbor_weights = tuple(float(w) for w in neighbor_weights)
+        self.bias = float(bias)
+
+        self.nodes: List[Optional[str]] = []
+        self.index: Dict[str, int] = {}
+        self.neighbors: List[Set[int]] = []
+        self.features: List[Tuple[float, ...]] = []
+        self.scores: List[float] = []
+        self._base: List[float] = []  # feat_i . w_f
+        self._proj: List[float] = []  # feat_i . w_n
+        self._nsum: List[float] = []  # sum of proj over neighbours
+        self._neigh: List[float] = []  # nsum / degree
+        self._csum: List[float] = []  # sum of neigh over neighbours
+        self._dirty: Set[int] = set()
+        self._free: List[int] = []
+        self._bulk = False
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.index
+
+    def get(self, node: str, default: float = 0.0) -> float:
+        """Current GNN score of ``node`` (``default`` for unknown nodes)."""
+        idx = self.index.get(node)
+        if idx is None:
+            return default
+        if idx in self._dirty:
+            # Running sums are always current; only the cached score is stale.
+            return self._score(idx)
+        return self.scores[idx]
+
+    @contextmanager
+    def bulk_load(self):
+        """Defer all running-sum maintenance to one ``recompute_all`` at the end."""
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            self.recompute_all()
+
+    def upsert(self, node: str, features: Sequence[float]) -> int:
+        """Add ``node`` or replace its feature row, propagating the change to its neighbours."""
+        idx = self.index.get(node)
+        if idx is None:
+            idx = self._allocate(node)
+        features = tuple(float(value) for value in features)
+        if self.features[idx] == features:
+            return idx
+        if self._bulk:
+            self.features[idx] = features
+            return idx
+
+        old_proj = self._proj[idx]
+        self.features[idx] = features
+        self._base[idx] = self._dot(features, self.feature_weights)
+        self._proj[idx] = self._dot(features, self.neighbor_weights)
+        self._dirty.add(idx)
+
+        delta = self._proj[idx] - old_proj
+        if delta:
+            for u in self.neighbors[idx]:
+                self._nsum[u] += delta
+                self._refresh_neigh(u)
+        return idx
+
+    def add_edge(self, source: str, target: str) -> bool:
+        """Link two indexed nodes; returns False if the edge already existed."""
+        i = self.index[source]
+        j = self.index[target]
+        if i == j or j in self.neighbors[i]:
+            return False
+        self.neighbors[i].add(j)
+        self.neighbors[j].add(i)
+        if self._bulk:
+            return True
+        # Each endpoint now sees the other's current projection and neighbour mean;
+        # _refresh_neigh then pushes the endpoints' own changes outwards.
+        self._nsum[i] += self._proj[j]
+        self._nsum[j] += self._proj[i]
+        self._csum[i] += self._neigh[j]
+        self._csum[j] += self._neigh[i]
+        self._refresh_neigh(i)
+        self._refresh_neigh(j)
+        return True
+
+    def remove_edge(self, source: str, target: str) -> bool:
+        """Unlink two indexed nodes; the exact inverse of ``add_edge``."""
+        i = self.index[source]
+        j = self.index[target]
+        if j not in self.neighbors[i]:
+            return False
+        self.neighbors[i].discard(j)
+        self.neighbors[j].discard(i)
+        self._nsum[i] -= self._proj[j]
+        self._nsum[j] -= self._proj[i]
+        self._csum[i] -= self._neigh[j]
+        self._csum[j] -= self._neigh[i]
+        self._refresh_neigh(i)
+        self._refresh_neigh(j)
+        return True
+
+    def remove_node(self, node: str) -> Optional[int]:
+        """Drop ``node`` and its edges; its slot is recycled. Returns the freed slot."""
+        idx = self.index.get(node)
+        if idx is None:
+            return None
+        for j in list(self.neighbors[idx]):
+            self.remove_edge(node, self.nodes[j])
+        del self.index[node]
+        self.nodes[idx] = None
+        self._dirty.discard(idx)
+        self._free.append(idx)
+        return idx
+
+    def flush(self) -> Dict[int, float]:
+        """Re-score dirty nodes; returns ``{slot: score change}`` for the recomputed slots."""
+        dirty, self._dirty = self._dirty, set()
+        changes: Dict[int, float] = {}
+        for i in dirty:
+            if self.nodes[i] is None:
+                continue
+            score = self._score(i)
+            changes[i] = score - self.scores[i]
+            self.scores[i] = score
+        return changes
+
+    def recompute_all(self) -> None:
+        """Rebuild every running sum from scratch and mark all nodes for re-scoring."""
+        live = [i for i, node in enumerate(self.nodes) if node is not None]
+        for i in live:
+            self._base[i] = self._dot(self.features[i], self.feature_weights)
+            self._proj[i] = self._dot(self.features[i], self.neighbor_weights)
+        for i in live:
+            self._nsum[i] = sum(self._proj[j] for j in self.neighbors[i])
+            self._neigh[i] = self._nsum[i] / max(len(self.neighbors[i]), 1)
+        for i in live:
+            self._csum[i] = sum(self._neigh[j] for j in self.neighbors[i])
+        self._dirty = set(live)
+
+    def items(self) -> Iterable[Tuple[str, float]]:
+        # Leaves dirty slots for flush so its callers still see every score change
+        for node, idx in self.index.items():
+            yield node, self._score(idx) if idx in self._dirty else self.scores[idx]
+
+    def _allocate(self, node: str) -> int:
+        if self._free:
+            idx = self._free.pop()
+            self.nodes[idx] = node
+            self.neighbors[idx] = set()
+            self.features[idx] = ()
+            for column in (self.scores, self._base, self._proj, self._nsum, self._neigh, self._csum):
+                column[idx] = 0.0
+        else:
+            idx = len(self.nodes)
+            self.nodes.append(node)
+            self.neighbors.append(set())
+            self.features.append(())
+            for column in (self.scores, self._base, self._proj, self._nsum, self._neigh, self._csum):
+                column.append(0.0)
+        self.index[node] = idx
+        return idx
+
+    def _refresh_neigh(self, u: int) -> None:
+        new = self._nsum[u] / max(len(self.neighbors[u]), 1)
+        self._dirty.add(u)
+        delta = new - self._neigh[u]
+        if not delta:
+            return
+        self._neigh[u] = new
+        neighbors = self.neighbors[u]
+        for w in neighbors:
+            self._csum[w] += delta
+        self._dirty.update(neighbors)
+
+    def _score(self, i: int) -> float:
+        degree = max(len(self.neighbors[i]), 1)
+        logit = self._base[i] + self._neigh[i] + 0.5 * self._csum[i] / degree + self.bias
+        return 1.0 / (1.0 + math.exp(-logit))
+
+    @staticmethod
+    def _dot(values: Sequence[float], weights: Sequence[float]) -> float:
+        return sum(value * weight for value, weight in zip(values, weights))
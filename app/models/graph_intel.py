@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import bisect
+import gc
 import hashlib
+import heapq
+import itertools
 import json
-from datetime import datetime
-from typing import Dict, List, Tuple
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import networkx as nx
 
-try:  # pragma: no cover - torch is optional during docs build
-    import torch
-except Exception:  # noqa: BLE001
-    torch = None  # type: ignore
-
 from ..schemas import (
     CommunitySnapshot,
     ContentIntake,
@@ -22,19 +24,132 @@ from ..schemas import (
     SIEMCorrelationPayload,
     ThreatIntelFeed,
 )
+from ..storage.graph_store import GraphStore, fold_records
+from .graph_components import ComponentTracker
+from .graph_index import GraphIndex
+from .graph_topk import TopK
+from .simhash import SimHashIndex, simhash64
 
 
 class GraphIntelEngine:
-    def __init__(self) -> None:
+    FEATURE_WEIGHTS = (0.4, 0.9, 0.3, 0.2, 1.1)
+    NEIGHBOR_WEIGHTS = (0.2, 0.6, 0.2, 0.2, 0.8)
+    GNN_BIAS = 0.05
+
+    def __init__(
+        self,
+        refresh_interval: float = 1.0,
+        store: Optional[GraphStore] = None,
+        retention_days: float = 0.0,
+        max_content: int = 0,
+        sweep_interval: float = 60.0,
+        simhash_max_distance: Optional[int] = 5,
+        simhash_blocks: int = 6,
+        simhash_min_tokens: int = 8,
+        near_duplicate_links: int = 5,
+    ) -> None:
         self.graph = nx.Graph()
-        if torch:
-            self._feature_weights = torch.tensor([0.4, 0.9, 0.3, 0.2, 1.1], dtype=torch.float32)
-            self._neighbor_weights = torch.tensor([0.2, 0.6, 0.2, 0.2, 0.8], dtype=torch.float32)
-            self._gnn_bias = torch.tensor(0.05, dtype=torch.float32)
-        else:  # pragma: no cover - fallback when torch missing
-            self._feature_weights = None
-            self._neighbor_weights = None
-            self._gnn_bias = None
+        # GNN scores are maintained incrementally alongside the graph
+        self._index = GraphIndex(self.FEATURE_WEIGHTS, self.NEIGHBOR_WEIGHTS, self.GNN_BIAS)
+        # Connected components only merge during ingest, so a union-find tracks them
+        self._components = ComponentTracker()
+
+        # Typed adjacency (dicts used as insertion-ordered sets) kept current by ingest
+        self._order: Dict[str, int] = {}
+        self._order_seq = 0
+        self._actor_content: Dict[str, Dict[str, None]] = {}
+        # actor -> sum of its content's scores, the neighbour average behind high-risk actors
+        self._actor_content_score: Dict[str, float] = {}
+        self._content_actors: Dict[str, Dict[str, None]] = {}
+        self._content_narratives: Dict[str, Dict[str, None]] = {}
+        self._narrative_content: Dict[str, Dict[str, None]] = {}
+        # narrative -> {actor: number of the actor's content targeting it}
+        self._narrative_actors: Dict[str, Dict[str, int]] = {}
+        # Copy-pasta: content within simhash_max_distance bits is joined by near_duplicate edges
+        self._content_near: Dict[str, Dict[str, None]] = {}
+        self._simhash = (
+            SimHashIndex(simhash_max_distance, simhash_blocks) if simhash_max_distance is not None else None
+        )
+        self._simhash_min_tokens = simhash_min_tokens
+        self._near_duplicate_links = max(0, near_duplicate_links)
+        # Alerts are re-evaluated only for actors whose inputs moved
+        self._alerts = TopK()
+        self._alert_dirty: Set[str] = set()
+        # High-risk actors are ranked the same way, from the per-actor content score sums
+        self._risk = TopK()
+        self._risk_dirty: Set[str] = set()
+        self._chain_narratives: List[Tuple[int, str]] = []
+        self._lock = threading.RLock()
+
+        # Bumped on every ingest; memoized results are keyed by the counters they read
+        self._version = 0
+        self._topology_version = 0
+        self._score_version = 0
+        self._memo: Dict[str, Tuple[Any, Any]] = {}
+
+        # Last published summary for readers that accept bounded staleness
+        self._refresh_interval = max(0.05, float(refresh_interval))
+        self._refresh_cond = threading.Condition()
+        self._snapshot: Optional[Tuple[int, GraphSummary]] = None
+        self._stale_since: Optional[float] = None
+        self._refresher: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Sliding-window retention: content nodes queued by ingest timestamp
+        self.retention_days = max(0.0, float(retention_days))
+        self.max_content = max(0, int(max_content))
+        self._sweep_interval = max(0.0, float(sweep_interval))
+        self._next_sweep = 0.0
+        self._content_ts: Dict[str, str] = {}
+        self._content_queue: "deque[Tuple[str, str]]" = deque()
+        self._retention: Dict[str, float] = {
+            "sweeps": 0,
+            "evicted_content": 0,
+            "evicted_actors": 0,
+            "evicted_narratives": 0,
+            "evicted_regions": 0,
+            "last_sweep_ms": 0.0,
+        }
+
+        # Optional mutation log + snapshots; the graph is rebuilt from it on startup
+        self._store = store
+        self.restore_seconds = 0.0
+        if store is not None:
+            self._restore()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def close(self) -> None:
+        """Stop the background summary refresher, if it was started."""
+        with self._refresh_cond:
+            self._closed = True
+            self._refresh_cond.notify_all()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+        if self._store is not None:
+            with self._lock:
+                self._store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "nodes": self.graph.number_of_nodes(),
+                "edges": self.graph.number_of_edges(),
+                "components": len(self._components),
+                "version": self._version,
+                "content_nodes": len(self._content_ts),
+                "simhash": self._simhash.stats() if self._simhash is not None else None,
+                "restore_seconds": self.restore_seconds,
+                "retention": {
+                    "retention_days": self.retention_days,
+                    "max_content": self.max_content,
+                    **self._retention,
+                },
+                "store": self._store.stats() if self._store is not None else None,
+            }
 
     def ingest(
         self,
@@ -43,12 +158,234 @@ class GraphIntelEngine:
         classification: str,
         composite_score: float,
     ) -> GraphSummary:
+        with self._lock:
+            self._add_intake(intake_id, intake, classification, composite_score)
+            self._maybe_evict()
+            self._persist()
+            return self._summarise()
+
+    def ingest_many(
+        self, entries: Iterable[Tuple[str, ContentIntake, str, float]]
+    ) -> GraphSummary:
+        """Ingest ``(intake_id, intake, classification, score)`` tuples, summarising once."""
+        with self._lock:
+            for intake_id, intake, classification, composite_score in entries:
+                self._add_intake(intake_id, intake, classification, composite_score)
+            self._maybe_evict()
+            self._persist()
+            return self._summarise()
+
+    def evict(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Run a retention sweep immediately; returns the number of nodes removed by kind."""
+        with self._lock:
+            removed = self._evict(now or datetime.utcnow(), self.max_content)
+            self._persist()
+            return removed
+
+    def _maybe_evict(self) -> None:
+        if not (self.retention_days or self.max_content):
+            return
+        # A little slack above the cap batches evictions instead of splitting
+        # components on every ingest once the cap is reached
+        over_cap = self.max_content and len(self._content_ts) > self.max_content + max(
+            1, self.max_content // 20
+        )
+        if over_cap or (self.retention_days and time.monotonic() >= self._next_sweep):
+            self._next_sweep = time.monotonic() + self._sweep_interval
+            self._evict(datetime.utcnow(), self.max_content)
+
+    def _evict(self, now: datetime, max_content: int) -> Dict[str, int]:
+        started = time.perf_counter()
+        cutoff = (now - timedelta(days=self.retention_days)).isoformat() if self.retention_days else None
+        expired: List[str] = []
+        remaining = len(self._content_ts)
+        while self._content_queue:
+            ts, content = self._content_queue[0]
+            if self._content_ts.get(content) != ts:
+                self._content_queue.popleft()  # re-ingested since; a newer entry exists
+                continue
+            if (cutoff is not None and ts < cutoff) or (max_content and remaining > max_content):
+                self._content_queue.popleft()
+                expired.append(content)
+                remaining -= 1
+            else:
+                break
+        removed = self._remove_content(expired)
+        self._retention["sweeps"] += 1
+        for kind, count in removed.items():
+            self._retention[f"evicted_{kind}"] += count
+        self._retention["last_sweep_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        return removed
+
+    def _remove_content(self, contents: List[str]) -> Dict[str, int]:
+        """Drop content nodes plus any actor, narrative or region left without content."""
+        removed = {"content": 0, "actors": 0, "narratives": 0, "regions": 0}
+        if not contents:
+            return removed
+        doomed: Dict[str, None] = {}
+        touched_actors: Set[str] = set()
+        touched_narratives: Set[str] = set()
+        for content in contents:
+            doomed[content] = None
+            actors = self._content_actors.pop(content, {})
+            narratives = self._content_narratives.pop(content, {})
+            score = self.graph.nodes[content].get("score", 0.0)
+            for actor in actors:
+                self._actor_content[actor].pop(content, None)
+                self._actor_content_score[actor] -= score
+                touched_actors.add(actor)
+            for near in self._content_near.pop(content, {}):
+                self._content_near[near].pop(content, None)
+                # Actors of the surviving copy lose these peers
+                self._alert_dirty.update(self._content_actors.get(near, ()))
+            fingerprint = self.graph.nodes[content].get("simhash")
+            if fingerprint is not None and self._simhash is not None:
+                self._simhash.discard(content, fingerprint)
+            for narrative in narratives:
+                self._narrative_content[narrative].pop(content, None)
+                counts = self._narrative_actors.get(narrative, {})
+                for actor in actors:
+                    counts[actor] -= 1
+                    if not counts[actor]:
+                        del counts[actor]
+                touched_narratives.add(narrative)
+            self._content_ts.pop(content, None)
+            removed["content"] += 1
+
+        self._risk_dirty.update(touched_actors)
+        for actor in touched_actors:
+            if not self._actor_content[actor]:
+                del self._actor_content[actor]
+                del self._actor_content_score[actor]
+                doomed[actor] = None
+                removed["actors"] += 1
+        for narrative in touched_narratives:
+            if not self._narrative_content[narrative]:
+                del self._narrative_content[narrative]
+                self._narrative_actors.pop(narrative, None)
+                doomed[narrative] = None
+                removed["narratives"] += 1
+        for actor in [node for node in doomed if node in touched_actors]:
+            for neighbor in self.graph.neighbors(actor):
+                if neighbor.startswith("region::") and all(
+                    peer in doomed for peer in self.graph.neighbors(neighbor)
+                ):
+                    doomed[neighbor] = None
+        removed["regions"] = sum(1 for node in doomed if node.startswith("region::"))
+
+        # Surviving actors lose content or peers; re-evaluate their alerts
+        for actor in touched_actors:
+            if actor not in doomed:
+                self._alert_dirty.add(actor)
+                self._alert_dirty.update(self._peers(actor))
+        self._chain_narratives = [
+            entry
+            for entry in self._chain_narratives
+            if len(self._narrative_actors.get(entry[1], ())) >= 2
+            and self._narrative_content.get(entry[1])
+        ]
+
+        slots = self._index.index
+        affected = {self._components.find(slots[node]) for node in doomed}
+        survivors = [
+            slots[member]
+            for root in affected
+            for member in self._components.members_of(root)
+            if member not in doomed
+        ]
+        self._components.retire(affected)
+        for node in doomed:
+            self._index.remove_node(node)
+            self.graph.remove_node(node)
+            self._order.pop(node, None)
+            self._alerts.discard(node)
+            self._alert_dirty.discard(node)
+            self._risk.discard(node)
+            self._risk_dirty.discard(node)
+            if self._store is not None:
+                self._store.append(("dn", node))
+        self._components.split(
+            survivors, self._index.neighbors, self._index.nodes, self._index.scores
+        )
+
+        self._topology_version += 1
+        with self._refresh_cond:
+            self._version += 1
+            if self._stale_since is None:
+                self._stale_since = time.monotonic()
+        return removed
+
+    def _persist(self) -> None:
+        if self._store is None:
+            return
+        self._store.commit()
+        if self._store.snapshot_due:
+            # Seals the log; the snapshot is compacted from it off the ingest path
+            self._store.start_snapshot()
+
+    def _restore(self) -> None:
+        """Rebuild graph, indexes and scores from the store's snapshot and log tail."""
+        started = time.perf_counter()
+        # Millions of small containers are allocated here; cyclic GC passes only slow that down
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes, edges, tail = self._store.load()
+            # Fold the log tail in first so each node and edge is built once
+            edges = fold_records(nodes, edges, tail)
+
+            self.graph.add_nodes_from(nodes.items())
+            self.graph.add_edges_from(edges)
+            with self._index.bulk_load():
+                for node, attrs in nodes.items():
+                    slot = self._index.upsert(node, self._node_features(attrs))
+                    self._order[node] = self._next_order()
+                    self._components.add(slot, node)
+                for source, target, attrs in edges:
+                    self._link_edge(source, target, attrs)
+            content = [(attrs.get("ts", ""), node) for node, attrs in nodes.items() if attrs.get("type") == "content"]
+            content.sort()
+            for ts, node in content:
+                self._track_content(node, ts)
+            if self._simhash is not None:
+                self._simhash.load(
+                    (node, nodes[node]["simhash"]) for _, node in content if "simhash" in nodes[node]
+                )
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if nodes:
+            self._version += 1
+            self._topology_version += 1
+        self.restore_seconds = round(time.perf_counter() - started, 3)
+
+    def _add_intake(
+        self,
+        intake_id: str,
+        intake: ContentIntake,
+        classification: str,
+        composite_score: float,
+    ) -> None:
+        with self._refresh_cond:
+            self._version += 1
+            if self._stale_since is None:
+                self._stale_since = time.monotonic()
+
         platform = "unknown"
         if intake.metadata and intake.metadata.platform:
             platform = intake.metadata.platform
 
         content_node = f"content::{intake_id}"
-        self.graph.add_node(
+        # Re-ingesting an intake id keeps its original copy-pasta links
+        fingerprint = (
+            simhash64(intake.text, self._simhash_min_tokens)
+            if self._simhash is not None and content_node not in self.graph
+            else None
+        )
+        content_attrs: Dict[str, Any] = {}
+        if fingerprint is not None:
+            content_attrs["simhash"] = fingerprint
+        self._upsert_node(
             content_node,
             type="content",
             score=composite_score,
@@ -56,6 +393,7 @@ class GraphIntelEngine:
             ts=datetime.utcnow().isoformat(),
             platform=platform,
             source=intake.source,
+            **content_attrs,
         )
 
         actor_id = (
@@ -63,38 +401,278 @@ class GraphIntelEngine:
             if intake.metadata and intake.metadata.actor_id
             else f"actor::anon::{hash(intake.source) % 10000}"
         )
-        self.graph.add_node(actor_id, type="actor")
-        actor_record = self.graph.nodes[actor_id]
-        history = actor_record.get("score_history", [])
+        actor_record = self.graph.nodes[actor_id] if actor_id in self.graph else {}
+        history = list(actor_record.get("score_history", []))
         history.append(composite_score)
-        actor_record["score_history"] = history[-20:]
-        actor_record["avg_score"] = sum(actor_record["score_history"]) / len(actor_record["score_history"])
+        history = history[-20:]
         platforms = set(actor_record.get("platforms", []))
         if platform:
             platforms.add(platform)
-        actor_record["platforms"] = sorted(platforms)
-        actor_record["last_seen"] = datetime.utcnow().isoformat()
+        self._upsert_node(
+            actor_id,
+            type="actor",
+            score_history=history,
+            avg_score=sum(history) / len(history),
+            platforms=sorted(platforms),
+            last_seen=datetime.utcnow().isoformat(),
+        )
 
-        self.graph.add_edge(actor_id, content_node, relation="published")
+        self._add_edge(actor_id, content_node, relation="published")
 
         if intake.tags:
             for tag in intake.tags:
                 tag_node = f"narrative::{tag}"
-                self.graph.add_node(tag_node, type="narrative", tag=tag)
-                self.graph.add_edge(content_node, tag_node, relation="targets")
+                self._upsert_node(tag_node, type="narrative", tag=tag)
+                self._add_edge(content_node, tag_node, relation="targets")
 
         if intake.metadata and intake.metadata.region:
             region_node = f"region::{intake.metadata.region}"
-            self.graph.add_node(region_node, type="region")
-            self.graph.add_edge(actor_id, region_node, relation="origin")
+            self._upsert_node(region_node, type="region")
+            self._add_edge(actor_id, region_node, relation="origin")
+
+        if fingerprint is not None:
+            self._link_near_duplicates(content_node, fingerprint)
+
+    def _link_near_duplicates(self, content_node: str, fingerprint: int) -> None:
+        """Join ``content_node`` to its nearest live SimHash neighbours, then index it."""
+        matches = self._simhash.query(fingerprint, limit=self._near_duplicate_links + 1)
+        linked = 0
+        for other, distance in matches:
+            if linked >= self._near_duplicate_links:
+                break
+            if other == content_node or other not in self._content_ts:
+                continue
+            self._add_edge(content_node, other, relation="near_duplicate", distance=distance)
+            linked += 1
+        self._simhash.add(content_node, fingerprint)
+
+    def _upsert_node(self, node: str, **attrs) -> None:
+        if self._store is not None:
+            self._store.append(("n", node, attrs))
+        is_new = node not in self.graph
+        if "score" in attrs and node in self._content_actors:
+            # Re-scored content moves its actors' neighbour averages
+            delta = attrs["score"] - self.graph.nodes[node].get("score", 0.0)
+            for actor in self._content_actors[node]:
+                self._actor_content_score[actor] += delta
+            self._risk_dirty.update(self._content_actors[node])
+        self.graph.add_node(node, **attrs)
+        slot = self._index.upsert(node, self._node_features(self.graph.nodes[node]))
+        if is_new:
+            self._topology_version += 1
+            self._order[node] = self._next_order()
+            self._components.add(slot, node)
+        if attrs.get("type") == "content":
+            self._track_content(node, attrs.get("ts", ""))
+
+    def _next_order(self) -> int:
+        self._order_seq += 1
+        return self._order_seq
+
+    def _track_content(self, node: str, ts: str) -> None:
+        self._content_ts[node] = ts
+        self._content_queue.append((ts, node))
+
+    def _add_edge(self, source: str, target: str, **attrs) -> None:
+        if self._store is not None:
+            self._store.append(("e", source, target, attrs))
+        self.graph.add_edge(source, target, **attrs)
+        self._link_edge(source, target, attrs)
+
+    def _link_edge(self, source: str, target: str, attrs: Dict[str, Any]) -> None:
+        """Mirror a graph edge into the score index, components and typed adjacency."""
+        if self._index.add_edge(source, target):
+            self._topology_version += 1
+            self._components.union(self._index.index[source], self._index.index[target])
+        # Snapshots do not preserve edge direction, so orient by node type
+        relation = attrs.get("relation")
+        if relation == "published":
+            self._link_published(*self._oriented(source, target, "actor"))
+        elif relation == "targets":
+            self._link_targets(*self._oriented(source, target, "content"))
+        elif relation == "near_duplicate":
+            self._link_near_duplicate(source, target)
+
+    def _oriented(self, source: str, target: str, kind: str) -> Tuple[str, str]:
+        if self.graph.nodes[source].get("type") == kind:
+            return source, target
+        return target, source
+
+    @staticmethod
+    def _link(index: Dict[str, Dict[str, None]], key: str, value: str) -> bool:
+        bucket = index.setdefault(key, {})
+        if value in bucket:
+            return False
+        bucket[value] = None
+        return True
+
+    def _link_published(self, actor: str, content: str) -> None:
+        if not self._link(self._actor_content, actor, content):
+            return
+        self._link(self._content_actors, content, actor)
+        self._actor_content_score[actor] = (
+            self._actor_content_score.get(actor, 0.0) + self.graph.nodes[content].get("score", 0.0)
+        )
+        self._risk_dirty.add(actor)
+        # The actor gains peers and the content's other actors gain the actor as a peer
+        self._alert_dirty.update(self._content_actors[content])
+        for near in self._content_near.get(content, ()):
+            self._alert_dirty.update(self._content_actors.get(near, ()))
+        for narrative in self._content_narratives.get(content, ()):
+            self._count_narrative_actor(narrative, actor)
+            self._refresh_chain_narrative(narrative)
+
+    def _link_targets(self, content: str, narrative: str) -> None:
+        if not self._link(self._content_narratives, content, narrative):
+            return
+        self._link(self._narrative_content, narrative, content)
+        actors = self._content_actors.get(content, {})
+        self._alert_dirty.update(actors)
+        for actor in actors:
+            self._count_narrative_actor(narrative, actor)
+        self._refresh_chain_narrative(narrative)
+
+    def _link_near_duplicate(self, content: str, other: str) -> None:
+        if not self._link(self._content_near, content, other):
+            return
+        self._link(self._content_near, other, content)
+        # Actors of either copy become peers of each other
+        self._alert_dirty.update(self._content_actors.get(content, ()))
+        self._alert_dirty.update(self._content_actors.get(other, ()))
+
+    def _count_narrative_actor(self, narrative: str, actor: str) -> None:
+        counts = self._narrative_actors.setdefault(narrative, {})
+        counts[actor] = counts.get(actor, 0) + 1
+
+    def _refresh_chain_narrative(self, narrative: str) -> None:
+        """Keep narratives able to form a chain sorted by graph insertion order."""
+        if len(self._narrative_actors.get(narrative, ())) < 2 or not self._narrative_content.get(narrative):
+            return
+        entry = (self._order[narrative], narrative)
+        position = bisect.bisect_left(self._chain_narratives, entry)
+        if position == len(self._chain_narratives) or self._chain_narratives[position] != entry:
+            self._chain_narratives.insert(position, entry)
+
+    def _peers(self, actor: str) -> Set[str]:
+        """Actors sharing content with ``actor`` directly or through a near-duplicate copy."""
+        peers = {
+            peer
+            for content in self._actor_content.get(actor, ())
+            for peer in self._content_actors[content]
+            if peer != actor
+        }
+        peers.update(peer for peer, _ in self._near_duplicate_peers(actor))
+        return peers
+
+    def _near_duplicate_peers(self, actor: str) -> List[Tuple[str, str]]:
+        """``(peer, peer's content)`` pairs reached through near_duplicate edges."""
+        return [
+            (peer, near)
+            for content in self._actor_content.get(actor, ())
+            for near in self._content_near.get(content, ())
+            for peer in self._content_actors.get(near, ())
+            if peer != actor
+        ]
+
+    def summary(self, max_staleness: Optional[float] = None) -> GraphSummary:
+        """
+        Current graph summary, memoized per graph version.
+
+        With ``max_staleness`` (seconds) the last published snapshot is returned
+        without taking the graph lock, provided it is at most that stale; otherwise
+        the caller waits for the background refresher rather than computing inline.
+        """
+        return self._versioned_summary(max_staleness)[1]
+
+    def threat_intel_feed(self, max_staleness: Optional[float] = None) -> ThreatIntelFeed:
+        version, summary = self._versioned_summary(max_staleness)
+        return self._memoized(
+            "threat_intel", version, lambda: self._build_threat_intel_feed(summary)
+        )
+
+    def siem_payload(self, max_staleness: Optional[float] = None) -> SIEMCorrelationPayload:
+        if max_staleness is None:
+            # Only clusters, alerts and chains are needed, each maintained incrementally
+            with self._lock:
+                return self._memoized(
+                    "siem",
+                    self._version,
+                    lambda: self._build_siem_payload(
+                        self.graph.number_of_nodes(), *self._correlation_parts()
+                    ),
+                )
+        version, summary = self._versioned_summary(max_staleness)
+        return self._memoized("siem", version, lambda: self._siem_from_summary(summary))
+
+    def _versioned_summary(
+        self, max_staleness: Optional[float]
+    ) -> Tuple[int, GraphSummary]:
+        if max_staleness is None:
+            with self._lock:
+                return self._version, self._summarise()
+        self._ensure_refresher()
+        with self._refresh_cond:
+            while True:
+                if self._snapshot is not None and self._staleness() <= max_staleness:
+                    return self._snapshot
+                if self._closed:
+                    break
+                self._refresh_cond.notify_all()
+                self._refresh_cond.wait(self._refresh_interval)
+        with self._lock:
+            return self._version, self._summarise()
 
-        return self._summarise()
+    def _staleness(self) -> float:
+        # Caller holds _refresh_cond
+        if self._stale_since is None:
+            return 0.0
+        return time.monotonic() - self._stale_since
 
-    def summary(self) -> GraphSummary:
-        return self._summarise()
+    def _publish(self, version: int, summary: GraphSummary) -> None:
+        with self._refresh_cond:
+            if self._snapshot is not None and self._snapshot[0] >= version:
+                return
+            self._snapshot = (version, summary)
+            if version == self._version:
+                self._stale_since = None
+            self._refresh_cond.notify_all()
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None or self._closed:
+            return
+        with self._refresh_cond:
+            if self._refresher is None and not self._closed:
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop, name="graph-summary-refresher", daemon=True
+                )
+                self._refresher.start()
 
-    def threat_intel_feed(self) -> ThreatIntelFeed:
-        summary = self._summarise()
+    def _refresh_loop(self) -> None:
+        while True:
+            with self._refresh_cond:
+                if self._closed:
+                    return
+                if self._snapshot is not None and self._snapshot[0] == self._version:
+                    self._refresh_cond.wait(self._refresh_interval)
+                    continue
+            with self._lock:
+                version, summary = self._version, self._summarise()
+            # Warm the derived feeds so staleness-tolerant readers never build them
+            self._memoized("threat_intel", version, lambda: self._build_threat_intel_feed(summary))
+            self._memoized("siem", version, lambda: self._siem_from_summary(summary))
+            with self._refresh_cond:
+                if not self._closed:
+                    self._refresh_cond.wait(self._refresh_interval)
+
+    def _memoized(self, name: str, key: Any, compute: Callable[[], Any]) -> Any:
+        cached = self._memo.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = compute()
+        self._memo[name] = (key, value)
+        return value
+
+    def _build_threat_intel_feed(self, summary: GraphSummary) -> ThreatIntelFeed:
         indicator_pool = set(summary.high_risk_actors)
         for cluster in summary.gnn_clusters:
             indicator_pool.update(cluster.actors)
@@ -113,33 +691,51 @@ class GraphIntelEngine:
             dataset_fingerprint=payload_fingerprint,
         )
 
-    def siem_payload(self) -> SIEMCorrelationPayload:
-        summary = self._summarise()
+    def _siem_from_summary(self, summary: GraphSummary) -> SIEMCorrelationPayload:
+        return self._build_siem_payload(
+            summary.node_count,
+            summary.gnn_clusters,
+            summary.coordination_alerts,
+            summary.propagation_chains,
+        )
+
+    def _build_siem_payload(
+        self,
+        node_count: int,
+        gnn_clusters: List[GNNCluster],
+        coordination_alerts: List[CoordinationAlert],
+        propagation_chains: List[PropagationChain],
+    ) -> SIEMCorrelationPayload:
         correlation_keys = sorted(
             {
-                *(cluster.cluster_id for cluster in summary.gnn_clusters),
-                *(alert.actor for alert in summary.coordination_alerts),
+                *(cluster.cluster_id for cluster in gnn_clusters),
+                *(alert.actor for alert in coordination_alerts),
             }
         )
         return SIEMCorrelationPayload(
             generated_at=datetime.utcnow(),
-            alerts=summary.coordination_alerts,
-            propagation_chains=summary.propagation_chains,
+            alerts=coordination_alerts,
+            propagation_chains=propagation_chains,
             correlation_keys=correlation_keys,
-            node_count=summary.node_count,
+            node_count=node_count,
         )
 
     def _summarise(self) -> GraphSummary:
+        cached = self._memo.get("summary")
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
         node_count = self.graph.number_of_nodes()
         edge_count = self.graph.number_of_edges()
         gnn_projection = self._gnn_projection()
+        # Sub-results only depend on structure and scores, not on attribute-only updates
+        inputs = (self._topology_version, self._score_version)
         high_risk = self._top_risk_actors(gnn_projection)
-        communities = self._communities_snapshot(gnn_projection)
-        gnn_clusters = self._gnn_clusters(gnn_projection)
-        coordination_alerts = self._coordination_alerts(gnn_projection)
-        propagation = self._propagation_chains(gnn_projection)
+        communities = self._memoized(
+            "communities", inputs, lambda: self._communities_snapshot(gnn_projection)
+        )
+        gnn_clusters, coordination_alerts, propagation = self._correlation_parts()
 
-        return GraphSummary(
+        summary = GraphSummary(
             node_count=node_count,
             edge_count=edge_count,
             high_risk_actors=high_risk,
@@ -148,217 +744,174 @@ class GraphIntelEngine:
             coordination_alerts=coordination_alerts,
             propagation_chains=propagation,
         )
+        self._memo["summary"] = (self._version, summary)
+        self._publish(self._version, summary)
+        return summary
 
-    def _gnn_projection(self) -> Dict[str, List[float]]:
-        if not torch or self.graph.number_of_nodes() == 0:
-            return {}
-        nodes = list(self.graph.nodes())
-        feature_matrix = self._build_feature_matrix(nodes)
-        adjacency = self._build_adjacency(nodes)
-        degrees = adjacency.sum(dim=1, keepdim=True).clamp(min=1.0)
-        neighbor_features = adjacency @ feature_matrix / degrees
-        base_scores = (feature_matrix * self._feature_weights).sum(dim=1)
-        neighbor_effect = (neighbor_features * self._neighbor_weights).sum(dim=1)
-        context_features = adjacency @ neighbor_features / degrees
-        context_effect = 0.5 * (context_features * self._neighbor_weights).sum(dim=1)
-        logits = base_scores + neighbor_effect + context_effect + self._gnn_bias
-        scores = torch.sigmoid(logits).tolist()
-        return {"nodes": nodes, "scores": scores}
-
-    def _build_feature_matrix(self, nodes: List[str]):
-        rows: List[List[float]] = []
-        for node in nodes:
-            data = self.graph.nodes[node]
-            node_type = data.get("type", "content")
-            score = float(data.get("score", data.get("avg_score", 0.0)))
-            classification = data.get("classification")
-            class_score = {
-                "high-risk": 0.9,
-                "medium-risk": 0.6,
-                "low-risk": 0.2,
-            }.get(classification, 0.4)
-            platform_density = min(1.0, len(data.get("platforms", [])) / 3) if node_type == "actor" else 0.0
-            region_flag = 1.0 if node_type == "region" else 0.0
-            rows.append(
-                [
-                    1.0 if node_type == "actor" else 0.0,
-                    1.0 if node_type == "content" else 0.0,
-                    1.0 if node_type == "narrative" else 0.0,
-                    region_flag,
-                    min(1.0, 0.7 * score + 0.3 * class_score + 0.2 * platform_density),
-                ]
-            )
-        return torch.tensor(rows, dtype=torch.float32)
-
-    def _build_adjacency(self, nodes: List[str]):
-        adjacency = torch.zeros((len(nodes), len(nodes)), dtype=torch.float32)
-        index_lookup = {node: idx for idx, node in enumerate(nodes)}
-        for source, target in self.graph.edges():
-            i = index_lookup[source]
-            j = index_lookup[target]
-            adjacency[i, j] = 1.0
-            adjacency[j, i] = 1.0
-        return adjacency
-
-    def _top_risk_actors(self, gnn_projection: Dict[str, List[float]], limit: int = 5) -> List[str]:
-        actors = [
-            (node, data)
-            for node, data in self.graph.nodes(data=True)
-            if data.get("type") == "actor"
-        ]
-        score_lookup = dict(zip(gnn_projection.get("nodes", []), gnn_projection.get("scores", [])))
-        scores: List[Tuple[str, float]] = []
-        for actor, _ in actors:
-            neighbor_scores = [
-                self.graph.nodes[n].get("score", 0.0)
-                for n in self.graph.neighbors(actor)
-                if self.graph.nodes[n].get("type") == "content"
-            ]
-            if neighbor_scores:
-                avg_neighbor = sum(neighbor_scores) / len(neighbor_scores)
-                combined = 0.6 * avg_neighbor + 0.4 * score_lookup.get(actor, avg_neighbor)
-                scores.append((actor, combined))
-        scores.sort(key=lambda item: item[1], reverse=True)
-        return [actor for actor, _ in scores[:limit]]
+    def _correlation_parts(
+        self,
+    ) -> Tuple[List[GNNCluster], List[CoordinationAlert], List[PropagationChain]]:
+        gnn_projection = self._gnn_projection()
+        inputs = (self._topology_version, self._score_version)
+        return (
+            self._memoized("clusters", inputs, lambda: self._gnn_clusters(gnn_projection)),
+            self._memoized("alerts", inputs, lambda: self._coordination_alerts(gnn_projection)),
+            self._memoized("chains", inputs, lambda: self._propagation_chains(gnn_projection)),
+        )
+
+    def _gnn_projection(self) -> GraphIndex:
+        """Score lookup for the current graph; an empty index means nothing to project."""
+        changes = self._index.flush()
+        if changes:
+            self._score_version += 1
+            for slot, delta in changes.items():
+                self._components.add_score(slot, delta)
+                node = self._index.nodes[slot]
+                if node in self._actor_content:
+                    # An actor's risk feeds its own alert and every peer's alert
+                    self._risk_dirty.add(node)
+                    self._alert_dirty.add(node)
+                    self._alert_dirty.update(self._peers(node))
+        return self._index
+
+    @staticmethod
+    def _node_features(data) -> Tuple[float, ...]:
+        node_type = data.get("type", "content")
+        score = float(data.get("score", data.get("avg_score", 0.0)))
+        classification = data.get("classification")
+        class_score = {
+            "high-risk": 0.9,
+            "medium-risk": 0.6,
+            "low-risk": 0.2,
+        }.get(classification, 0.4)
+        platform_density = min(1.0, len(data.get("platforms", [])) / 3) if node_type == "actor" else 0.0
+        region_flag = 1.0 if node_type == "region" else 0.0
+        return (
+            1.0 if node_type == "actor" else 0.0,
+            1.0 if node_type == "content" else 0.0,
+            1.0 if node_type == "narrative" else 0.0,
+            region_flag,
+            min(1.0, 0.7 * score + 0.3 * class_score + 0.2 * platform_density),
+        )
+
+    def _top_risk_actors(self, gnn_projection: GraphIndex, limit: int = 5) -> List[str]:
+        dirty, self._risk_dirty = self._risk_dirty, set()
+        for actor in dirty:
+            contents = self._actor_content.get(actor)
+            if not contents:
+                self._risk.discard(actor)
+                continue
+            avg_neighbor = self._actor_content_score[actor] / len(contents)
+            combined = 0.6 * avg_neighbor + 0.4 * gnn_projection.get(actor, avg_neighbor)
+            # Rounded so float drift in the running sums cannot reorder exact ties;
+            # ties keep graph insertion order
+            self._risk.update(actor, (-round(combined, 9), self._order[actor]), actor)
+        return self._risk.top(limit)
 
     def _communities_snapshot(
-        self, gnn_projection: Dict[str, List[float]]
+        self, gnn_projection: GraphIndex
     ) -> List[CommunitySnapshot]:
         communities: List[CommunitySnapshot] = []
-        score_lookup = dict(zip(gnn_projection.get("nodes", []), gnn_projection.get("scores", [])))
-        for component in nx.connected_components(self.graph):
-            members = list(component)
-            content = [node for node in members if node.startswith("content::")]
-            actors = [node for node in members if node.startswith("actor::")]
-            narratives = [node for node in members if node.startswith("narrative::")]
-            regions = [node for node in members if node.startswith("region::")]
+        for component in self._components.components():
+            content = component.of_kind("content")
+            actors = component.of_kind("actor")
+            narratives = component.of_kind("narrative")
             if not (content or actors or narratives):
                 continue
-            avg_score = (
-                sum(score_lookup.get(node, 0.0) for node in members) / len(members)
-                if members
-                else 0.0
-            )
             communities.append(
                 CommunitySnapshot(
-                    actors=actors,
-                    content=content,
+                    actors=list(actors),
+                    content=list(content),
                     narratives=[node.split("::", 1)[1] for node in narratives],
-                    regions=[node.split("::", 1)[1] for node in regions],
-                    gnn_score=round(avg_score, 3),
+                    regions=[node.split("::", 1)[1] for node in component.of_kind("region")],
+                    gnn_score=round(component.avg_score, 3),
                 )
             )
         return communities
 
     def _gnn_clusters(
-        self, gnn_projection: Dict[str, List[float]], limit: int = 5
+        self, gnn_projection: GraphIndex, limit: int = 5
     ) -> List[GNNCluster]:
         if not gnn_projection:
             return []
-        score_lookup = dict(zip(gnn_projection.get("nodes", []), gnn_projection.get("scores", [])))
         clusters: List[GNNCluster] = []
-        for idx, component in enumerate(nx.connected_components(self.graph), start=1):
-            members = list(component)
-            if not members:
-                continue
-            avg_score = sum(score_lookup.get(node, 0.0) for node in members) / len(members)
+        for idx, component in enumerate(self._components.components(), start=1):
+            avg_score = component.avg_score
             if avg_score < 0.35:
                 continue
-            actors = [node for node in members if node.startswith("actor::")]
-            narratives = [node.split("::", 1)[1] for node in members if node.startswith("narrative::")]
-            content = [node for node in members if node.startswith("content::")]
             clusters.append(
                 GNNCluster(
                     cluster_id=f"cluster-{idx}",
                     score=round(avg_score, 3),
-                    actors=actors[:10],
-                    narratives=narratives[:10],
-                    content=content[:10],
+                    actors=component.of_kind("actor")[:10],
+                    narratives=[node.split("::", 1)[1] for node in component.of_kind("narrative")[:10]],
+                    content=component.of_kind("content")[:10],
                 )
             )
         clusters.sort(key=lambda cluster: cluster.score, reverse=True)
         return clusters[:limit]
 
     def _coordination_alerts(
-        self, gnn_projection: Dict[str, List[float]], limit: int = 10
+        self, gnn_projection: GraphIndex, limit: int = 10
     ) -> List[CoordinationAlert]:
         if not gnn_projection:
             return []
-        score_lookup = dict(zip(gnn_projection.get("nodes", []), gnn_projection.get("scores", [])))
-        alerts: List[CoordinationAlert] = []
-        for actor, data in self.graph.nodes(data=True):
-            if data.get("type") != "actor":
-                continue
-            content_neighbors = [
-                neighbor
-                for neighbor in self.graph.neighbors(actor)
-                if self.graph.nodes[neighbor].get("type") == "content"
-            ]
-            peer_actors = sorted(
-                {
-                    peer
-                    for content in content_neighbors
-                    for peer in self.graph.neighbors(content)
-                    if self.graph.nodes[peer].get("type") == "actor" and peer != actor
-                }
-            )
-            if not peer_actors:
-                continue
-            shared_tags = sorted(
-                {
-                    self.graph.nodes[tag].get("tag", tag.split("::", 1)[-1])
-                    for content in content_neighbors
-                    for tag in self.graph.neighbors(content)
-                    if self.graph.nodes[tag].get("type") == "narrative"
-                }
-            )
-            if not shared_tags:
-                continue
-            platforms = sorted(
-                {
-                    self.graph.nodes[content].get("platform", "unknown") or "unknown"
-                    for content in content_neighbors
-                }
-            ) or ["unknown"]
-            risk = max(
-                score_lookup.get(actor, 0.0),
-                max((score_lookup.get(peer, 0.0) for peer in peer_actors), default=0.0),
-            )
-            alerts.append(
-                CoordinationAlert(
-                    actor=actor,
-                    peer_actors=peer_actors[:5],
-                    shared_tags=shared_tags[:5],
-                    platforms=platforms,
-                    risk=round(risk, 3),
-                )
-            )
-        alerts.sort(key=lambda alert: alert.risk, reverse=True)
-        return alerts[:limit]
+        dirty, self._alert_dirty = self._alert_dirty, set()
+        for actor in dirty:
+            alert = self._actor_alert(actor, gnn_projection)
+            if alert is None:
+                self._alerts.discard(actor)
+            else:
+                # Highest risk first; ties keep graph insertion order
+                self._alerts.update(actor, (-alert.risk, self._order[actor]), alert)
+        return self._alerts.top(limit)
+
+    def _actor_alert(
+        self, actor: str, score_lookup: GraphIndex
+    ) -> Optional[CoordinationAlert]:
+        contents = self._actor_content.get(actor, {})
+        peer_actors = sorted(self._peers(actor))
+        if not peer_actors:
+            return None
+        shared_tags = sorted(
+            {
+                self.graph.nodes[narrative].get("tag", narrative.split("::", 1)[-1])
+                for content in contents
+                for narrative in self._content_narratives.get(content, ())
+            }
+        )
+        # Untagged posts still alert when peers published near-duplicate copies
+        near_duplicates = sorted({near for _, near in self._near_duplicate_peers(actor)})
+        if not shared_tags and not near_duplicates:
+            return None
+        platforms = sorted(
+            {self.graph.nodes[content].get("platform", "unknown") or "unknown" for content in contents}
+        ) or ["unknown"]
+        risk = max(
+            score_lookup.get(actor, 0.0),
+            max((score_lookup.get(peer, 0.0) for peer in peer_actors), default=0.0),
+        )
+        return CoordinationAlert(
+            actor=actor,
+            peer_actors=peer_actors[:5],
+            shared_tags=shared_tags[:5],
+            platforms=platforms,
+            risk=round(risk, 3),
+            near_duplicates=near_duplicates[:5],
+        )
 
     def _propagation_chains(
-        self, gnn_projection: Dict[str, List[float]], limit: int = 5
+        self, gnn_projection: GraphIndex, limit: int = 5
     ) -> List[PropagationChain]:
         if not gnn_projection:
             return []
-        score_lookup = dict(zip(gnn_projection.get("nodes", []), gnn_projection.get("scores", [])))
+        score_lookup = gnn_projection
         chains: List[PropagationChain] = []
-        narrative_nodes = [node for node, data in self.graph.nodes(data=True) if data.get("type") == "narrative"]
-        for narrative in narrative_nodes:
-            actors = [
-                neighbor
-                for neighbor in self.graph.neighbors(narrative)
-                if self.graph.nodes[neighbor].get("type") == "actor"
-            ]
-            contents = [
-                neighbor
-                for neighbor in self.graph.neighbors(narrative)
-                if self.graph.nodes[neighbor].get("type") == "content"
-            ]
-            if len(actors) < 2 or not contents:
-                continue
-            ranked_actors = sorted(actors, key=lambda node: score_lookup.get(node, 0.0), reverse=True)[:2]
-            for content in contents[:2]:
+        for _, narrative in self._chain_narratives:
+            ranked_actors = heapq.nlargest(
+                2, self._narrative_actors[narrative], key=lambda node: score_lookup.get(node, 0.0)
+            )
+            for content in itertools.islice(self._narrative_content[narrative], 2):
                 path = [ranked_actors[0], content, narrative, ranked_actors[-1]]
                 platforms = sorted({self.graph.nodes[content].get("platform", "unknown") or "unknown"})
                 likelihood = (
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class TopK:
+    """
+    Keyed ranking with lazy deletion.
+
+    ``update`` pushes a new heap entry and bumps the key's stamp, so older entries
+    for the same key become stale and are skipped when they surface. Reading the
+    top ``k`` costs O(k log n) plus the stale entries it discards; the heap is
+    compacted when stale entries dominate.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[Any, int, Hashable]] = []
+        self._live: Dict[Hashable, Tuple[int, Any]] = {}
+        self._stamp = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def update(self, key: Hashable, rank: Any, value: Any) -> None:
+        """Insert or replace ``key``; smaller ``rank`` sorts first."""
+        self._stamp += 1
+        self._live[key] = (self._stamp, value)
+        heapq.heappush(self._heap, (rank, self._stamp, key))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+
+    def discard(self, key: Hashable) -> None:
+        self._live.pop(key, None)
+
+    def top(self, k: int) -> List[Any]:
+        taken: List[Tuple[Any, int, Hashable]] = []
+        while self._heap and len(taken) < k:
+            entry = heapq.heappop(self._heap)
+            live = self._live.get(entry[2])
+            if live is None or live[0] != entry[1]:
+                continue
+            taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return [self._live[entry[2]][1] for entry in taken]
+
+    def _compact(self) -> None:
+        self._heap = [
+            entry
+            for entry in self._heap
+            if entry[2] in self._live and self._live[entry[2]][0] == entry[1]
+        ]
+        heapq.heapify(self._heap)
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from itertools import accumulate
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Same token pattern as DetectorEngine._tokenize; terms and text share it
+_TOKEN_RE = re.compile(r"\b[\w'-]+\b")
+
+# A category is a list of terms (each its own group) or a mapping of group -> terms
+CategoryTerms = Union[Iterable[str], Mapping[str, Iterable[str]]]
+
+
+@dataclass
+class LexiconMatch:
+    category: str
+    term: str
+    start: int
+    end: int
+
+
+@dataclass
+class LexiconScan:
+    """Result of ``Lexicon.scan``."""
+
+    # Distinct groups matched per category (a plain term is its own group)
+    hits: Dict[str, int] = field(default_factory=dict)
+    # Every match per category, repeats included
+    occurrences: Dict[str, int] = field(default_factory=dict)
+    # The first ``max_positions`` matches in text order, as character offsets
+    matches: List[LexiconMatch] = field(default_factory=list)
+
+
+class Lexicon:
+    """
+    Word-level Aho–Corasick automaton over categorised terms.
+
+    Terms are lowercased and tokenized with the detector's token pattern, and
+    the automaton's alphabet is whole tokens, so a term only matches complete
+    words ("hit" does not match "white"). Multi-word phrases match across any
+    run of whitespace but not across punctuation. A scan is one pass over the
+    text's tokens with dict transitions, independent of how many terms are
+    loaded.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, CategoryTerms],
+        version: str = "builtin",
+        max_positions: int = 100,
+    ) -> None:
+        self.version = version
+        self.max_positions = max(0, max_positions)
+        self.categories = list(categories)
+        # Per state: token transitions, failure link, and (category, group, term, tokens) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, int, str, int]]] = [[]]
+        self._terms = 0
+        for category_index, terms in enumerate(categories.values()):
+            groups = terms.values() if isinstance(terms, Mapping) else ([term] for term in terms)
+            for group_index, group in enumerate(groups):
+                for term in group:
+                    self._add(category_index, group_index, term)
+        self._link()
+
+    @classmethod
+    def from_file(
+        cls, path: str, base: Optional[Mapping[str, CategoryTerms]] = None, max_positions: int = 100
+    ) -> "Lexicon":
+        """
+        Compile a JSON lexicon file of ``{category: [terms] | {group: [terms]}}``.
+
+        Categories in the file replace same-named categories of ``base``; the
+        rest of ``base`` is kept.
+        """
+        with open(path, "r", encoding="utf-8") as handle:
+            loaded = json.load(handle)
+        if not isinstance(loaded, dict):
+            raise ValueError("lexicon file must hold a JSON object of categories")
+        categories: Dict[str, CategoryTerms] = dict(base or {})
+        for name, terms in loaded.items():
+            groups = terms.values() if isinstance(terms, dict) else [terms]
+            if not all(isinstance(group, list) and all(isinstance(t, str) for t in group) for group in groups):
+                raise ValueError(f"category {name!r} must be a list of terms or a mapping of group -> terms")
+            categories[name] = terms
+        version = f"{os.path.basename(path)}@{int(os.path.getmtime(path))}"
+        return cls(categories, version=version, max_positions=max_positions)
+
+    def __len__(self) -> int:
+        return self._terms
+
+    def scan(self, text: str) -> LexiconScan:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        root = goto[0]
+        # Tokens and the separators around them; both come from C-level passes
+        raw_tokens = _TOKEN_RE.findall(text)
+        tokens = [token.lower() for token in raw_tokens]
+        separators = _TOKEN_RE.split(text)
+        found: List[Tuple[int, int, int, str, int]] = []
+        state = 0
+        for index, token in enumerate(tokens):
+            if state:
+                # A phrase in progress does not continue across punctuation
+                if not separators[index].isspace():
+                    state = 0
+                else:
+                    while True:
+                        following = goto[state].get(token)
+                        if following is not None:
+                            state = following
+                            break
+                        state = fail[state]
+                        if not state:
+                            break
+            if not state:
+                state = root.get(token, 0)
+                if not state:
+                    continue
+            for category, group, term, length in outputs[state]:
+                found.append((index, category, group, term, length))
+
+        groups: Set[Tuple[int, int]] = set()
+        occurrences = [0] * len(self.categories)
+        for _, category, group, _, _ in found:
+            groups.add((category, group))
+            occurrences[category] += 1
+        hits = dict.fromkeys(self.categories, 0)
+        for category, _ in groups:
+            hits[self.categories[category]] += 1
+
+        matches: List[LexiconMatch] = []
+        kept = found[: self.max_positions]
+        if kept:
+            # Character offsets of token i: separators and tokens before it (lower() may change lengths)
+            last = kept[-1][0]
+            starts = list(
+                accumulate(
+                    len(separators[i]) + (len(raw_tokens[i - 1]) if i else 0) for i in range(last + 1)
+                )
+            )
+            for index, category, _, term, length in kept:
+                matches.append(
+                    LexiconMatch(
+                        self.categories[category],
+                        term,
+                        starts[index - length + 1],
+                        starts[index] + len(raw_tokens[index]),
+                    )
+                )
+        return LexiconScan(
+            hits=hits,
+            occurrences=dict(zip(self.categories, occurrences)),
+            matches=matches,
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            "terms": self._terms,
+            "states": len(self._goto),
+            "categories": self.categories,
+        }
+
+    def _add(self, category: int, group: int, term: str) -> None:
+        tokens = _TOKEN_RE.findall(term.lower())
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            following = self._goto[state].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = following
+        output = (category, group, " ".join(tokens), len(tokens))
+        if output not in self._outputs[state]:
+            self._outputs[state].append(output)
+            self._terms += 1
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also inherits its failure state's outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[following] = target if target != following else 0
+                self._outputs[following] = self._outputs[following] + self._outputs[self._fail[following]]
+
+
+class ReloadingLexicon:
+    """
+    The active Lexicon, recompiled when its JSON file changes.
+
+    ``scan`` checks the file's mtime at most every ``reload_seconds`` and swaps
+    in a freshly compiled automaton when it moved; a file that fails to load
+    is logged and the previous lexicon stays active. Without a path the
+    built-in categories are used as they are.
+    """
+
+    def __init__(
+        self,
+        builtin: Mapping[str, CategoryTerms],
+        path: str = "",
+        reload_seconds: float = 5.0,
+        max_positions: int = 100,
+    ) -> None:
+        self.builtin = dict(builtin)
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self.max_positions = max_positions
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = time.monotonic()
+        self._lexicon = Lexicon(self.builtin, max_positions=max_positions)
+        if path:
+            self.reload()
+
+    def current(self) -> Lexicon:
+        if self.path and time.monotonic() - self._checked >= self.reload_seconds:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            if mtime != self._mtime:
+                self.reload()
+        return self._lexicon
+
+    def scan(self, text: str) -> LexiconScan:
+        return self.current().scan(text)
+
+    def reload(self) -> bool:
+        """Recompile from ``path`` now; returns False (keeping the old lexicon) on failure."""
+        if not self.path:
+            return False
+        with self._lock:
+            try:
+                self._mtime = os.path.getmtime(self.path)
+                lexicon = Lexicon.from_file(self.path, base=self.builtin, max_positions=self.max_positions)
+            except (OSError, ValueError) as exc:
+                # The recorded mtime holds back retries until the file changes again
+                self.last_error = str(exc)
+                logger.warning(f"Lexicon reload from {self.path} failed, keeping {self._lexicon.version}: {exc}")
+                return False
+            self._lexicon = lexicon
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"Loaded lexicon {lexicon.version} ({len(lexicon)} terms)")
+            return True
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self._lexicon.stats(),
+            "path": self.path or None,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .detection import DetectorEngine
+
+# Fixed seed: signatures are persisted, so the hash family must not change between runs
+_SEED = 0x5EED
+
+
+@dataclass
+class NearDuplicate:
+    intake_id: str
+    cluster_id: str
+    similarity: float
+
+
+@dataclass
+class NearDuplicateAssignment:
+    """Result of ``NearDuplicateIndex.add``: the cluster plus what is needed to persist it."""
+
+    cluster_id: str
+    signature: bytes
+    matches: List[NearDuplicate] = field(default_factory=list)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with an LSH banding index for near-duplicate lookups.
+
+    Texts are tokenized with ``DetectorEngine._tokenize`` (lowercased) and cut
+    into ``shingle_size``-word shingles; each shingle is hashed with CRC32 and
+    ``num_perm`` multiply-shift hashes give the MinHash signature. The signature
+    is split into ``bands`` bands whose hashed values key the LSH buckets, so two
+    texts with Jaccard similarity J become candidates with probability
+    1 - (1 - J^rows)^bands. Candidates are then ranked by the fraction of equal
+    signature positions (the Jaccard estimate) and kept at ``threshold`` or above.
+
+    Buckets live in per-band sorted numpy arrays (binary search) plus a small
+    dict of recent inserts that is merged in every ``merge_every`` additions, so
+    a query is ``bands`` searchsorted calls regardless of index size. Each band
+    bucket contributes at most ``max_bucket`` (oldest) candidates.
+
+    ``add`` queries and inserts in one step and assigns the text to the cluster
+    of its most similar match, or starts a new cluster named after itself.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.7,
+        max_bucket: int = 32,
+        merge_every: int = 65536,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = max(1, shingle_size)
+        self.threshold = threshold
+        self.max_bucket = max(1, max_bucket)
+        self.merge_every = max(1, merge_every)
+
+        rng = np.random.default_rng(_SEED)
+        self._mul = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._add = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._band_mul = rng.integers(1, 2**63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+        self._lock = threading.Lock()
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._ids: List[str] = []
+        self._clusters: List[str] = []
+        self._cluster_count = 0
+        # Merged buckets: per band, keys sorted with their slots alongside
+        self._keys = np.zeros((bands, 0), dtype=np.uint32)
+        self._slots = np.zeros((bands, 0), dtype=np.uint32)
+        self._merged = 0
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of ``text``; None when it has no tokens."""
+        tokens = DetectorEngine._tokenize(text.lower())
+        if not tokens:
+            return None
+        size = min(self.shingle_size, len(tokens))
+        shingles = {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+        values = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # uint64 arithmetic wraps; the high 32 bits are the multiply-shift hash
+        hashed = (self._mul[:, None] * values[None, :] + self._add[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def query(self, text: str, limit: int = 10) -> List[NearDuplicate]:
+        """Stored texts with estimated Jaccard similarity >= ``threshold``, best first."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            return self._matches(signature, limit)
+
+    def add(self, intake_id: str, text: str, limit: int = 10) -> Optional[NearDuplicateAssignment]:
+        """Index ``text`` under ``intake_id`` and return its cluster; None for token-less text."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            matches = self._matches(signature, limit)
+            cluster_id = matches[0].cluster_id if matches else intake_id
+            self._insert(intake_id, cluster_id, signature)
+        return NearDuplicateAssignment(cluster_id, signature.tobytes(), matches)
+
+    def load(self, rows: Iterable[Tuple[str, str, bytes]]) -> int:
+        """Bulk-load persisted ``(intake_id, cluster_id, signature)`` rows; returns rows kept."""
+        ids: List[str] = []
+        clusters: List[str] = []
+        blobs: List[bytes] = []
+        width = self.num_perm * 4
+        for intake_id, cluster_id, blob in rows:
+            # Signatures from a different num_perm cannot be compared; skip them
+            if len(blob) == width:
+                ids.append(intake_id)
+                clusters.append(cluster_id)
+                blobs.append(blob)
+        if not ids:
+            return 0
+        loaded = np.frombuffer(b"".join(blobs), dtype=np.uint32).reshape(len(ids), self.num_perm)
+        with self._lock:
+            start = len(self._ids)
+            self._reserve(start + len(ids))
+            self._signatures[start : start + len(ids)] = loaded
+            self._ids.extend(ids)
+            self._clusters.extend(clusters)
+            self._cluster_count += sum(1 for intake_id, cluster_id in zip(ids, clusters) if intake_id == cluster_id)
+            self._merge()
+        return len(ids)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "texts": len(self._ids),
+                "clusters": self._cluster_count,
+                "num_perm": self.num_perm,
+                "bands": self.bands,
+                "threshold": self.threshold,
+                "unmerged": len(self._ids) - self._merged,
+                "index_bytes": int(
+                    self._signatures[: len(self._ids)].nbytes + self._keys.nbytes + self._slots.nbytes
+                ),
+            }
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, bands) uint32 bucket keys for (n, num_perm) signatures."""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        return ((banded * self._band_mul).sum(axis=2, dtype=np.uint64) >> np.uint64(32)).astype(np.uint32)
+
+    def _matches(self, signature: np.ndarray, limit: int) -> List[NearDuplicate]:
+        # Caller holds _lock
+        if not self._ids:
+            return []
+        keys = self._band_keys(signature[None, :])[0]
+        candidates: List[np.ndarray] = []
+        for band in range(self.bands):
+            key = keys[band]
+            if self._merged:
+                band_keys = self._keys[band]
+                lo = np.searchsorted(band_keys, key, side="left")
+                if lo < len(band_keys) and band_keys[lo] == key:
+                    hi = np.searchsorted(band_keys, key, side="right")
+                    candidates.append(self._slots[band, lo : min(hi, lo + self.max_bucket)])
+            recent = self._recent[band].get(int(key))
+            if recent:
+                candidates.append(np.asarray(recent, dtype=np.uint32))
+        if not candidates:
+            return []
+        slots = np.unique(np.concatenate(candidates))
+        similarity = (self._signatures[slots] == signature).mean(axis=1)
+        keep = similarity >= self.threshold
+        slots, similarity = slots[keep], similarity[keep]
+        # Best first; ties go to the oldest text, which is the cluster's anchor
+        order = np.lexsort((slots, -similarity))[:limit]
+        return [
+            NearDuplicate(self._ids[slot], self._clusters[slot], round(float(similarity[i]), 4))
+            for i, slot in ((i, int(slots[i])) for i in order)
+        ]
+
+    def _insert(self, intake_id: str, cluster_id: str, signature: np.ndarray) -> None:
+        # Caller holds _lock
+        slot = len(self._ids)
+        self._reserve(slot + 1)
+        self._signatures[slot] = signature
+        self._ids.append(intake_id)
+        self._clusters.append(cluster_id)
+        if cluster_id == intake_id:
+            self._cluster_count += 1
+        for band, key in enumerate(self._band_keys(signature[None, :])[0].tolist()):
+            bucket = self._recent[band].setdefault(key, [])
+            if len(bucket) < self.max_bucket:
+                bucket.append(slot)
+        if slot + 1 - self._merged >= self.merge_every:
+            self._merge()
+
+    def _merge(self) -> None:
+        """Fold unmerged slots into the sorted per-band arrays."""
+        # Caller holds _lock
+        start, end = self._merged, len(self._ids)
+        if start == end:
+            return
+        new_keys = self._band_keys(self._signatures[start:end]).T  # (bands, n)
+        new_slots = np.arange(start, end, dtype=np.uint32)
+        merged_keys = np.empty((self.bands, self._keys.shape[1] + end - start), dtype=np.uint32)
+        merged_slots = np.empty_like(merged_keys)
+        for band in range(self.bands):
+            order = np.argsort(new_keys[band], kind="stable")
+            keys = new_keys[band][order]
+            # side="right" keeps older slots ahead of newer ones within a bucket
+            positions = np.searchsorted(self._keys[band], keys, side="right")
+            merged_keys[band] = np.insert(self._keys[band], positions, keys)
+            merged_slots[band] = np.insert(self._slots[band], positions, new_slots[order])
+        self._keys, self._slots = merged_keys, merged_slots
+        self._merged = end
+        self._recent = [{} for _ in range(self.bands)]
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._signatures):
+            return
+        grown = np.zeros((max(size, 2 * len(self._signatures)), self.num_perm), dtype=np.uint32)
+        grown[: len(self._ids)] = self._signatures[: len(self._ids)]
+        self._signatures = grown
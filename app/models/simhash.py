@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .detection import DetectorEngine
+
+_BIT_WEIGHTS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def simhash64(text: str, min_tokens: int = 1) -> Optional[int]:
+    """
+    64-bit SimHash over lowercased ``DetectorEngine._tokenize`` tokens.
+
+    Each distinct token's BLAKE2b hash votes on every bit, weighted by its
+    count; a bit is set when the votes are positive. Returns None when the text
+    has fewer than ``min_tokens`` tokens.
+    """
+    tokens = DetectorEngine._tokenize(text.lower())
+    if not tokens or len(tokens) < min_tokens:
+        return None
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little") for token in counts),
+        dtype=np.uint64,
+        count=len(counts),
+    )
+    weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    bits = ((hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)).astype(np.int64)
+    votes = ((2 * bits - 1) * weights[:, None]).sum(axis=0)
+    return int(_BIT_WEIGHTS[votes > 0].sum(dtype=np.uint64))
+
+
+class SimHashIndex:
+    """
+    Multi-index Hamming table for k-bit neighbour queries over 64-bit SimHashes.
+
+    The 64 bits are split into ``blocks`` contiguous blocks. Two hashes within
+    ``max_distance`` bits differ in at most that many blocks, so they agree
+    exactly on at least ``blocks - max_distance`` of them. There is one table
+    per such combination of blocks. Each table stores every hash with its bits
+    permuted so the combination's blocks come first, sorted. A bucket is then
+    a contiguous slice found by binary search on the leading bits, and
+    candidates are kept when the XOR popcount is within ``max_distance`` (the
+    permutation does not change Hamming distance).
+
+    Tables cost 12 bytes per hash each (permuted uint64 plus uint32 slot).
+    Recent inserts sit in a dict merged every ``merge_every`` additions.
+    ``discard`` tombstones a slot, and dead slots are compacted away once they
+    are a quarter of the index, so memory is bounded by the live set. The
+    index is not thread-safe; GraphIntelEngine calls it under its lock.
+    """
+
+    def __init__(self, max_distance: int = 5, blocks: int = 6, merge_every: int = 65536) -> None:
+        if not 0 <= max_distance < blocks <= 64:
+            raise ValueError("need 0 <= max_distance < blocks <= 64")
+        self.max_distance = max_distance
+        self.blocks = blocks
+        self.merge_every = max(1, merge_every)
+        bounds = np.linspace(0, 64, blocks + 1).astype(int)
+        spans = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        # Per table: block spans in permuted order (key blocks first) and the key width
+        self._tables: List[Tuple[List[Tuple[int, int]], int]] = []
+        for combo in itertools.combinations(range(blocks), blocks - max_distance):
+            order = [spans[i] for i in combo] + [span for i, span in enumerate(spans) if i not in combo]
+            self._tables.append((order, sum(spans[i][1] - spans[i][0] for i in combo)))
+
+        self._hashes = np.zeros(1024, dtype=np.uint64)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._ids: List[str] = []
+        self._dead = 0
+        self._permuted = [np.zeros(0, dtype=np.uint64) for _ in self._tables]
+        self._slots = [np.zeros(0, dtype=np.uint32) for _ in self._tables]
+        self._merged = 0
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in self._tables]
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._dead
+
+    def add(self, key: str, fingerprint: int) -> None:
+        slot = len(self._ids)
+        self._reserve(slot + 1)
+        self._hashes[slot] = fingerprint
+        self._alive[slot] = True
+        self._ids.append(key)
+        value = np.array([fingerprint], dtype=np.uint64)
+        for table, recent in enumerate(self._recent):
+            recent.setdefault(self._bucket(table, int(self._permute(table, value)[0])), []).append(slot)
+        if slot + 1 - self._merged >= self.merge_every:
+            self._merge()
+
+    def load(self, entries: Iterable[Tuple[str, int]]) -> None:
+        """Bulk-add ``(key, fingerprint)`` pairs, building the tables once."""
+        keys: List[str] = []
+        values: List[int] = []
+        for key, fingerprint in entries:
+            keys.append(key)
+            values.append(fingerprint)
+        if not keys:
+            return
+        start = len(self._ids)
+        self._reserve(start + len(keys))
+        self._hashes[start : start + len(keys)] = np.array(values, dtype=np.uint64)
+        self._alive[start : start + len(keys)] = True
+        self._ids.extend(keys)
+        self._merge()
+
+    def query(self, fingerprint: int, limit: int = 10) -> List[Tuple[str, int]]:
+        """Live ``(key, distance)`` pairs within ``max_distance`` bits, nearest first."""
+        found: Dict[int, int] = {}
+        for slot, distance in self._within(fingerprint, self.max_distance):
+            if self._alive[slot]:
+                found[slot] = distance
+        ranked = sorted(found.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [(self._ids[slot], distance) for slot, distance in ranked]
+
+    def discard(self, key: str, fingerprint: int) -> bool:
+        """Tombstone the entry added under ``key`` with ``fingerprint``."""
+        for slot, _ in self._within(fingerprint, 0, tables=1):
+            if self._alive[slot] and self._ids[slot] == key:
+                self._alive[slot] = False
+                self._dead += 1
+                if self._dead * 4 > len(self._ids) and self._dead > 1024:
+                    self._compact()
+                return True
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hashes": len(self),
+            "tombstones": self._dead,
+            "tables": len(self._tables),
+            "max_distance": self.max_distance,
+            "index_bytes": int(
+                self._hashes[: len(self._ids)].nbytes
+                + sum(permuted.nbytes + slots.nbytes for permuted, slots in zip(self._permuted, self._slots))
+            ),
+        }
+
+    def _permute(self, table: int, values: np.ndarray) -> np.ndarray:
+        permuted = np.zeros(len(values), dtype=np.uint64)
+        for start, end in self._tables[table][0]:
+            width = np.uint64(end - start)
+            block = (values >> np.uint64(start)) & ((np.uint64(1) << width) - np.uint64(1))
+            permuted = (permuted << width) | block
+        return permuted
+
+    def _bucket(self, table: int, permuted: int) -> int:
+        return permuted >> (64 - self._tables[table][1])
+
+    def _within(self, fingerprint: int, max_distance: int, tables: Optional[int] = None) -> List[Tuple[int, int]]:
+        """``(slot, distance)`` for every stored hash within ``max_distance`` (duplicates possible)."""
+        value = np.array([fingerprint], dtype=np.uint64)
+        hits: List[Tuple[int, int]] = []
+        for table in range(tables or len(self._tables)):
+            query = self._permute(table, value)[0]
+            shift = 64 - self._tables[table][1]
+            low = (int(query) >> shift) << shift
+            permuted = self._permuted[table]
+            lo = np.searchsorted(permuted, np.uint64(low), side="left")
+            hi = np.searchsorted(permuted, np.uint64(low | ((1 << shift) - 1)), side="right")
+            if hi > lo:
+                distances = np.bitwise_count(permuted[lo:hi] ^ query)
+                close = np.flatnonzero(distances <= max_distance)
+                if len(close):
+                    hits.extend(zip(self._slots[table][lo + close].tolist(), distances[close].tolist()))
+            recent = self._recent[table].get(int(query) >> shift)
+            if recent:
+                distances = np.bitwise_count(self._hashes[recent] ^ np.uint64(fingerprint))
+                hits.extend((slot, int(d)) for slot, d in zip(recent, distances.tolist()) if d <= max_distance)
+        return hits
+
+    def _merge(self) -> None:
+        """Fold unmerged slots into the sorted tables."""
+        start, end = self._merged, len(self._ids)
+        if start == end:
+            return
+        values = self._hashes[start:end]
+        new_slots = np.arange(start, end, dtype=np.uint32)
+        for table in range(len(self._tables)):
+            permuted = self._permute(table, values)
+            order = np.argsort(permuted, kind="stable")
+            positions = np.searchsorted(self._permuted[table], permuted[order], side="right")
+            self._permuted[table] = np.insert(self._permuted[table], positions, permuted[order])
+            self._slots[table] = np.insert(self._slots[table], positions, new_slots[order])
+        self._merged = end
+        self._recent = [{} for _ in self._tables]
+
+    def _compact(self) -> None:
+        """Drop tombstoned slots and rebuild the tables from the live ones."""
+        live = np.flatnonzero(self._alive[: len(self._ids)])
+        hashes = self._hashes[live]
+        self._ids = [self._ids[slot] for slot in live.tolist()]
+        self._hashes = np.zeros(max(1024, len(live)), dtype=np.uint64)
+        self._alive = np.zeros(len(self._hashes), dtype=bool)
+        self._hashes[: len(live)] = hashes
+        self._alive[: len(live)] = True
+        self._dead = 0
+        self._permuted = [np.zeros(0, dtype=np.uint64) for _ in self._tables]
+        self._slots = [np.zeros(0, dtype=np.uint32) for _ in self._tables]
+        self._merged = 0
+        self._recent = [{} for _ in self._tables]
+        self._merge()
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._hashes):
+            return
+        capacity = max(size, 2 * len(self._hashes))
+        hashes = np.zeros(capacity, dtype=np.uint64)
+        alive = np.zeros(capacity, dtype=bool)
+        hashes[: len(self._ids)] = self._hashes[: len(self._ids)]
+        alive[: len(self._ids)] = self._alive[: len(self._ids)]
+        self._hashes, self._alive = hashes, alive
@@ -19,6 +19,13 @@ class ContentIntake(BaseModel):
     tags: Optional[List[str]] = None
 
 
+class LexiconHit(BaseModel):
+    category: str
+    term: str
+    start: int  # character offsets into the intake text
+    end: int
+
+
 class DetectionBreakdown(BaseModel):
     linguistic_score: float
     behavioral_score: float
@@ -29,6 +36,12 @@ class DetectionBreakdown(BaseModel):
     ollama_risk: Optional[float] = None
     stylometric_anomalies: Dict[str, float]
     heuristics: List[str]
+    # Distinct lexicon groups matched per category, and where (capped at LEXICON_MAX_POSITIONS)
+    lexicon_hits: Dict[str, int] = Field(default_factory=dict)
+    lexicon_matches: List[LexiconHit] = Field(default_factory=list)
+    # Model signals dropped for missing DETECTOR_DEADLINE_MS, and wall-clock ms per stage
+    timed_out_signals: List[str] = Field(default_factory=list)
+    stage_timings_ms: Dict[str, float] = Field(default_factory=dict)
 
 
 class ProvenancePayload(BaseModel):
@@ -53,6 +66,8 @@ class CoordinationAlert(BaseModel):
     shared_tags: List[str] = Field(default_factory=list)
     platforms: List[str] = Field(default_factory=list)
     risk: float
+    # Peer content linked to the actor's posts by SimHash near_duplicate edges
+    near_duplicates: List[str] = Field(default_factory=list)
 
 
 class PropagationChain(BaseModel):
@@ -79,6 +94,12 @@ class GraphSummary(BaseModel):
     propagation_chains: List[PropagationChain] = Field(default_factory=list)
 
 
+class NearDuplicateMatch(BaseModel):
+    intake_id: str
+    cluster_id: str
+    similarity: float  # MinHash estimate of word-shingle Jaccard similarity
+
+
 class DetectionResult(BaseModel):
     intake_id: str
     submitted_at: datetime
@@ -90,6 +111,19 @@ class DetectionResult(BaseModel):
     summary: Optional[str] = None
     findings: Optional[List[str]] = None
     decision_reason: Optional[str] = None
+    near_duplicate_cluster: Optional[str] = None
+    near_duplicates: Optional[List[NearDuplicateMatch]] = None
+
+
+class BatchThroughput(BaseModel):
+    items: int
+    processed: int
+    rejected: int
+    elapsed_ms: float
+    items_per_second: float
+    per_item_ms: float
+    single_post_per_item_ms: Optional[float] = None
+    speedup_vs_single_post: Optional[float] = None
 
 
 class ThreatIntelFeed(BaseModel):
@@ -1,18 +1,31 @@
 import asyncio
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 from fastapi.concurrency import run_in_threadpool
 
+from ..config import get_settings
 from ..models.detection import DetectorEngine
 from ..models.graph_intel import GraphIntelEngine
+from ..models.near_duplicate import NearDuplicateAssignment, NearDuplicateIndex
 from ..models.sharing import SharingEngine
 from ..models.watermark import WatermarkEngine
-from ..schemas import ContentIntake, DetectionResult, SharingPackage, SharingRequest
+from ..schemas import (
+    ContentIntake,
+    DetectionBreakdown,
+    DetectionResult,
+    NearDuplicateMatch,
+    SharingPackage,
+    SharingRequest,
+)
 from ..storage.database import Database
+from ..storage.graph_store import GraphStore
+from ..storage.write_behind import WriteBehindQueue
 
 try:
     from ..federated.manager import LedgerManager
@@ -26,12 +39,60 @@ except ImportError:
 
 class AnalysisOrchestrator:
     def __init__(self) -> None:
+        self.settings = get_settings()
         self.detector = DetectorEngine()
         self.watermark = WatermarkEngine()
-        self.graph = GraphIntelEngine()
+        graph_store = (
+            GraphStore(
+                self.settings.graph_store_path,
+                snapshot_every=self.settings.graph_snapshot_every,
+            )
+            if self.settings.graph_store_path
+            else None
+        )
+        self.graph = GraphIntelEngine(
+            refresh_interval=self.settings.graph_summary_refresh_seconds,
+            store=graph_store,
+            retention_days=self.settings.graph_retention_days,
+            max_content=self.settings.graph_retention_max_content,
+            sweep_interval=self.settings.graph_retention_sweep_seconds,
+            simhash_max_distance=(
+                self.settings.graph_simhash_max_distance if self.settings.graph_simhash_enabled else None
+            ),
+            simhash_blocks=self.settings.graph_simhash_blocks,
+            simhash_min_tokens=self.settings.graph_simhash_min_tokens,
+            near_duplicate_links=self.settings.graph_near_duplicate_links,
+        )
         self.sharing = SharingEngine()
         self.db = Database()
+        self.near_duplicates = (
+            NearDuplicateIndex(
+                num_perm=self.settings.near_duplicate_num_perm,
+                bands=self.settings.near_duplicate_bands,
+                shingle_size=self.settings.near_duplicate_shingle_size,
+                threshold=self.settings.near_duplicate_threshold,
+            )
+            if self.settings.near_duplicate_enabled
+            else None
+        )
+        if self.near_duplicates is not None:
+            self.near_duplicates.load(self.db.load_near_duplicates())
+        self.write_behind = (
+            WriteBehindQueue(
+                self.db,
+                max_batch_rows=self.settings.write_behind_batch_rows,
+                max_wait_ms=self.settings.write_behind_flush_ms,
+                max_pending=self.settings.write_behind_max_pending,
+                max_retries=self.settings.write_behind_max_retries,
+            )
+            if self.settings.write_behind_enabled
+            else None
+        )
         self._event_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=200)
+        # Updated from threadpool workers; the lock keeps concurrent intakes from losing updates
+        self._single_post_lock = threading.Lock()
+        self._single_post_count = 0
+        self._single_post_total_ms = 0.0
         
         # Initialize federated ledger if available
         if FEDERATED_ENABLED:
@@ -45,21 +106,62 @@ class AnalysisOrchestrator:
             self.ledger = None
             self.node = None
 
+    def close(self) -> None:
+        """Stop background workers; called on application shutdown."""
+        self.detector.close()
+        self.graph.close()
+        if self.write_behind is not None:
+            # Drain queued cases before the connection pools are closed
+            self.write_behind.close()
+
+    async def aclose(self) -> None:
+        """Close async clients; called on application shutdown before ``close``."""
+        await self.detector.aclose()
+
     async def process_intake(self, intake: ContentIntake) -> DetectionResult:
-        return await run_in_threadpool(self._process_sync, intake)
+        # Ollama is awaited on the loop; only the CPU-bound work takes a worker thread
+        started = time.perf_counter()
+        detection = await self.detector.detect_async(intake)
+        return await run_in_threadpool(self._process_sync, intake, detection, started)
+
+    async def process_batch(
+        self, intakes: List[ContentIntake]
+    ) -> AsyncGenerator[DetectionResult, None]:
+        """Analyse intakes chunk by chunk, yielding each result as its chunk completes."""
+        chunk_size = max(1, self.settings.batch_intake_chunk_size)
+        for start in range(0, len(intakes), chunk_size):
+            chunk = intakes[start : start + chunk_size]
+            # The chunk's Ollama requests are awaited together on the loop
+            detections = await self.detector.detect_batch_async(chunk)
+            for result in await run_in_threadpool(self._process_batch_sync, chunk, detections):
+                yield result
+
+    def single_post_latency_ms(self) -> Optional[float]:
+        """Mean wall-clock time of the single-post path, if any intake has used it."""
+        with self._single_post_lock:
+            if not self._single_post_count:
+                return None
+            return self._single_post_total_ms / self._single_post_count
 
-    def _process_sync(self, intake: ContentIntake) -> DetectionResult:
+    def _process_sync(
+        self,
+        intake: ContentIntake,
+        detection: Optional[Tuple[float, str, DetectionBreakdown]] = None,
+        started: Optional[float] = None,
+    ) -> DetectionResult:
+        started = time.perf_counter() if started is None else started
         intake_id = str(uuid4())
         submitted_at = datetime.utcnow()
 
-        composite_score, classification, breakdown = self.detector.detect(intake)
+        composite_score, classification, breakdown = detection or self.detector.detect(intake)
         provenance = self.watermark.verify(intake.text)
+        near_duplicate = self._assign_near_duplicate(intake_id, intake.text)
         graph_summary = self.graph.ingest(intake_id, intake, classification, composite_score)
 
         summary_text = self._generate_summary(intake, classification, composite_score, breakdown)
         decision_reason = self._build_decision_reason(classification, composite_score, breakdown)
 
-        self.db.save_case(
+        case = dict(
             intake_id=intake_id,
             raw_text=intake.text,
             classification=classification,
@@ -69,21 +171,152 @@ class AnalysisOrchestrator:
             provenance=provenance.dict(),
             summary=summary_text,
             decision_reason=decision_reason,
+            near_duplicate_cluster=near_duplicate.cluster_id if near_duplicate else None,
         )
-        self.db.log_action(
+        near_duplicate_row = (
+            (intake_id, near_duplicate.cluster_id, near_duplicate.signature) if near_duplicate else None
+        )
+        action = dict(
             intake_id=intake_id,
             action="analysis_completed",
             actor="system",
             payload={"score": composite_score, "classification": classification},
         )
+        if self.write_behind is not None:
+            # Returns once queued; the writer thread group-commits in the background
+            self.write_behind.submit(
+                case,
+                action,
+                (intake_id, intake.text, provenance.content_hash),
+                near_duplicate_row,
+            )
+        else:
+            # Case, audit entry and fingerprint commit together
+            with self.db.unit_of_work():
+                self.db.save_case(**case)
+                self.db.log_action(**action)
+                if near_duplicate_row is not None:
+                    self.db.store_near_duplicate(*near_duplicate_row)
 
-        # Store fingerprint for post-hoc verification
-        try:
-            self.db.store_fingerprint(intake_id, intake.text, provenance.content_hash)
-        except Exception:
-            # non-fatal; continue
-            pass
+                # Store fingerprint for post-hoc verification
+                try:
+                    self.db.store_fingerprint(intake_id, intake.text, provenance.content_hash)
+                except Exception:
+                    # non-fatal; continue
+                    pass
+
+        result = self._build_result(
+            intake_id,
+            submitted_at,
+            composite_score,
+            classification,
+            breakdown,
+            provenance,
+            graph_summary,
+            summary_text,
+            decision_reason,
+            near_duplicate=near_duplicate,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._single_post_lock:
+            self._single_post_count += 1
+            self._single_post_total_ms += elapsed_ms
+        return result
+
+    def _process_batch_sync(
+        self,
+        intakes: List[ContentIntake],
+        detections: Optional[List[Tuple[float, str, DetectionBreakdown]]] = None,
+    ) -> List[DetectionResult]:
+        intake_ids = [str(uuid4()) for _ in intakes]
+        submitted_at = datetime.utcnow()
+
+        detections = detections or self.detector.detect_batch(intakes)
+        provenances = [self.watermark.verify(intake.text) for intake in intakes]
+        graph_summary = self.graph.ingest_many(
+            (intake_id, intake, classification, composite_score)
+            for intake_id, intake, (composite_score, classification, _) in zip(
+                intake_ids, intakes, detections
+            )
+        )
+
+        cases: List[Dict[str, Any]] = []
+        actions: List[Dict[str, Any]] = []
+        fingerprints: List[Tuple[str, str, str]] = []
+        near_duplicate_rows: List[Tuple[str, str, bytes]] = []
+        results: List[DetectionResult] = []
+        for intake_id, intake, (composite_score, classification, breakdown), provenance in zip(
+            intake_ids, intakes, detections, provenances
+        ):
+            summary_text = self._generate_summary(intake, classification, composite_score, breakdown)
+            decision_reason = self._build_decision_reason(classification, composite_score, breakdown)
+            near_duplicate = self._assign_near_duplicate(intake_id, intake.text)
+            if near_duplicate is not None:
+                near_duplicate_rows.append((intake_id, near_duplicate.cluster_id, near_duplicate.signature))
+            cases.append(
+                {
+                    "intake_id": intake_id,
+                    "raw_text": intake.text,
+                    "classification": classification,
+                    "composite_score": composite_score,
+                    "metadata": intake.dict().get("metadata", {}) or {},
+                    "breakdown": breakdown.dict(),
+                    "provenance": provenance.dict(),
+                    "summary": summary_text,
+                    "decision_reason": decision_reason,
+                    "near_duplicate_cluster": near_duplicate.cluster_id if near_duplicate else None,
+                }
+            )
+            actions.append(
+                {
+                    "intake_id": intake_id,
+                    "action": "analysis_completed",
+                    "actor": "system",
+                    "payload": {"score": composite_score, "classification": classification},
+                }
+            )
+            fingerprints.append((intake_id, intake.text, provenance.content_hash))
+            results.append(
+                self._build_result(
+                    intake_id,
+                    submitted_at,
+                    composite_score,
+                    classification,
+                    breakdown,
+                    provenance,
+                    graph_summary,
+                    summary_text,
+                    decision_reason,
+                    near_duplicate=near_duplicate,
+                    emit=False,
+                )
+            )
 
+        if self.write_behind is not None:
+            # Same queue, ordering and counters as the single-post path
+            near_duplicate_by_id = {row[0]: row for row in near_duplicate_rows}
+            for case, action, fingerprint in zip(cases, actions, fingerprints):
+                self.write_behind.submit(case, action, fingerprint, near_duplicate_by_id.get(case["intake_id"]))
+        else:
+            self.db.save_analysis_batch(cases, actions, fingerprints, near_duplicate_rows)
+        for result in results:
+            self._emit_completed(result)
+        return results
+
+    def _build_result(
+        self,
+        intake_id: str,
+        submitted_at: datetime,
+        composite_score: float,
+        classification: str,
+        breakdown,
+        provenance,
+        graph_summary,
+        summary_text: str,
+        decision_reason: str,
+        near_duplicate: Optional[NearDuplicateAssignment] = None,
+        emit: bool = True,
+    ) -> DetectionResult:
         result = DetectionResult(
             intake_id=intake_id,
             submitted_at=submitted_at,
@@ -95,18 +328,27 @@ class AnalysisOrchestrator:
             summary=summary_text,
             findings=breakdown.heuristics[:5] if breakdown.heuristics else None,
             decision_reason=decision_reason,
+            near_duplicate_cluster=near_duplicate.cluster_id if near_duplicate else None,
+            near_duplicates=(
+                [NearDuplicateMatch(**vars(match)) for match in near_duplicate.matches]
+                if near_duplicate
+                else None
+            ),
         )
+        if emit:
+            self._emit_completed(result)
+        return result
 
+    def _emit_completed(self, result: DetectionResult) -> None:
         self._emit_event(
             {
                 "type": "analysis_completed",
-                "intake_id": intake_id,
-                "score": composite_score,
-                "classification": classification,
-                "submitted_at": submitted_at.isoformat(),
+                "intake_id": result.intake_id,
+                "score": result.composite_score,
+                "classification": result.classification,
+                "submitted_at": result.submitted_at.isoformat(),
             }
         )
-        return result
 
     async def stream_events(self) -> AsyncGenerator[Dict[str, Any], None]:
         while True:
@@ -116,6 +358,16 @@ class AnalysisOrchestrator:
     def check_fingerprint(self, text: str) -> list[Dict[str, Any]]:
         return self.db.check_fingerprint(text)
 
+    def check_near_duplicates(self, text: str) -> List[NearDuplicateMatch]:
+        if self.near_duplicates is None:
+            return []
+        return [NearDuplicateMatch(**vars(match)) for match in self.near_duplicates.query(text)]
+
+    def _assign_near_duplicate(self, intake_id: str, text: str) -> Optional[NearDuplicateAssignment]:
+        if self.near_duplicates is None:
+            return None
+        return self.near_duplicates.add(intake_id, text)
+
     async def _fetch_case_from_main_api(self, intake_id: str) -> Optional[Dict[str, Any]]:
         """Fetch case data from main API if not found locally (for federated nodes)."""
         main_api_url = os.getenv("MAIN_API_URL", "http://localhost:8000")
@@ -1,12 +1,29 @@
 import hashlib
 import json
-import sqlite3
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from ..config import get_settings
+from .migrations import MIGRATIONS, apply_migrations, hash_blob, hash_text
+from .sqlite_pool import get_pool
+from .write_behind import active_queue
+
+
+def normalize_text(text: str) -> str:
+    # simple normalization for fuzzy match: lowercase and collapse whitespace
+    return "".join(text.lower().split())
+
+
+def normalized_text_digest(text: str) -> bytes:
+    """SHA-256 of the normalized text; the key shared by fingerprints and caches."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+def normalized_text_hash(text: str) -> str:
+    """Hex form of ``normalized_text_digest``."""
+    return normalized_text_digest(text).hex()
 
 
 class Database:
@@ -14,65 +31,56 @@ class Database:
         settings = get_settings()
         self.path = settings.database_url.replace("sqlite:///", "")
         Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool = get_pool(self.path)
         self._initialise()
 
     def _initialise(self) -> None:
-        with self._cursor() as cur:
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS cases (
-                    intake_id TEXT PRIMARY KEY,
-                    raw_text TEXT NOT NULL,
-                    classification TEXT NOT NULL,
-                    composite_score REAL NOT NULL,
-                    metadata_json TEXT,
-                    breakdown_json TEXT,
-                    provenance_json TEXT,
-                    summary_text TEXT,
-                    decision_reason TEXT,
-                    created_at TEXT NOT NULL
-                )
-            """
-            )
-            cur.execute("PRAGMA table_info(cases)")
-            columns = {row[1] for row in cur.fetchall()}
-            if "summary_text" not in columns:
-                cur.execute("ALTER TABLE cases ADD COLUMN summary_text TEXT")
-            if "decision_reason" not in columns:
-                cur.execute("ALTER TABLE cases ADD COLUMN decision_reason TEXT")
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    intake_id TEXT,
-                    action TEXT NOT NULL,
-                    actor TEXT NOT NULL,
-                    payload TEXT,
-                    created_at TEXT NOT NULL
-                )
-            """
-            )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS fingerprints (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    intake_id TEXT NOT NULL,
-                    content_hash TEXT NOT NULL,
-                    normalized_hash TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """
-            )
+        apply_migrations(self._pool, MIGRATIONS)
 
     @contextmanager
     def _cursor(self):
-        conn = sqlite3.connect(self.path)
-        try:
-            cur = conn.cursor()
+        with self._pool.cursor() as cur:
             yield cur
-            conn.commit()
-        finally:
-            conn.close()
+
+    def unit_of_work(self):
+        """Commit every write made on this thread inside the block as one transaction."""
+        return self._pool.unit_of_work()
+
+    _CASE_INSERT = """
+        INSERT OR REPLACE INTO cases (
+            intake_id,
+            raw_text,
+            classification,
+            composite_score,
+            metadata_json,
+            breakdown_json,
+            provenance_json,
+            summary_text,
+            decision_reason,
+            near_duplicate_cluster,
+            created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    _AUDIT_INSERT = """
+        INSERT INTO audit_log (intake_id, action, actor, payload, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    # Repeats of a (normalized, content) pair only bump the counters
+    _FINGERPRINT_INSERT = """
+        INSERT INTO fingerprints (
+            normalized_hash, content_hash, first_intake_id, last_intake_id, first_seen, last_seen
+        ) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (normalized_hash, content_hash) DO UPDATE SET
+            occurrences = occurrences + 1,
+            last_intake_id = excluded.last_intake_id,
+            last_seen = excluded.last_seen
+    """
+    _NEAR_DUPLICATE_INSERT = """
+        INSERT INTO near_duplicates (intake_id, cluster_id, signature) VALUES (?, ?, ?)
+    """
+    _FINGERPRINT_COLUMNS = (
+        "normalized_hash, content_hash, first_intake_id, last_intake_id, first_seen, last_seen, occurrences"
+    )
 
     def save_case(
         self,
@@ -85,75 +93,190 @@ class Database:
         provenance: Dict[str, Any],
         summary: Optional[str] = None,
         decision_reason: Optional[str] = None,
+        near_duplicate_cluster: Optional[str] = None,
     ) -> None:
         with self._cursor() as cur:
             cur.execute(
-                """
-                INSERT OR REPLACE INTO cases (
-                    intake_id,
-                    raw_text,
-                    classification,
-                    composite_score,
-                    metadata_json,
-                    breakdown_json,
-                    provenance_json,
-                    summary_text,
-                    decision_reason,
-                    created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
+                self._CASE_INSERT,
+                self._case_row(
                     intake_id,
                     raw_text,
                     classification,
                     composite_score,
-                    json.dumps(metadata),
-                    json.dumps(breakdown),
-                    json.dumps(provenance),
+                    metadata,
+                    breakdown,
+                    provenance,
                     summary,
                     decision_reason,
-                    datetime.utcnow().isoformat(),
+                    near_duplicate_cluster,
                 ),
             )
 
+    def save_analysis_batch(
+        self,
+        cases: List[Dict[str, Any]],
+        actions: List[Dict[str, Any]],
+        fingerprints: List[Tuple[str, str, str]],
+        near_duplicates: Sequence[Tuple[str, str, bytes]] = (),
+    ) -> None:
+        """
+        Persist a batch of analysed intakes in a single transaction.
+
+        ``cases`` and ``actions`` hold keyword arguments for ``save_case`` and
+        ``log_action`` (plus an optional ``created_at``); ``fingerprints`` holds
+        ``(intake_id, text, content_hash)`` or ``(intake_id, text, content_hash, created_at)``;
+        ``near_duplicates`` holds ``(intake_id, cluster_id, signature)``.
+        """
+        with self._cursor() as cur:
+            cur.executemany(self._CASE_INSERT, [self._case_row(**case) for case in cases])
+            cur.executemany(self._AUDIT_INSERT, [self._audit_row(**action) for action in actions])
+            cur.executemany(
+                self._FINGERPRINT_INSERT,
+                [self._fingerprint_row(*fingerprint) for fingerprint in fingerprints],
+            )
+            if near_duplicates:
+                cur.executemany(self._NEAR_DUPLICATE_INSERT, near_duplicates)
+
+    def save_dead_letters(self, rows: Sequence[Tuple[str, str, str]]) -> None:
+        """Record ``(intake_id, payload_json, error)`` rows the write-behind queue gave up on."""
+        failed_at = datetime.utcnow().isoformat()
+        with self._cursor() as cur:
+            cur.executemany(
+                "INSERT INTO write_behind_dead_letter (intake_id, payload, error, failed_at) VALUES (?, ?, ?, ?)",
+                [(intake_id, payload, error, failed_at) for intake_id, payload, error in rows],
+            )
+
+    def fetch_dead_letters(self) -> List[Dict[str, Any]]:
+        with self._cursor() as cur:
+            rows = cur.execute(
+                "SELECT intake_id, payload, error, failed_at FROM write_behind_dead_letter ORDER BY id"
+            ).fetchall()
+        return [
+            {"intake_id": intake_id, "payload": json.loads(payload), "error": error, "failed_at": failed_at}
+            for intake_id, payload, error, failed_at in rows
+        ]
+
+    def _case_row(
+        self,
+        intake_id: str,
+        raw_text: str,
+        classification: str,
+        composite_score: float,
+        metadata: Dict[str, Any],
+        breakdown: Dict[str, Any],
+        provenance: Dict[str, Any],
+        summary: Optional[str] = None,
+        decision_reason: Optional[str] = None,
+        near_duplicate_cluster: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> Tuple:
+        return (
+            intake_id,
+            raw_text,
+            classification,
+            composite_score,
+            json.dumps(metadata),
+            json.dumps(breakdown),
+            json.dumps(provenance),
+            summary,
+            decision_reason,
+            near_duplicate_cluster,
+            created_at or datetime.utcnow().isoformat(),
+        )
+
+    def _audit_row(
+        self,
+        intake_id: str,
+        action: str,
+        actor: str,
+        payload: Dict[str, Any],
+        created_at: Optional[str] = None,
+    ) -> Tuple:
+        return (intake_id, action, actor, json.dumps(payload), created_at or datetime.utcnow().isoformat())
+
+    def _fingerprint_row(
+        self, intake_id: str, text: str, content_hash: str, created_at: Optional[str] = None
+    ) -> Tuple:
+        created_at = created_at or datetime.utcnow().isoformat()
+        return (normalized_text_digest(text), hash_blob(content_hash), intake_id, intake_id, created_at, created_at)
+
+    @staticmethod
+    def _fingerprint_match(row: Tuple) -> Dict[str, Any]:
+        """Public shape of a fingerprint row (``_FINGERPRINT_COLUMNS`` order)."""
+        return {
+            "intake_id": row[2],
+            "content_hash": hash_text(row[1]),
+            "normalized_hash": hash_text(row[0]),
+            "created_at": row[4],
+            "last_intake_id": row[3],
+            "last_seen": row[5],
+            "occurrences": row[6],
+        }
+
     def _normalize_text(self, text: str) -> str:
-        # simple normalization for fuzzy match: lowercase and collapse whitespace
-        return "".join(text.lower().split())
+        return normalize_text(text)
 
     def store_fingerprint(self, intake_id: str, text: str, content_hash: str) -> None:
-        normalized_hash = hashlib.sha256(self._normalize_text(text).encode("utf-8")).hexdigest()
         with self._cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO fingerprints (intake_id, content_hash, normalized_hash, created_at)
-                VALUES (?, ?, ?, ?)
-            """,
-                (intake_id, content_hash, normalized_hash, datetime.utcnow().isoformat()),
-            )
+            cur.execute(self._FINGERPRINT_INSERT, self._fingerprint_row(intake_id, text, content_hash))
+
+    def store_near_duplicate(self, intake_id: str, cluster_id: str, signature: bytes) -> None:
+        with self._cursor() as cur:
+            cur.execute(self._NEAR_DUPLICATE_INSERT, (intake_id, cluster_id, signature))
+
+    def load_near_duplicates(self, chunk_size: int = 50000) -> Iterator[Tuple[str, str, bytes]]:
+        """Stored ``(intake_id, cluster_id, signature)`` rows in insertion order."""
+        with self._cursor() as cur:
+            cur.execute("SELECT intake_id, cluster_id, signature FROM near_duplicates ORDER BY slot")
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from rows
 
     def check_fingerprint(self, text: str) -> list[Dict[str, Any]]:
-        normalized_hash = hashlib.sha256(self._normalize_text(text).encode("utf-8")).hexdigest()
+        """
+        Stored fingerprints whose normalized hash matches ``text`` after
+        normalization, or whose content hash matches ``text`` verbatim.
+
+        Each match reports the first intake seen with that pair (``intake_id``,
+        ``created_at``) plus ``occurrences`` and the latest intake.
+        """
+        normalized = normalized_text_digest(text)
+        content = hashlib.sha256(text.encode("utf-8")).digest()
+        # Read the write-behind buffer before the table so a batch committing in
+        # between is seen at least once; already-committed entries are skipped below
+        queue = active_queue(self.path)
+        pending = queue.pending_fingerprints(normalized.hex(), content.hex()) if queue else []
         with self._cursor() as cur:
             cur.execute(
-                """
-                SELECT intake_id, content_hash, normalized_hash, created_at
-                FROM fingerprints
-                WHERE normalized_hash = ? OR content_hash = ?
+                f"""
+                SELECT {self._FINGERPRINT_COLUMNS} FROM fingerprints WHERE normalized_hash = ?
+                UNION
+                SELECT {self._FINGERPRINT_COLUMNS} FROM fingerprints WHERE content_hash = ?
             """,
-                (normalized_hash, normalized_hash),
+                (normalized, content),
             )
-            rows = cur.fetchall() or []
-            return [
-                {
-                    "intake_id": r[0],
-                    "content_hash": r[1],
-                    "normalized_hash": r[2],
-                    "created_at": r[3],
-                }
-                for r in rows
-            ]
+            matches = [self._fingerprint_match(row) for row in cur.fetchall()]
+        by_key = {(match["normalized_hash"], match["content_hash"]): match for match in matches}
+        for row in pending:
+            key = (row["normalized_hash"], row["content_hash"])
+            match = by_key.get(key)
+            if match is None:
+                by_key[key] = row
+                matches.append(row)
+            elif row["created_at"] > match["last_seen"]:
+                match["occurrences"] += 1
+                match["last_intake_id"] = row["intake_id"]
+                match["last_seen"] = row["created_at"]
+        return matches
 
     def fetch_case(self, intake_id: str) -> Optional[Dict[str, Any]]:
+        queue = active_queue(self.path)
+        if queue is not None:
+            pending = queue.pending_case(intake_id)
+            if pending is not None:
+                return pending
         with self._cursor() as cur:
             cur.execute(
                 """
@@ -166,7 +289,8 @@ class Database:
                     provenance_json,
                     summary_text,
                     decision_reason,
-                    created_at
+                    created_at,
+                    near_duplicate_cluster
                 FROM cases WHERE intake_id=?
             """,
                 (intake_id,),
@@ -187,20 +311,9 @@ class Database:
                 "summary": row[6],
                 "decision_reason": row[7],
                 "created_at": row[8],
+                "near_duplicate_cluster": row[9],
             }
 
     def log_action(self, intake_id: str, action: str, actor: str, payload: Dict[str, Any]):
         with self._cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO audit_log (intake_id, action, actor, payload, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (
-                    intake_id,
-                    action,
-                    actor,
-                    json.dumps(payload),
-                    datetime.utcnow().isoformat(),
-                ),
-            )
+            cur.execute(self._AUDIT_INSERT, self._audit_row(intake_id, action, actor, payload))
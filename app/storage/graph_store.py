@@ -0,0 +1,363 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Log records: ("n", node, attrs) for node upserts, ("e", source, target, attrs) for edges,
+# ("dn", node) for retention removals (the node's edges go with it)
+Record = Tuple[Any, ...]
+Edge = Tuple[str, str, Dict[str, Any]]
+
+_FRAME = struct.Struct("<I")
+
+logger = logging.getLogger(__name__)
+
+
+def fold_records(nodes: Dict[str, Dict[str, Any]], edges: List[Edge], records: Sequence[Record]) -> List[Edge]:
+    """
+    Apply log ``records`` to snapshot ``nodes`` (in place) and ``edges``; returns the edges.
+
+    Each node and edge is built once. A removed node bumps its generation,
+    which invalidates edges logged against an earlier incarnation of it.
+    Edges may repeat; the later attributes win when they are added to a graph.
+    """
+    generation: Dict[str, int] = {}
+    logged: List[Tuple[str, str, Dict[str, Any], int, int]] = []
+    for record in records:
+        kind = record[0]
+        if kind == "n":
+            attrs = nodes.get(record[1])
+            if attrs is None:
+                nodes[record[1]] = dict(record[2])
+            else:
+                attrs.update(record[2])
+        elif kind == "dn":
+            nodes.pop(record[1], None)
+            generation[record[1]] = generation.get(record[1], 0) + 1
+        elif record[1] in nodes and record[2] in nodes:
+            logged.append((*record[1:], generation.get(record[1], 0), generation.get(record[2], 0)))
+    if generation:
+        edges = [edge for edge in edges if edge[0] not in generation and edge[1] not in generation]
+    edges.extend(
+        (source, target, attrs)
+        for source, target, attrs, source_gen, target_gen in logged
+        if source in nodes
+        and target in nodes
+        and generation.get(source, 0) == source_gen
+        and generation.get(target, 0) == target_gen
+    )
+    return edges
+
+
+class GraphStore:
+    """
+    Restart-safe persistence for GraphIntelEngine.
+
+    Mutations are appended to ``graph.log`` as length-prefixed pickle frames and
+    flushed once per ingest. Every ``snapshot_every`` records ``start_snapshot``
+    seals the log as ``graph.log.sealed`` and opens a fresh one; that is all
+    the caller waits for. A background thread then folds the sealed segment
+    into the previous snapshot, writes ``graph.snapshot`` atomically (temp file,
+    fsync, rename) and deletes the segment. The live graph is never copied or
+    read for a snapshot.
+
+    Startup loads the snapshot and replays the sealed segment (if a compaction
+    did not finish) and then the log. A torn final frame from a crash is
+    dropped. Replaying records that are already in the snapshot is harmless
+    because upserts are idempotent.
+    """
+
+    LOG_NAME = "graph.log"
+    SEALED_NAME = "graph.log.sealed"
+    SNAPSHOT_NAME = "graph.snapshot"
+    FORMAT_VERSION = 2
+    # Snapshots are pickled in frames of this many nodes or edges, so the background
+    # compactor holds the GIL for one short frame at a time rather than the whole graph
+    SNAPSHOT_CHUNK = 8192
+    _SNAPSHOT_MAGIC = b"GRAPHSNAP2\n"
+
+    def __init__(self, directory: str, snapshot_every: int = 200000) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / self.LOG_NAME
+        self.sealed_path = self.directory / self.SEALED_NAME
+        self.snapshot_path = self.directory / self.SNAPSHOT_NAME
+        self.snapshot_every = max(1, int(snapshot_every))
+        self._pending: List[bytes] = []
+        self._log_records = 0
+        self._lock = threading.Lock()
+        self._log = None
+        self._compactor: Optional[threading.Thread] = None
+        self._counters: Dict[str, float] = {
+            "snapshots_written": 0,
+            "snapshot_errors": 0,
+            "records_appended": 0,
+            "last_snapshot_seconds": 0.0,
+        }
+
+    def load(
+        self,
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str, Dict[str, Any]]], List[Record]]:
+        """
+        Return ``(snapshot nodes, snapshot edges, log tail)`` and open the log for appending.
+        The tail is the sealed segment of an unfinished compaction followed by the log.
+        """
+        nodes, edges = self._read_snapshot()
+        sealed = self._read_records(self.sealed_path, truncate=False)
+        tail = self._read_records(self.log_path, truncate=True)
+        self._log_records = len(sealed) + len(tail)
+        self._log = open(self.log_path, "ab")
+        return nodes, edges, sealed + tail
+
+    def append(self, record: Record) -> None:
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self._pending.append(_FRAME.pack(len(data)) + data)
+
+    def commit(self) -> None:
+        """Write buffered records to the log in one call."""
+        if not self._pending:
+            return
+        with self._lock:
+            if self._log is None:
+                self._log = open(self.log_path, "ab")
+            self._log.write(b"".join(self._pending))
+            self._log.flush()
+            self._log_records += len(self._pending)
+            self._counters["records_appended"] += len(self._pending)
+            self._pending = []
+
+    @property
+    def snapshot_due(self) -> bool:
+        return self._log_records >= self.snapshot_every and not self.snapshot_running
+
+    @property
+    def snapshot_running(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def start_snapshot(self) -> bool:
+        """
+        Seal the log and compact it into the snapshot on a background thread.
+        Only the seal (a rename, or an append after an unfinished compaction)
+        runs on the caller's thread. False if a compaction is still running.
+        """
+        if self.snapshot_running:
+            return False
+        self.commit()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            if self.sealed_path.exists():
+                # A compaction did not finish before a restart; the segment keeps growing
+                with open(self.sealed_path, "ab") as sealed, open(self.log_path, "rb") as log:
+                    sealed.write(log.read())
+                    sealed.flush()
+                    os.fsync(sealed.fileno())
+            elif self.log_path.exists():
+                os.replace(self.log_path, self.sealed_path)
+            self._log = open(self.log_path, "wb")
+            self._log_records = 0
+        self._compactor = threading.Thread(target=self._compact, name="graph-snapshot", daemon=True)
+        self._compactor.start()
+        return True
+
+    def wait_snapshot(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a running compaction; False if it is still running after ``timeout``."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+        return not self.snapshot_running
+
+    def write_snapshot(
+        self,
+        nodes: Sequence[Tuple[str, Dict[str, Any]]],
+        edges: Sequence[Tuple[str, str, Dict[str, Any]]],
+    ) -> None:
+        """
+        Persist the full graph from the caller's lists and start a fresh log
+        (tools that build a store offline; the engine uses ``start_snapshot``).
+        """
+        started = time.perf_counter()
+        self._write_snapshot_file(nodes, edges)
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = open(self.log_path, "wb")
+            self._log_records = 0
+            if self.sealed_path.exists():
+                os.remove(self.sealed_path)
+        self._counters["snapshots_written"] += 1
+        self._counters["last_snapshot_seconds"] = round(time.perf_counter() - started, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.directory),
+            "log_records": self._log_records,
+            "log_bytes": self.log_path.stat().st_size if self.log_path.exists() else 0,
+            "snapshot_bytes": self.snapshot_path.stat().st_size if self.snapshot_path.exists() else 0,
+            "snapshot_every": self.snapshot_every,
+            "snapshot_running": self.snapshot_running,
+            **self._counters,
+        }
+
+    def close(self) -> None:
+        # A compaction stopped halfway is redone from the sealed segment on the next start
+        self.wait_snapshot()
+        self.commit()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _compact(self) -> None:
+        """
+        Fold the sealed segment into the snapshot, streaming the snapshot frame by frame.
+
+        Only the segment's records, its folded nodes and edges, and the set of
+        snapshot node ids are held at once. Materialising the whole graph here
+        would set off full garbage collections that stall every other thread.
+        """
+        started = time.perf_counter()
+        try:
+            records = self._read_records(self.sealed_path, truncate=False)
+            snapshot_ids = set()
+            for kind, items in self._snapshot_frames():
+                if kind != "nodes":
+                    break
+                snapshot_ids.update(name for name, _ in items)
+            # Same rules as fold_records, with the snapshot's attributes left on disk
+            alive: Dict[str, bool] = {}
+            replaced = set()
+            updates: Dict[str, Dict[str, Any]] = {}
+            generation: Dict[str, int] = {}
+            logged: List[Tuple[str, str, Dict[str, Any], int, int]] = []
+
+            def exists(name: str) -> bool:
+                return alive.get(name, name in snapshot_ids)
+
+            for record in records:
+                kind = record[0]
+                if kind == "n":
+                    alive[record[1]] = True
+                    updates.setdefault(record[1], {}).update(record[2])
+                elif kind == "dn":
+                    alive[record[1]] = False
+                    updates.pop(record[1], None)
+                    replaced.add(record[1])
+                    generation[record[1]] = generation.get(record[1], 0) + 1
+                elif exists(record[1]) and exists(record[2]):
+                    logged.append((*record[1:], generation.get(record[1], 0), generation.get(record[2], 0)))
+            # Re-logged edges collapse to one entry with merged attributes, as in the graph
+            merged: Dict[Tuple[str, str], Edge] = {}
+            for source, target, attrs, source_gen, target_gen in logged:
+                if not (
+                    exists(source)
+                    and exists(target)
+                    and generation.get(source, 0) == source_gen
+                    and generation.get(target, 0) == target_gen
+                ):
+                    continue
+                key = (source, target) if source <= target else (target, source)
+                previous = merged.get(key)
+                merged[key] = (source, target, {**previous[2], **attrs} if previous else attrs)
+
+            def nodes():
+                for kind, items in self._snapshot_frames():
+                    if kind != "nodes":
+                        break
+                    for name, attrs in items:
+                        if name not in replaced:
+                            yield name, {**attrs, **updates.pop(name)} if name in updates else attrs
+                yield from updates.items()
+
+            def edges():
+                for kind, items in self._snapshot_frames():
+                    if kind != "edges":
+                        continue
+                    for source, target, attrs in items:
+                        if source in generation or target in generation:
+                            continue
+                        key = (source, target) if source <= target else (target, source)
+                        update = merged.pop(key, None)
+                        yield (update[0], update[1], {**attrs, **update[2]}) if update else (source, target, attrs)
+                yield from merged.values()
+
+            self._write_snapshot_file(nodes(), edges())
+            os.remove(self.sealed_path)
+        except Exception:  # noqa: BLE001 - the sealed segment stays and is replayed on restart
+            logger.exception("graph snapshot compaction failed")
+            self._counters["snapshot_errors"] += 1
+            return
+        self._counters["snapshots_written"] += 1
+        self._counters["last_snapshot_seconds"] = round(time.perf_counter() - started, 3)
+
+    def _write_snapshot_file(self, nodes: Iterable[Tuple[str, Dict[str, Any]]], edges: Iterable[Edge]) -> None:
+        """Write node frames, then edge frames, of up to ``SNAPSHOT_CHUNK`` items each."""
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as handle:
+            handle.write(self._SNAPSHOT_MAGIC)
+            for kind, items in (("nodes", iter(nodes)), ("edges", iter(edges))):
+                chunk = list(islice(items, self.SNAPSHOT_CHUNK))
+                while chunk:
+                    data = pickle.dumps((kind, chunk), protocol=pickle.HIGHEST_PROTOCOL)
+                    handle.write(_FRAME.pack(len(data)) + data)
+                    chunk = list(islice(items, self.SNAPSHOT_CHUNK))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _snapshot_frames(self) -> Iterator[Tuple[str, List[Any]]]:
+        """Yield ``("nodes", [...])`` frames, then ``("edges", [...])`` frames."""
+        if not self.snapshot_path.exists():
+            return
+        with open(self.snapshot_path, "rb") as handle:
+            if handle.read(len(self._SNAPSHOT_MAGIC)) != self._SNAPSHOT_MAGIC:
+                # Format 1: the whole graph as one pickled dict
+                handle.seek(0)
+                payload = pickle.load(handle)
+                if isinstance(payload, dict) and payload.get("format") == 1:
+                    yield "nodes", list(payload.get("nodes", ()))
+                    yield "edges", list(payload.get("edges", ()))
+                return
+            while True:
+                header = handle.read(_FRAME.size)
+                if len(header) < _FRAME.size:
+                    return
+                (length,) = _FRAME.unpack(header)
+                yield pickle.loads(handle.read(length))
+
+    def _read_snapshot(self) -> Tuple[Dict[str, Dict[str, Any]], List[Edge]]:
+        nodes: Dict[str, Dict[str, Any]] = {}
+        edges: List[Edge] = []
+        for kind, items in self._snapshot_frames():
+            if kind == "nodes":
+                nodes.update(items)
+            else:
+                edges.extend(items)
+        return nodes, edges
+
+    def _read_records(self, path: Path, truncate: bool) -> List[Record]:
+        if not path.exists():
+            return []
+        data = path.read_bytes()
+        records: List[Record] = []
+        offset = 0
+        while offset + _FRAME.size <= len(data):
+            (length,) = _FRAME.unpack_from(data, offset)
+            end = offset + _FRAME.size + length
+            if end > len(data):
+                break
+            try:
+                records.append(pickle.loads(data[offset + _FRAME.size : end]))
+            except Exception:  # noqa: BLE001 - a corrupt frame ends the usable log
+                break
+            offset = end
+        if offset != len(data) and truncate:
+            # Drop the torn tail so new appends start on a frame boundary
+            with open(path, "r+b") as handle:
+                handle.truncate(offset)
+        return records
@@ -0,0 +1,192 @@
+import sqlite3
+from typing import Callable, Dict, List, Sequence, Tuple
+
+Migration = Callable[[sqlite3.Cursor], None]
+
+# Rows converted per executemany call when rewriting the legacy fingerprint table
+_COPY_CHUNK = 50000
+
+
+def apply_migrations(pool, migrations: Sequence[Migration]) -> int:
+    """
+    Bring the database at ``pool`` up to ``len(migrations)``.
+
+    The schema version lives in ``PRAGMA user_version``. Each pending migration
+    runs in its own ``BEGIN IMMEDIATE`` transaction together with the version
+    bump, and the version is re-read under the write lock, so concurrent
+    processes starting on one file apply every step exactly once.
+    """
+    while True:
+        with pool.unit_of_work() as conn:
+            cur = conn.cursor()
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(migrations):
+                return version
+            migrations[version](cur)
+            cur.execute(f"PRAGMA user_version={version + 1}")
+
+
+def hash_blob(value: str) -> bytes:
+    """Hex SHA-256 digests become 32-byte BLOBs; anything else is kept as UTF-8 bytes."""
+    if len(value) == 64:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return value.encode("utf-8")
+
+
+def hash_text(value: bytes) -> str:
+    """Inverse of ``hash_blob``."""
+    return value.hex() if len(value) == 32 else value.decode("utf-8", "replace")
+
+
+def base_schema(cur: sqlite3.Cursor) -> None:
+    """1: cases, audit_log and per-intake fingerprints (also adopts pre-versioned files)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cases (
+            intake_id TEXT PRIMARY KEY,
+            raw_text TEXT NOT NULL,
+            classification TEXT NOT NULL,
+            composite_score REAL NOT NULL,
+            metadata_json TEXT,
+            breakdown_json TEXT,
+            provenance_json TEXT,
+            summary_text TEXT,
+            decision_reason TEXT,
+            created_at TEXT NOT NULL
+        )
+    """
+    )
+    cur.execute("PRAGMA table_info(cases)")
+    columns = {row[1] for row in cur.fetchall()}
+    if "summary_text" not in columns:
+        cur.execute("ALTER TABLE cases ADD COLUMN summary_text TEXT")
+    if "decision_reason" not in columns:
+        cur.execute("ALTER TABLE cases ADD COLUMN decision_reason TEXT")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intake_id TEXT,
+            action TEXT NOT NULL,
+            actor TEXT NOT NULL,
+            payload TEXT,
+            created_at TEXT NOT NULL
+        )
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intake_id TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            normalized_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """
+    )
+
+
+def deduplicated_fingerprints(cur: sqlite3.Cursor) -> None:
+    """
+    2: one row per (normalized_hash, content_hash) with 32-byte BLOB keys.
+
+    Repeats become an occurrence count with first/last intake and timestamps.
+    The table is clustered on the normalized hash (WITHOUT ROWID). The index on
+    the raw content hash also carries the primary key, so it covers
+    (content_hash -> normalized_hash) and a full row is one more key seek.
+    """
+    cur.execute(
+        """
+        CREATE TABLE fingerprints_v2 (
+            normalized_hash BLOB NOT NULL,
+            content_hash BLOB NOT NULL,
+            first_intake_id TEXT NOT NULL,
+            last_intake_id TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            occurrences INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (normalized_hash, content_hash)
+        ) WITHOUT ROWID
+    """
+    )
+    source = cur.connection.cursor()
+    source.execute(
+        "SELECT normalized_hash, content_hash, intake_id, created_at FROM fingerprints ORDER BY id"
+    )
+    while True:
+        rows = source.fetchmany(_COPY_CHUNK)
+        if not rows:
+            break
+        # Fold repeats inside the chunk first; the upsert folds them across chunks
+        folded: Dict[Tuple[bytes, bytes], List] = {}
+        for normalized_hash, content_hash, intake_id, created_at in rows:
+            key = (hash_blob(normalized_hash), hash_blob(content_hash))
+            entry = folded.get(key)
+            if entry is None:
+                folded[key] = [intake_id, intake_id, created_at, created_at, 1]
+            else:
+                entry[1], entry[3] = intake_id, created_at
+                entry[4] += 1
+        cur.executemany(
+            """
+            INSERT INTO fingerprints_v2 (
+                normalized_hash, content_hash, first_intake_id, last_intake_id,
+                first_seen, last_seen, occurrences
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (normalized_hash, content_hash) DO UPDATE SET
+                occurrences = occurrences + excluded.occurrences,
+                last_intake_id = excluded.last_intake_id,
+                last_seen = excluded.last_seen
+        """,
+            [key + tuple(entry) for key, entry in folded.items()],
+        )
+    cur.execute("DROP TABLE fingerprints")
+    cur.execute("ALTER TABLE fingerprints_v2 RENAME TO fingerprints")
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS fingerprints_by_content ON fingerprints (content_hash)
+    """
+    )
+
+
+def near_duplicates(cur: sqlite3.Cursor) -> None:
+    """3: MinHash signatures for the near-duplicate index and the case's cluster id."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS near_duplicates (
+            slot INTEGER PRIMARY KEY,
+            intake_id TEXT NOT NULL,
+            cluster_id TEXT NOT NULL,
+            signature BLOB NOT NULL
+        )
+    """
+    )
+    cur.execute("ALTER TABLE cases ADD COLUMN near_duplicate_cluster TEXT")
+
+
+def write_behind_dead_letter(cur: sqlite3.Cursor) -> None:
+    """4: intakes the write-behind queue could not commit (poison rows, undrained at close)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS write_behind_dead_letter (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intake_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            error TEXT NOT NULL,
+            failed_at TEXT NOT NULL
+        )
+    """
+    )
+
+
+# Append only: a file at user_version N has had exactly the first N applied
+MIGRATIONS: Tuple[Migration, ...] = (
+    base_schema,
+    deduplicated_fingerprints,
+    near_duplicates,
+    write_behind_dead_letter,
+)
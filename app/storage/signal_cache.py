@@ -0,0 +1,203 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .database import normalized_text_hash
+from .sqlite_pool import get_pool
+
+
+class SignalCache:
+    """
+    Bounded cache for expensive per-text model signals.
+
+    Entries are keyed by the normalized-text hash used for fingerprints, so
+    copy-pasted content that only differs in case or whitespace shares a slot.
+    Each signal ("ai", "family", "ollama") is stored separately with its own TTL
+    and is tagged with the model that produced it; when that model changes the
+    signal's entries are dropped. The in-memory tier is an LRU; an optional
+    SQLite file adds a second tier that survives restarts, read and written
+    through the shared WAL connection pool.
+    """
+
+    SIGNALS = ("ai", "family", "ollama")
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Dict[str, float],
+        model_tags: Dict[str, str],
+        disk_path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = dict(ttl_seconds)
+        self._model_tags = dict(model_tags)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "disk_hits": 0,
+        }
+        self._hits = {signal: 0 for signal in self.SIGNALS}
+        self._misses = {signal: 0 for signal in self.SIGNALS}
+
+        self.disk_path = disk_path or None
+        if self.disk_path:
+            self._initialise_disk()
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        return normalized_text_hash(text)
+
+    def get(self, key: str, signal: str) -> Tuple[bool, Any]:
+        """Return ``(hit, value)`` for ``signal`` of the text identified by ``key``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((key, signal))
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end((key, signal))
+                    self._hits[signal] += 1
+                    return True, value
+                del self._entries[(key, signal)]
+                self._counters["expirations"] += 1
+
+        if self.disk_path:
+            value, expires_at = self._disk_get(key, signal, now)
+            if expires_at is not None:
+                with self._lock:
+                    self._store(key, signal, value, expires_at)
+                    self._hits[signal] += 1
+                    self._counters["disk_hits"] += 1
+                return True, value
+
+        with self._lock:
+            self._misses[signal] += 1
+        return False, None
+
+    def put(self, key: str, signal: str, value: Any) -> None:
+        if value is None:
+            # Missing signals (model offline, call failed) are never cached.
+            return
+        expires_at = time.time() + float(self.ttl_seconds.get(signal, 0))
+        with self._lock:
+            self._store(key, signal, value, expires_at)
+        if self.disk_path:
+            with self._disk_cursor() as cur:
+                cur.execute(
+                    "INSERT OR REPLACE INTO signal_cache (cache_key, signal, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, signal, json.dumps(value), expires_at),
+                )
+
+    def sync_models(self, model_tags: Dict[str, str]) -> None:
+        """
+        Invalidate every signal whose producing model differs from ``model_tags``.
+
+        Call it when a model is (re)loaded, not per lookup. The comparison and
+        update happen under the lock, so concurrent callers invalidate a change once.
+        """
+        with self._lock:
+            changed = [
+                signal for signal, tag in model_tags.items() if self._model_tags.get(signal) != tag
+            ]
+            if not changed:
+                return
+            self._model_tags.update(model_tags)
+        self.invalidate(*changed)
+
+    def invalidate(self, *signals: str) -> None:
+        """Drop cached values for ``signals`` (all signals when none are given)."""
+        targets = set(signals or self.SIGNALS)
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[1] in targets]:
+                del self._entries[entry_key]
+            self._counters["invalidations"] += 1
+        if self.disk_path:
+            with self._disk_cursor() as cur:
+                for signal in targets:
+                    cur.execute("DELETE FROM signal_cache WHERE signal=?", (signal,))
+                    cur.execute(
+                        "INSERT OR REPLACE INTO signal_cache_models (signal, model) VALUES (?, ?)",
+                        (signal, self._model_tags.get(signal, "")),
+                    )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "by_signal": {
+                    signal: {"hits": self._hits[signal], "misses": self._misses[signal]}
+                    for signal in self.SIGNALS
+                },
+                "disk_tier": bool(self.disk_path),
+                **self._counters,
+            }
+
+    def _store(self, key: str, signal: str, value: Any, expires_at: float) -> None:
+        self._entries[(key, signal)] = (value, expires_at)
+        self._entries.move_to_end((key, signal))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_cursor(self):
+        return get_pool(self.disk_path).cursor()
+
+    def _initialise_disk(self) -> None:
+        with self._disk_cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signal_cache (
+                    cache_key TEXT NOT NULL,
+                    signal TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (cache_key, signal)
+                ) WITHOUT ROWID
+            """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS signal_cache_models (
+                    signal TEXT PRIMARY KEY,
+                    model TEXT NOT NULL
+                )
+            """
+            )
+            cur.execute("DELETE FROM signal_cache WHERE expires_at <= ?", (time.time(),))
+            stored = dict(cur.execute("SELECT signal, model FROM signal_cache_models").fetchall())
+            for signal in self.SIGNALS:
+                model = self._model_tags.get(signal, "")
+                if stored.get(signal) != model:
+                    cur.execute("DELETE FROM signal_cache WHERE signal=?", (signal,))
+                    cur.execute(
+                        "INSERT OR REPLACE INTO signal_cache_models (signal, model) VALUES (?, ?)",
+                        (signal, model),
+                    )
+
+    def _disk_get(self, key: str, signal: str, now: float) -> Tuple[Any, Optional[float]]:
+        with self._disk_cursor() as cur:
+            row = cur.execute(
+                "SELECT value, expires_at FROM signal_cache WHERE cache_key=? AND signal=?",
+                (key, signal),
+            ).fetchone()
+            if not row:
+                return None, None
+            if row[1] <= now:
+                cur.execute(
+                    "DELETE FROM signal_cache WHERE cache_key=? AND signal=?", (key, signal)
+                )
+                with self._lock:
+                    self._counters["expirations"] += 1
+                return None, None
+            return json.loads(row[0]), row[1]
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import get_settings
+
+
+class SQLitePool:
+    """
+    Per-thread SQLite connections for one database file.
+
+    Each worker thread keeps its own long-lived connection, so the per-connection
+    prepared-statement cache is actually reused and no call pays for
+    ``sqlite3.connect``. The database runs in WAL mode: readers never block the
+    single writer, and ``synchronous=NORMAL`` only syncs at checkpoints.
+
+    ``cursor()`` commits on exit like the old per-call connections did, unless
+    it runs inside ``unit_of_work()``, in which case the outermost unit commits
+    (or rolls back) everything at once.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = "NORMAL",
+        cache_size_kib: int = 16384,
+        mmap_size: int = 268435456,
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256,
+    ) -> None:
+        self.path = path
+        self.synchronous = synchronous
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            conn = self._connect()
+            # WAL is persistent in the file; setting it once per pool is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.depth = 0
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def cursor(self):
+        conn = self.connection()
+        cur = conn.cursor()
+        if self._local.depth:
+            yield cur
+            return
+        try:
+            yield cur
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @contextmanager
+    def unit_of_work(self):
+        """Group every ``cursor()`` block on this thread into one transaction."""
+        conn = self.connection()
+        if self._local.depth == 0:
+            # Take the write lock up front so the transaction never has to upgrade
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.rollback()
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    # Owned by another thread; it is released when that thread exits
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Caller holds _lock
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        self._connections.append(conn)
+        return conn
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str) -> SQLitePool:
+    """Shared pool for ``path``; every Database/LedgerManager on one file uses the same one."""
+    key = str(Path(path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            settings = get_settings()
+            pool = SQLitePool(
+                path,
+                synchronous=settings.sqlite_synchronous,
+                cache_size_kib=settings.sqlite_cache_size_kib,
+                mmap_size=settings.sqlite_mmap_size,
+                busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools(path: Optional[str] = None) -> None:
+    """Close pooled connections (all pools, or only the one for ``path``)."""
+    with _pools_lock:
+        keys = [str(Path(path).resolve())] if path else list(_pools)
+        for key in keys:
+            pool = _pools.pop(key, None)
+            if pool is not None:
+                pool.close()
@@ -0,0 +1,323 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_queues: Dict[str, "WriteBehindQueue"] = {}
+_queues_lock = threading.Lock()
+
+
+def active_queue(path: str) -> Optional["WriteBehindQueue"]:
+    """The running write-behind queue for database ``path``, if any."""
+    return _queues.get(str(Path(path).resolve()))
+
+
+class WriteBehindQueue:
+    """
+    Bounded write-behind buffer for per-intake persistence.
+
+    ``submit`` queues a case, its audit entry and its fingerprint and returns
+    immediately. A writer thread group-commits queued intakes through
+    ``Database.save_analysis_batch`` once ``max_batch_rows`` are waiting or
+    ``max_wait_ms`` after the oldest arrived. Until their batch commits, queued
+    cases and fingerprints are visible through ``pending_case`` and
+    ``pending_fingerprints``; every Database on the same file consults them.
+    When ``max_pending`` intakes are waiting, ``submit`` blocks (backpressure).
+
+    A failed batch stays at the head of the queue and is retried up to
+    ``max_retries`` times (a locked or briefly unavailable database). After
+    that the batch is split in halves until the failing intakes are isolated:
+    the rest commit, and each poison intake goes to the
+    ``write_behind_dead_letter`` table, or to the error log if that write
+    fails too. Intakes still queued when ``close`` times out are dead-lettered
+    the same way, never silently dropped.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_batch_rows: int = 256,
+        max_wait_ms: float = 20.0,
+        max_pending: int = 10000,
+        max_retries: int = 3,
+    ) -> None:
+        self.db = db
+        self.max_retries = max(0, int(max_retries))
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_pending = max(self.max_batch_rows, int(max_pending))
+        # (enqueued at, case kwargs, action kwargs, fingerprint args, pending fingerprint, near-duplicate row)
+        self._queue: Deque[Tuple] = deque()
+        self._cases: Dict[str, Dict[str, Any]] = {}
+        self._fingerprints: Dict[str, List[Dict[str, Any]]] = {}
+        self._in_flight = 0
+        # Failed attempts at the current head batch
+        self._failures = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._counters: Dict[str, float] = {
+            "enqueued": 0,
+            "committed": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "flush_errors": 0,
+            "split_batches": 0,
+            "dead_lettered": 0,
+            "undrained": 0,
+            "blocked_submits": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+        self._key = str(Path(db.path).resolve())
+        with _queues_lock:
+            _queues[self._key] = self
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        case: Dict[str, Any],
+        action: Dict[str, Any],
+        fingerprint: Optional[Tuple[str, str, str]] = None,
+        near_duplicate: Optional[Tuple[str, str, bytes]] = None,
+    ) -> None:
+        """
+        Queue ``save_case``/``log_action`` kwargs, an ``(intake_id, text, content_hash)``
+        fingerprint and an ``(intake_id, cluster_id, signature)`` near-duplicate row.
+        """
+        created_at = datetime.utcnow().isoformat()
+        case = {**case, "created_at": created_at}
+        action = {**action, "created_at": created_at}
+        fingerprint_args = None
+        fingerprint_row = None
+        if fingerprint is not None:
+            fingerprint_args = (*fingerprint, created_at)
+            fingerprint_row = self.db._fingerprint_match(self.db._fingerprint_row(*fingerprint_args) + (1,))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            if len(self._queue) >= self.max_pending:
+                self._counters["blocked_submits"] += 1
+                while len(self._queue) >= self.max_pending and not self._closed:
+                    self._cond.wait()
+            self._queue.append((time.monotonic(), case, action, fingerprint_args, fingerprint_row, near_duplicate))
+            self._cases[case["intake_id"]] = case
+            if fingerprint_row is not None:
+                self._fingerprints.setdefault(fingerprint_row["normalized_hash"], []).append(fingerprint_row)
+            self._counters["enqueued"] += 1
+            self._cond.notify_all()
+
+    def pending_case(self, intake_id: str) -> Optional[Dict[str, Any]]:
+        """A queued case shaped like ``Database.fetch_case`` output."""
+        with self._cond:
+            case = self._cases.get(intake_id)
+        if case is None:
+            return None
+        # Round-trip through JSON so callers see exactly what the database returns
+        return {
+            "raw_text": case["raw_text"],
+            "classification": case["classification"],
+            "composite_score": case["composite_score"],
+            "metadata": json.loads(json.dumps(case.get("metadata") or {})),
+            "breakdown": json.loads(json.dumps(case.get("breakdown") or {})),
+            "provenance": json.loads(json.dumps(case.get("provenance") or {})),
+            "summary": case.get("summary"),
+            "decision_reason": case.get("decision_reason"),
+            "created_at": case["created_at"],
+            "near_duplicate_cluster": case.get("near_duplicate_cluster"),
+        }
+
+    def pending_fingerprints(self, normalized_hash: str, content_hash: str) -> List[Dict[str, Any]]:
+        """Queued fingerprints matching either hex hash, oldest first."""
+        with self._cond:
+            rows = list(self._fingerprints.get(normalized_hash, ()))
+            rows.extend(
+                row
+                for digest, bucket in self._fingerprints.items()
+                if digest != normalized_hash
+                for row in bucket
+                if row["content_hash"] == content_hash
+            )
+        return [dict(row) for row in rows]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0) -> int:
+        """
+        Drain the queue and stop the writer thread. Intakes still queued after
+        ``timeout`` (behind any batch being written) are dead-lettered instead
+        of dropped; returns how many.
+        """
+        drained = self.flush(timeout)
+        leftover: List[Tuple] = []
+        with self._cond:
+            self._closed = True
+            if not drained:
+                # The writer keeps its in-flight batch at the head; take everything behind it
+                while len(self._queue) > self._in_flight:
+                    leftover.append(self._queue.pop())
+                leftover.reverse()
+                self._forget(leftover)
+                self._counters["undrained"] += len(leftover)
+            self._cond.notify_all()
+        if leftover:
+            logger.error("write-behind closed with %d intakes undrained; dead-lettering them", len(leftover))
+            self._dead_letter([(entry, "undrained at close") for entry in leftover])
+        self._thread.join(timeout)
+        with _queues_lock:
+            if _queues.get(self._key) is self:
+                del _queues[self._key]
+        return len(leftover)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            batches = self._counters["batches"]
+            return {
+                "depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "max_pending": self.max_pending,
+                "max_batch_rows": self.max_batch_rows,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "avg_batch": round(self._counters["committed"] / batches, 2) if batches else 0.0,
+                "avg_flush_ms": round(self._counters["total_flush_ms"] / batches, 3) if batches else 0.0,
+                **self._counters,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                # Wait for a full batch, the oldest entry's deadline, or a flush request
+                deadline = self._queue[0][0] + self.max_wait
+                while len(self._queue) < self.max_batch_rows and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._queue[i] for i in range(min(self.max_batch_rows, len(self._queue)))]
+                self._in_flight = len(batch)
+
+            started = time.perf_counter()
+            dead: List[Tuple[Tuple, Exception]] = []
+            try:
+                self._save(batch)
+            except Exception as exc:  # noqa: BLE001
+                with self._cond:
+                    self._counters["flush_errors"] += 1
+                    self._failures += 1
+                    retry = self._failures <= self.max_retries
+                    if retry:
+                        logger.warning(
+                            "write-behind flush of %d intakes failed (%s); retry %d of %d",
+                            len(batch), exc, self._failures, self.max_retries,
+                        )
+                        self._in_flight = 0
+                        self._cond.wait(min(1.0, self.max_wait * 10 or 0.1))
+                if retry:
+                    continue
+                # Retries exhausted: commit what can be committed, dead-letter the rest
+                with self._cond:
+                    self._counters["split_batches"] += 1
+                dead = self._isolate(batch)
+                self._dead_letter([(entry, f"{type(error).__name__}: {error}") for entry, error in dead])
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+            with self._cond:
+                for _ in batch:
+                    self._queue.popleft()
+                self._forget(batch)
+                self._in_flight = 0
+                self._failures = 0
+                self._counters["committed"] += len(batch) - len(dead)
+                self._counters["batches"] += 1
+                self._counters["max_batch"] = max(self._counters["max_batch"], len(batch))
+                self._counters["last_flush_ms"] = round(elapsed_ms, 3)
+                self._counters["max_flush_ms"] = max(self._counters["max_flush_ms"], round(elapsed_ms, 3))
+                self._counters["total_flush_ms"] += elapsed_ms
+                self._cond.notify_all()
+
+    def _save(self, entries: List[Tuple]) -> None:
+        self.db.save_analysis_batch(
+            [entry[1] for entry in entries],
+            [entry[2] for entry in entries],
+            [entry[3] for entry in entries if entry[3] is not None],
+            [entry[5] for entry in entries if entry[5] is not None],
+        )
+
+    def _isolate(self, entries: List[Tuple]) -> List[Tuple[Tuple, Exception]]:
+        """Commit ``entries`` (a batch that failed as a whole) by halves; the entries that fail alone."""
+        if len(entries) == 1:
+            try:
+                self._save(entries)
+            except Exception as exc:  # noqa: BLE001
+                return [(entries[0], exc)]
+            return []
+        dead: List[Tuple[Tuple, Exception]] = []
+        middle = len(entries) // 2
+        for half in (entries[:middle], entries[middle:]):
+            try:
+                self._save(half)
+            except Exception:  # noqa: BLE001
+                dead.extend(self._isolate(half))
+        return dead
+
+    def _dead_letter(self, failures: List[Tuple[Tuple, str]]) -> None:
+        """Persist entries the queue gave up on; log them in full if even that fails."""
+        if not failures:
+            return
+        rows = [(entry[1]["intake_id"], self._payload(entry), str(error)) for entry, error in failures]
+        try:
+            self.db.save_dead_letters(rows)
+        except Exception:  # noqa: BLE001
+            logger.exception("write-behind could not store %d dead letters; logging them instead", len(rows))
+            for intake_id, payload, error in rows:
+                logger.error("write-behind dead letter %s (%s): %s", intake_id, error, payload)
+        else:
+            for intake_id, _, error in rows:
+                logger.error("write-behind dead-lettered intake %s: %s", intake_id, error)
+        with self._cond:
+            self._counters["dead_lettered"] += len(rows)
+
+    @staticmethod
+    def _payload(entry: Tuple) -> str:
+        _, case, action, fingerprint, _, near_duplicate = entry
+        if near_duplicate is not None:
+            near_duplicate = [near_duplicate[0], near_duplicate[1], bytes(near_duplicate[2]).hex()]
+        return json.dumps(
+            {"case": case, "action": action, "fingerprint": fingerprint, "near_duplicate": near_duplicate},
+            default=str,
+        )
+
+    def _forget(self, entries: List[Tuple]) -> None:
+        """Drop ``entries`` from the pending-read indexes; call with the lock held."""
+        for _, case, _, _, row, _ in entries:
+            intake_id = case["intake_id"]
+            if self._cases.get(intake_id) is case:
+                del self._cases[intake_id]
+            if row is not None:
+                digest = row["normalized_hash"]
+                bucket = [item for item in self._fingerprints.get(digest, ()) if item is not row]
+                if bucket:
+                    self._fingerprints[digest] = bucket
+                else:
+                    self._fingerprints.pop(digest, None)
@@ -0,0 +1,70 @@
+"""
+Compare the single-post intake path with the batch path.
+
+Usage:
+    python scripts/bench_batch_intake.py --posts 500 --chunk 256
+
+Runs against a throwaway SQLite database. Set DISABLE_AI_MODELS / OLLAMA_ENABLED
+to decide which model signals take part in the run.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _intakes(count: int):
+    from app.schemas import ContentIntake, SourceMetadata
+
+    return [
+        ContentIntake(
+            text=(
+                f"Post {i}: officials have hidden the truth about the vote. "
+                "Share this now before it is censored and join us today!"
+            ),
+            source="scraper",
+            metadata=SourceMetadata(platform="telegram-channel", region="IN", actor_id=f"actor::{i % 50}"),
+            tags=["election"] if i % 3 else ["leak"],
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=256)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-batch-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["BATCH_INTAKE_CHUNK_SIZE"] = str(args.chunk)
+
+    from app.services.orchestrator import AnalysisOrchestrator
+
+    intakes = _intakes(args.posts)
+
+    single = AnalysisOrchestrator()
+    started = time.perf_counter()
+    for intake in intakes:
+        single._process_sync(intake)
+    single_s = time.perf_counter() - started
+
+    batch = AnalysisOrchestrator()
+    started = time.perf_counter()
+    for start in range(0, len(intakes), args.chunk):
+        batch._process_batch_sync(intakes[start : start + args.chunk])
+    batch_s = time.perf_counter() - started
+
+    print(f"posts={args.posts} chunk={args.chunk}")
+    print(f"single: {single_s:8.3f}s  {args.posts / single_s:10.1f} posts/s  {1000 * single_s / args.posts:8.3f} ms/post")
+    print(f"batch : {batch_s:8.3f}s  {args.posts / batch_s:10.1f} posts/s  {1000 * batch_s / args.posts:8.3f} ms/post")
+    print(f"speedup: {single_s / batch_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure DetectorEngine feature extraction latency across text lengths.
+
+Usage:
+    python scripts/bench_features.py --lengths 200 1000 5000 20000
+
+Builds synthetic posts (mixed case, punctuation, urgency and CTA terms) cut to
+each length, up to the 20000-char ContentIntake limit, and reports p50/p99 of
+``FeatureExtractor.extract`` (stylometric and behavioural features) and of
+``DetectorEngine.detect`` with the HF and Ollama models disabled.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+os.environ.setdefault("DISABLE_AI_MODELS", "true")
+os.environ.setdefault("OLLAMA_ENABLED", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.detection import DetectorEngine  # noqa: E402
+from app.schemas import ContentIntake  # noqa: E402
+
+_WORDS = (
+    "the a of to and in that is for on with as by officials report says people news city police vote "
+    "fraud media story data urgent now share truth banned breaking viral shocking hidden revealed "
+    "amazing disaster evil fake click here sign up donate today forward this join us act fast "
+    "people's well-known don't it's STOP NOW WARNING"
+).split()
+_ENDS = [". ", "! ", "? ", ", ", "; ", " - ", " ", " ", " ", " "]
+
+
+def _post(rng: random.Random, length: int) -> str:
+    parts: List[str] = []
+    size = 0
+    while size < length:
+        word = rng.choice(_WORDS)
+        parts.append(word.capitalize() if rng.random() < 0.1 else word)
+        parts.append(rng.choice(_ENDS))
+        size += len(word) + 2
+    return "".join(parts)[:length].strip()
+
+
+def _percentiles(run: Callable[[], object], repeats: int) -> Tuple[float, float]:
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 1000, 5000, 20000])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(15)
+    engine = DetectorEngine()
+    for length in args.lengths:
+        text = _post(rng, length)
+        intake = ContentIntake(text=text)
+        extract = _percentiles(lambda: engine._features.extract(text), args.repeats)
+        detect = _percentiles(lambda: engine.detect(intake), args.repeats)
+        print(
+            f"{len(text):>6} chars: extract p50 {extract[0]:.3f} ms, p99 {extract[1]:.3f} ms; "
+            f"detect p50 {detect[0]:.3f} ms, p99 {detect[1]:.3f} ms"
+        )
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure delta chain sync cost against chain length and divergence.
+
+Usage:
+    python scripts/bench_federated_sync.py --blocks 10000 100000 --divergence 10 1000
+
+For each chain length, two in-process nodes share a signed chain. The peer
+then replaces its last ``divergence`` blocks with a longer fork of its own,
+and the local node syncs from it over ``httpx.ASGITransport``. Reports the
+fork-search rounds, the bytes received and the sync time. For comparison it
+also reports the size of the full-chain download that sync used to make.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.federated.ledger import Block  # noqa: E402
+from app.federated.manager import LedgerManager  # noqa: E402
+from app.federated.node import Node  # noqa: E402
+from app.federated.routes import create_router  # noqa: E402
+from app.federated.sync import ChainSync  # noqa: E402
+from app.storage.sqlite_pool import close_pools  # noqa: E402
+
+
+def _append(ledger: LedgerManager, count: int, tag: str) -> None:
+    previous = ledger.get_tip()
+    blocks = []
+    for _ in range(count):
+        previous = Block.create_new(previous.index + 1, f"{tag}-{previous.index + 1}", previous.hash)
+        blocks.append(previous)
+    ledger.save_blocks(blocks)
+
+
+async def _measure(local: LedgerManager, mounts, peer: str):
+    async with httpx.AsyncClient(mounts=mounts) as client:
+        full = await client.get(f"{peer}/api/v1/federated/chain")
+        started = time.perf_counter()
+        result = await ChainSync(local, client).sync([peer])
+        return result, (time.perf_counter() - started) * 1000.0, len(full.content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--divergence", type=int, nargs="+", default=[10, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = LedgerManager(db_path=os.path.join(tmp, "base.db"))
+        for size in sorted(args.blocks):
+            _append(base, size - base.chain_length(), "shared")
+            shared = base.get_chain()
+            for divergence in args.divergence:
+                run = f"{size}-{divergence}"
+                local = LedgerManager(db_path=os.path.join(tmp, f"local-{run}.db"))
+                peer = LedgerManager(db_path=os.path.join(tmp, f"peer-{run}.db"))
+                local.replace_chain(shared, verified=True)
+                peer.replace_chain(shared[: size - divergence])
+                _append(peer, divergence + 1, "fork")
+                app = FastAPI()
+                app.include_router(create_router(peer, Node(nodes=[], my_url="http://peer", db_path=peer.ledger_db_path)))
+                mounts = {"http://peer": httpx.ASGITransport(app=app)}
+
+                result, elapsed, full_bytes = asyncio.run(_measure(local, mounts, "http://peer"))
+                print(
+                    f"{size:>8,} blocks, {divergence:>5} divergent: {result.rounds} rounds, "
+                    f"{result.fetched} fetched, {result.bytes_received / 1024:,.1f} KiB in {elapsed:.0f} ms "
+                    f"(full chain download {full_bytes / 1024:,.0f} KiB)"
+                )
+                close_pools(local.ledger_db_path)
+                close_pools(peer.ledger_db_path)
+        close_pools(base.ledger_db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Measure check_fingerprint lookup latency on a large fingerprint table.
+
+Usage:
+    python scripts/bench_fingerprints.py --rows 10000000 --lookups 2000
+
+Fills a current-schema database (BLOB keys, WITHOUT ROWID, covering content
+index) with ``--rows`` distinct fingerprints and times ``Database.check_fingerprint``
+for hits and misses. The legacy layout (hex TEXT columns, no index, one row
+per intake) is filled to the same size and timed with the old query over
+``--legacy-lookups`` probes; pass ``--legacy-lookups 0`` to skip it.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_CHUNK = 100000
+
+
+def _text(i: int) -> str:
+    return f"post {i}: share this now before it is censored"
+
+
+def _rows(count: int) -> Iterator[List[Tuple[str, str, str]]]:
+    """(intake_id, text, content_hash) chunks."""
+    for start in range(0, count, _CHUNK):
+        chunk = []
+        for i in range(start, min(count, start + _CHUNK)):
+            text = _text(i)
+            chunk.append((f"intake-{i}", text, hashlib.sha256(text.encode("utf-8")).hexdigest()))
+        yield chunk
+
+
+def _fill_current(db, count: int) -> None:
+    for chunk in _rows(count):
+        with db._cursor() as cur:
+            cur.executemany(db._FINGERPRINT_INSERT, [db._fingerprint_row(*row) for row in chunk])
+
+
+def _fill_legacy(path: str, count: int) -> sqlite3.Connection:
+    from app.storage.database import normalized_text_hash
+    from app.storage.migrations import MIGRATIONS
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    MIGRATIONS[0](conn.cursor())
+    for chunk in _rows(count):
+        conn.executemany(
+            "INSERT INTO fingerprints (intake_id, content_hash, normalized_hash, created_at) VALUES (?, ?, ?, ?)",
+            [(intake_id, content, normalized_text_hash(text), "2024-01-01T00:00:00") for intake_id, text, content in chunk],
+        )
+        conn.commit()
+    return conn
+
+
+def _legacy_lookup(conn: sqlite3.Connection) -> Callable[[str], list]:
+    from app.storage.database import normalized_text_hash
+
+    def lookup(text: str) -> list:
+        digest = normalized_text_hash(text)
+        return conn.execute(
+            "SELECT intake_id, content_hash, normalized_hash, created_at FROM fingerprints "
+            "WHERE normalized_hash = ? OR content_hash = ?",
+            (digest, digest),
+        ).fetchall()
+
+    return lookup
+
+
+def _time(lookup: Callable[[str], list], probes: List[str]) -> Tuple[float, float]:
+    latencies = []
+    for text in probes:
+        started = time.perf_counter()
+        lookup(text)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--legacy-lookups", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'current.db')}"
+        from app.config import get_settings
+        from app.storage.database import Database
+
+        get_settings.cache_clear()
+        db = Database()
+        started = time.perf_counter()
+        _fill_current(db, args.rows)
+        size = os.path.getsize(os.path.join(tmpdir, "current.db"))
+        print(f"current schema: {args.rows:,} rows loaded in {time.perf_counter() - started:.1f}s, {size / 2**20:,.0f} MiB")
+
+        step = max(1, args.rows // max(1, args.lookups))
+        hits = [_text(i).upper() for i in range(0, args.rows, step)][: args.lookups]
+        misses = [f"never seen {i}" for i in range(args.lookups)]
+        for name, probes in (("hit", hits), ("miss", misses)):
+            p50, p99 = _time(db.check_fingerprint, probes)
+            print(f"  check_fingerprint {name:>4}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+        if args.legacy_lookups:
+            started = time.perf_counter()
+            conn = _fill_legacy(os.path.join(tmpdir, "legacy.db"), args.rows)
+            size = os.path.getsize(os.path.join(tmpdir, "legacy.db"))
+            print(f"legacy schema: {args.rows:,} rows loaded in {time.perf_counter() - started:.1f}s, {size / 2**20:,.0f} MiB")
+            p50, p99 = _time(_legacy_lookup(conn), hits[: args.legacy_lookups])
+            print(f"  legacy full-scan lookup: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare union-find component tracking with nx.connected_components.
+
+Usage:
+    python scripts/bench_graph_components.py --nodes 100000 1000000
+
+Builds a sparse actor/content/narrative graph, then times:
+- maintaining the ComponentTracker while edges are added (total and per edge),
+- walking the tracked components (what a community snapshot costs),
+- a full nx.connected_components pass (what every snapshot cost before).
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import networkx as nx  # noqa: E402
+
+from app.models.graph_components import ComponentTracker  # noqa: E402
+
+
+def synthetic_edges(nodes: int, seed: int = 5):
+    """Roughly one content node per actor post, sparse tags; about ``nodes`` nodes in total."""
+    rng = random.Random(seed)
+    actors = nodes // 4
+    narratives = max(10, nodes // 1000)
+    names = [f"actor::{a}" for a in range(actors)] + [f"narrative::{n}" for n in range(narratives)]
+    edges = []
+    for i in range(nodes - len(names)):
+        content = f"content::{i}"
+        names.append(content)
+        edges.append((f"actor::{rng.randrange(actors)}", content))
+        if rng.random() < 0.05:
+            edges.append((content, f"narrative::{rng.randrange(narratives)}"))
+    return names, edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'nodes':>9} {'edges':>9} {'comps':>8} {'union us/edge':>14} {'tracked ms':>11} {'networkx ms':>12}")
+    for count in args.nodes:
+        names, edges = synthetic_edges(count)
+        slots = {name: slot for slot, name in enumerate(names)}
+
+        tracker = ComponentTracker()
+        for name, slot in slots.items():
+            tracker.add(slot, name)
+        started = time.perf_counter()
+        for source, target in edges:
+            tracker.union(slots[source], slots[target])
+        union_us = (time.perf_counter() - started) * 1e6 / max(len(edges), 1)
+
+        started = time.perf_counter()
+        walked = sum(1 for component in tracker.components() if component.avg_score >= 0.0)
+        tracked_ms = (time.perf_counter() - started) * 1000.0
+
+        graph = nx.Graph()
+        graph.add_nodes_from(names)
+        graph.add_edges_from(edges)
+        started = time.perf_counter()
+        expected = sum(1 for _ in nx.connected_components(graph))
+        networkx_ms = (time.perf_counter() - started) * 1000.0
+        assert walked == expected, (walked, expected)
+
+        print(
+            f"{len(names):9d} {len(edges):9d} {walked:8d} {union_us:14.2f} "
+            f"{tracked_ms:11.1f} {networkx_ms:12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measure how GraphIntelEngine ingest latency grows with graph size.
+
+Usage:
+    python scripts/bench_graph_ingest.py --posts 50000 --report-every 5000
+
+For each window the script reports the cost of the incremental path (graph
+mutation, running-sum updates and a score read for the posting actor) and, while the graph is small
+enough, the cost of the dense N x N projection it replaced.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.graph_intel import GraphIntelEngine  # noqa: E402
+from app.schemas import ContentIntake, SourceMetadata  # noqa: E402
+
+try:
+    import torch
+except Exception:  # noqa: BLE001
+    torch = None
+
+
+def synthetic_intakes(count: int, seed: int = 13):
+    rng = random.Random(seed)
+    actors = max(10, count // 10)
+    narratives = [f"narrative-{n}" for n in range(max(5, count // 200))]
+    regions = [f"R{n}" for n in range(50)]
+    for i in range(count):
+        score = rng.random()
+        intake = ContentIntake(
+            text=f"Synthetic post {i} for graph benchmarking purposes.",
+            source="bench",
+            metadata=SourceMetadata(
+                platform=rng.choice(["x", "telegram-channel", "forum", "web"]),
+                region=rng.choice(regions),
+                actor_id=f"actor::{rng.randrange(actors)}",
+            ),
+            tags=rng.sample(narratives, rng.randrange(1, 3)),
+        )
+        classification = "high-risk" if score > 0.6 else "medium-risk" if score > 0.35 else "low-risk"
+        yield f"bench-{i}", intake, classification, score
+
+
+def dense_projection_ms(engine: GraphIntelEngine) -> float:
+    """Time the dense projection the index replaced (needs torch)."""
+    started = time.perf_counter()
+    nodes = list(engine.graph.nodes())
+    lookup = {node: idx for idx, node in enumerate(nodes)}
+    features = torch.tensor([engine._node_features(engine.graph.nodes[n]) for n in nodes])
+    adjacency = torch.zeros((len(nodes), len(nodes)))
+    for source, target in engine.graph.edges():
+        adjacency[lookup[source], lookup[target]] = adjacency[lookup[target], lookup[source]] = 1.0
+    degrees = adjacency.sum(dim=1, keepdim=True).clamp(min=1.0)
+    neighbor = adjacency @ features / degrees
+    _ = adjacency @ neighbor / degrees
+    return (time.perf_counter() - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--report-every", type=int, default=5000)
+    parser.add_argument("--dense-limit", type=int, default=8000, help="max nodes for the dense comparison")
+    args = parser.parse_args()
+
+    engine = GraphIntelEngine()
+    window = []
+    print(f"{'posts':>8} {'nodes':>9} {'edges':>9} {'ingest ms (p50)':>16} {'ingest ms (max)':>16} {'dense ms':>10}")
+    for count, (intake_id, intake, classification, score) in enumerate(synthetic_intakes(args.posts), start=1):
+        started = time.perf_counter()
+        engine._add_intake(intake_id, intake, classification, score)
+        engine._index.get(intake.metadata.actor_id)
+        window.append((time.perf_counter() - started) * 1000.0)
+        if count % args.report_every == 0:
+            window.sort()
+            nodes = engine.graph.number_of_nodes()
+            dense = (
+                f"{dense_projection_ms(engine):10.1f}"
+                if torch is not None and nodes <= args.dense_limit
+                else f"{'-':>10}"
+            )
+            print(
+                f"{count:8d} {nodes:9d} {engine.graph.number_of_edges():9d} "
+                f"{window[len(window) // 2]:16.4f} {window[-1]:16.4f} {dense}"
+            )
+            window = []
+
+
+if __name__ == "__main__":
+    main()
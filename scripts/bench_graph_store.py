@@ -0,0 +1,123 @@
+"""
+Measure GraphIntelEngine startup from a GraphStore snapshot plus log tail.
+
+Usage:
+    python scripts/bench_graph_store.py --edges 1000000 --tail 0.1
+
+Writes ingest-shaped node/edge records into a throwaway store: a snapshot
+covering (1 - tail) of the edges and the rest as log records. The restore then
+runs in a fresh process, so the reported peak RSS covers only the rebuilt
+engine.
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.storage.graph_store import GraphStore  # noqa: E402
+
+
+def ingest_records(edge_target: int, seed: int = 21):
+    """Yield ('n'|'e', ...) records shaped like the ones GraphIntelEngine.ingest logs."""
+    rng = random.Random(seed)
+    actors = max(10, edge_target // 20)
+    narratives = max(10, edge_target // 2000)
+    edges = 0
+    post = 0
+    while edges < edge_target:
+        content = f"content::bench-{post}"
+        actor = f"actor::{rng.randrange(actors)}"
+        score = rng.random()
+        yield ("n", content, {"type": "content", "score": score, "classification": "medium-risk",
+                              "ts": "2026-01-01T00:00:00", "platform": "x", "source": "bench"})
+        yield ("n", actor, {"type": "actor", "score_history": [score], "avg_score": score,
+                            "platforms": ["x"], "last_seen": "2026-01-01T00:00:00"})
+        yield ("e", actor, content, {"relation": "published"})
+        edges += 1
+        if rng.random() < 0.4:
+            tag = rng.randrange(narratives)
+            yield ("n", f"narrative::{tag}", {"type": "narrative", "tag": str(tag)})
+            yield ("e", content, f"narrative::{tag}", {"relation": "targets"})
+            edges += 1
+        if rng.random() < 0.5:
+            region = f"region::R{rng.randrange(40)}"
+            yield ("n", region, {"type": "region"})
+            yield ("e", actor, region, {"relation": "origin"})
+            edges += 1
+        post += 1
+
+
+def build(directory: str, edge_target: int, tail: float) -> None:
+    store = GraphStore(directory, snapshot_every=10**12)
+    nodes, edges = {}, {}
+    snapshot_edges = int(edge_target * (1.0 - tail))
+    snapshotted = False
+    for record in ingest_records(edge_target):
+        if not snapshotted and len(edges) >= snapshot_edges:
+            store.write_snapshot(list(nodes.items()), [(u, v, a) for (u, v), a in edges.items()])
+            snapshotted = True
+        if snapshotted:
+            store.append(record)
+            continue
+        if record[0] == "n":
+            nodes.setdefault(record[1], {}).update(record[2])
+        else:
+            edges.setdefault((record[1], record[2]), record[3])
+    if not snapshotted:
+        store.write_snapshot(list(nodes.items()), [(u, v, a) for (u, v), a in edges.items()])
+    store.close()
+
+
+def load(directory: str) -> None:
+    from app.models.graph_intel import GraphIntelEngine
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    engine = GraphIntelEngine(store=GraphStore(directory))
+    restore_s = time.perf_counter() - started
+    started = time.perf_counter()
+    engine.summary()
+    summary_s = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "nodes": engine.graph.number_of_nodes(),
+        "edges": engine.graph.number_of_edges(),
+        "restore_s": round(restore_s, 2),
+        "first_summary_s": round(summary_s, 2),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "engine_rss_mb": round((peak_kb - baseline_kb) / 1024, 1),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--tail", type=float, default=0.1, help="fraction of edges left in the log")
+    parser.add_argument("--load", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load(args.load)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        started = time.perf_counter()
+        build(tmpdir, args.edges, args.tail)
+        stats = GraphStore(tmpdir).stats()
+        print(f"built store in {time.perf_counter() - started:.1f}s: "
+              f"snapshot {stats['snapshot_bytes'] / 1e6:.1f} MB, log {stats['log_bytes'] / 1e6:.1f} MB")
+        result = subprocess.run(
+            [sys.executable, __file__, "--load", tmpdir], capture_output=True, text=True, check=True
+        )
+        print(result.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
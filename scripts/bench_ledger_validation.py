@@ -0,0 +1,81 @@
+"""
+Measure ledger validation latency as the chain grows.
+
+Usage:
+    python scripts/bench_ledger_validation.py --blocks 10000 100000 1000000 --new 100
+
+Grows one signed chain in a temporary ledger to each size. At each size it
+times the full re-validation that /federated/validate used to run
+(``get_chain`` plus ``validate_chain``, skipped above ``--full-max`` blocks)
+and ``validate_incremental`` after ``--new`` blocks were appended. It also
+times a no-op incremental run with no new blocks, and appending one block
+after a ``get_tip`` lookup against the old ``get_chain()[-1]`` lookup.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.federated.ledger import Block  # noqa: E402
+from app.federated.manager import LedgerManager  # noqa: E402
+from app.storage.sqlite_pool import close_pools  # noqa: E402
+
+
+def _append(ledger: LedgerManager, count: int) -> None:
+    previous = ledger.get_latest_block()
+    with ledger.unit_of_work():
+        for _ in range(count):
+            previous = Block.create_new(previous.index + 1, f"payload-{previous.index + 1}", previous.hash)
+            ledger.save_block(previous)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--new", type=int, default=100)
+    parser.add_argument("--full-max", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = LedgerManager(db_path=os.path.join(tmp, "ledger.db"))
+        ledger.validate_incremental()
+        for size in sorted(args.blocks):
+            _append(ledger, max(0, size - args.new - ledger.chain_length()))
+            ledger.validate_incremental()
+            _append(ledger, args.new)
+
+            full = "skipped"
+            if size <= args.full_max:
+                started = time.perf_counter()
+                assert ledger.validate_chain(ledger.get_chain())
+                full = f"{(time.perf_counter() - started) * 1000.0:.0f} ms"
+            started = time.perf_counter()
+            result = ledger.validate_incremental()
+            incremental = (time.perf_counter() - started) * 1000.0
+            started = time.perf_counter()
+            ledger.validate_incremental()
+            noop = (time.perf_counter() - started) * 1000.0
+            started = time.perf_counter()
+            _append(ledger, 1)
+            append = (time.perf_counter() - started) * 1000.0
+            lookup = "skipped"
+            if size <= args.full_max:
+                started = time.perf_counter()
+                ledger.get_chain()[-1]
+                lookup = f"{(time.perf_counter() - started) * 1000.0:.0f} ms"
+            print(
+                f"{ledger.chain_length():>9,} blocks: full {full}; incremental ({result.checked} new) "
+                f"{incremental:.1f} ms; no new blocks {noop:.2f} ms; "
+                f"append {append:.2f} ms (get_chain tip lookup {lookup})"
+            )
+        close_pools(ledger.ledger_db_path)
+
+
+if __name__ == "__main__":
+    main()
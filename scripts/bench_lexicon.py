@@ -0,0 +1,75 @@
+"""
+Measure lexicon compile time and scan latency as the term list grows.
+
+Usage:
+    python scripts/bench_lexicon.py --terms 30 1000 10000 50000 --lengths 1000 20000
+
+For each lexicon size (a third of the terms are two- or three-word phrases),
+compiles the Aho–Corasick automaton and times ``Lexicon.scan`` on synthetic
+posts. The per-term substring scan used before (``term in text.lower()``) is
+timed on the same inputs for comparison.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.lexicon import Lexicon  # noqa: E402
+
+
+def _percentiles(run: Callable[[], object], repeats: int) -> Tuple[float, float]:
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def _terms(rng: random.Random, vocabulary: List[str], count: int) -> List[str]:
+    terms = set()
+    while len(terms) < count:
+        size = 1 if rng.random() < 2 / 3 else rng.choice([2, 3])
+        terms.add(" ".join(rng.choice(vocabulary) for _ in range(size)))
+    return sorted(terms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, nargs="+", default=[30, 1000, 10000, 50000])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(16)
+    vocabulary = [f"term{i}" for i in range(60000)]
+    for count in args.terms:
+        terms = _terms(rng, vocabulary, count)
+        started = time.perf_counter()
+        lexicon = Lexicon({"urgency": terms[: count // 2], "cta": terms[count // 2 :]})
+        compiled = (time.perf_counter() - started) * 1000.0
+        print(f"{count:>6} terms: compiled in {compiled:.1f} ms ({lexicon.stats()['states']:,} states)")
+        for length in args.lengths:
+            words: List[str] = []
+            while sum(len(word) + 1 for word in words) < length:
+                words.append(rng.choice(terms) if rng.random() < 0.05 else rng.choice(vocabulary))
+                words[-1] += rng.choice(["", "", "", ",", "."])
+            text = " ".join(words)[:length]
+            scan = _percentiles(lambda: lexicon.scan(text), args.repeats)
+            substring = _percentiles(lambda: sum(1 for term in terms if term in text.lower()), args.repeats)
+            print(
+                f"  {len(text):>6} chars: scan p50 {scan[0]:.3f} ms, p99 {scan[1]:.3f} ms; "
+                f"substring p50 {substring[0]:.3f} ms, p99 {substring[1]:.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare legacy and exact MATTR cost on long documents.
+
+Usage:
+    python scripts/bench_mattr.py --tokens 1000 10000 100000 1000000 --window 50
+
+Times the legacy half-step approximation (``features.mattr``), the exact
+rolling-count version (``features.exact_mattr``) and, up to ``--naive-limit``
+tokens, a naive exact version that rebuilds a set per step-1 window. Zipf-like
+token draws stand in for natural text.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from app.models.features import exact_mattr, mattr  # noqa: E402
+
+
+def _naive(tokens, window):
+    ratios = [len(set(tokens[i : i + window])) / window for i in range(len(tokens) - window + 1)]
+    return sum(ratios) / len(ratios)
+
+
+def _timed(run):
+    started = time.perf_counter()
+    value = run()
+    return value, (time.perf_counter() - started) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--naive-limit", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(18)
+    for count in args.tokens:
+        tokens = [f"w{rank}" for rank in rng.zipf(1.3, size=count).tolist()]
+        legacy, legacy_ms = _timed(lambda: mattr(tokens, args.window))
+        exact, exact_ms = _timed(lambda: exact_mattr(tokens, args.window))
+        line = (
+            f"{count:>9,} tokens: legacy {legacy:.4f} in {legacy_ms:.1f} ms; "
+            f"exact {exact:.4f} in {exact_ms:.1f} ms"
+        )
+        if count <= args.naive_limit:
+            naive, naive_ms = _timed(lambda: _naive(tokens, args.window))
+            line += f"; naive step-1 {naive:.4f} in {naive_ms:.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure near-duplicate (MinHash/LSH) add and query latency at millions of stored texts.
+
+Usage:
+    python scripts/bench_near_duplicates.py --texts 2000000 --campaigns 50 --variants 40
+
+The index is bulk-loaded with ``--texts`` background signatures (random, as a
+restart would load them from SQLite), then ``--campaigns`` x ``--variants``
+one-word edits of campaign posts are added through ``add`` (query + insert).
+Query latency is reported for edited copies of the campaigns (hits) and for
+unseen posts (misses), together with recall of the campaign cluster.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from app.models.near_duplicate import NearDuplicateIndex  # noqa: E402
+
+_WORDS = [f"word{i}" for i in range(20000)]
+
+
+def _post(rng: random.Random, length: int = 40) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(length))
+
+
+def _edit(rng: random.Random, text: str) -> str:
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(_WORDS)
+    return " ".join(words)
+
+
+def _percentiles(run: Callable[[str], object], texts: List[str]) -> Tuple[float, float]:
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        run(text)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=2_000_000)
+    parser.add_argument("--campaigns", type=int, default=50)
+    parser.add_argument("--variants", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    index = NearDuplicateIndex()
+    started = time.perf_counter()
+    signatures = np.random.default_rng(7).integers(0, 2**32, size=(args.texts, index.num_perm), dtype=np.uint32)
+    loaded = index.load((f"bg-{i}", f"bg-{i}", row.tobytes()) for i, row in enumerate(signatures))
+    del signatures
+    print(f"loaded {loaded:,} signatures in {time.perf_counter() - started:.1f}s")
+
+    campaigns = [_post(rng) for _ in range(args.campaigns)]
+    adds = [_edit(rng, campaign) for campaign in campaigns for _ in range(args.variants)]
+    counter = iter(range(len(adds)))
+    p50, p99 = _percentiles(lambda text: index.add(f"c-{next(counter)}", text), adds)
+    print(f"add (query + insert) of {len(adds):,} campaign variants: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+    hits = [_edit(rng, rng.choice(campaigns)) for _ in range(args.queries)]
+    misses = [_post(rng) for _ in range(args.queries)]
+    found = sum(1 for text in hits if index.query(text))
+    for name, texts in (("hit", hits), ("miss", misses)):
+        p50, p99 = _percentiles(index.query, texts)
+        print(f"query {name:>4}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    stats = index.stats()
+    print(
+        f"recall of edited campaign copies: {found / len(hits):.3f}; "
+        f"{stats['texts']:,} texts, {stats['index_bytes'] / 2**20:,.0f} MiB of arrays"
+    )
+
+
+if __name__ == "__main__":
+    main()
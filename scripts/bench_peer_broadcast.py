@@ -0,0 +1,107 @@
+"""
+Measure block broadcast and validation-poll latency with slow and dead peers.
+
+Usage:
+    python scripts/bench_peer_broadcast.py --peers 4 --latency-ms 50 --timeout 2
+
+Node ``a`` runs in-process. Its peers are simulated transports that answer
+after ``--latency-ms``, plus one black-hole peer that never answers before
+``--timeout``. The script times:
+- the ``/federated/add_block`` response;
+- the time until every live peer has accepted the block (outbox flush, all
+  peers at once);
+- ``/federated/validate``.
+
+Each is compared with the old behaviour of calling peers one after another,
+replayed over the same transports.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.federated.manager import LedgerManager  # noqa: E402
+from app.federated.node import Node  # noqa: E402
+from app.federated.routes import create_router  # noqa: E402
+from app.storage.sqlite_pool import close_pools  # noqa: E402
+
+
+def _peer(latency: float):
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"valid": True, "message": "Block accepted"})
+
+    return httpx.MockTransport(handler)
+
+
+async def _run(args, db_path: str) -> None:
+    live = [f"http://peer{n}" for n in range(args.peers)]
+    mounts = {peer: _peer(args.latency_ms / 1000.0) for peer in live}
+    mounts["http://blackhole"] = _peer(args.timeout * 10)
+    ledger = LedgerManager(db_path=db_path)
+    node = Node(
+        nodes=live + ["http://blackhole", "http://a"],
+        my_url="http://a",
+        db_path=db_path,
+        client_factory=lambda: httpx.AsyncClient(mounts=mounts),
+    )
+    node.client.timeout = args.timeout
+    app = FastAPI()
+    app.include_router(create_router(ledger, node))
+    mounts["http://a"] = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(mounts=mounts) as client:
+        started = time.perf_counter()
+        response = await client.post("http://a/api/v1/federated/add_block", json={"bench": True})
+        add_block = (time.perf_counter() - started) * 1000.0
+        while any(node.client.stats()[peer]["pending"] for peer in live):
+            await asyncio.sleep(0.001)
+        delivered = (time.perf_counter() - started) * 1000.0
+
+        async def one_by_one(method, path, **kwargs):
+            started = time.perf_counter()
+            for peer in sorted(node.peers):
+                try:
+                    await asyncio.wait_for(client.request(method, f"{peer}/api/v1/federated{path}", **kwargs), args.timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return (time.perf_counter() - started) * 1000.0
+
+        sequential = await one_by_one("POST", "/receive_block", json=response.json()["block"])
+        started = time.perf_counter()
+        await client.get("http://a/api/v1/federated/validate")
+        validate = (time.perf_counter() - started) * 1000.0
+        sequential_validate = await one_by_one("GET", "/validate_local")
+
+    await node.client.aclose()
+    print(
+        f"{args.peers} live peers at {args.latency_ms:.0f} ms + 1 dead (timeout {args.timeout:.1f} s):\n"
+        f"  add_block response      {add_block:8.1f} ms\n"
+        f"  all live peers accepted {delivered:8.1f} ms (sequential posts: {sequential:.0f} ms)\n"
+        f"  validate                {validate:8.1f} ms (sequential polls: {sequential_validate:.0f} ms)"
+    )
+    close_pools(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--peers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run(args, os.path.join(tmp, "ledger.db")))
+
+
+if __name__ == "__main__":
+    main()
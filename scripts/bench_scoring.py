@@ -0,0 +1,69 @@
+"""
+Measure columnar linguistic scoring against the per-row scalar path.
+
+Usage:
+    python scripts/bench_scoring.py --rows 1000000 5000000 --scalar-rows 100000
+
+Generates random stylometric feature rows in realistic ranges, times
+``DetectorEngine.feature_matrix`` and ``linguistic_scores`` on each row count,
+and the scalar ``_sigmoid(_score_features(row))`` loop on ``--scalar-rows``
+rows (extrapolated per million). Reports the largest difference between the
+two paths.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+os.environ.setdefault("DISABLE_AI_MODELS", "true")
+os.environ.setdefault("OLLAMA_ENABLED", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from app.models.detection import DetectorEngine  # noqa: E402
+
+_SCALES = {"avg_token_length": 20.0, "sentence_length_var": 5000.0, "entropy": 8.0, "readability_score": 80.0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--scalar-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = DetectorEngine()
+    rng = np.random.default_rng(17)
+    scales = np.array([_SCALES.get(name, 1.0) for name in engine.FEATURE_COLUMNS])
+
+    dicts = [
+        dict(zip(engine.FEATURE_COLUMNS, row.tolist()))
+        for row in rng.random((args.scalar_rows, len(scales))) * scales
+    ]
+    started = time.perf_counter()
+    expected = np.array([engine._sigmoid(engine._score_features(row)) for row in dicts])
+    scalar = time.perf_counter() - started
+    started = time.perf_counter()
+    matrix = engine.feature_matrix(dicts)
+    convert = time.perf_counter() - started
+    difference = float(np.max(np.abs(engine.linguistic_scores(matrix) - expected)))
+    print(
+        f"scalar: {args.scalar_rows:,} rows in {scalar:.2f}s ({scalar / args.scalar_rows * 1e6:.1f}s per million); "
+        f"feature_matrix from dicts {convert / args.scalar_rows * 1e6:.1f}s per million; max |diff| {difference:.2e}"
+    )
+    del dicts
+
+    for rows in args.rows:
+        matrix = rng.random((rows, len(scales))) * scales
+        started = time.perf_counter()
+        scores = engine.linguistic_scores(matrix)
+        elapsed = time.perf_counter() - started
+        print(f"columnar: {rows:,} rows in {elapsed:.2f}s ({rows / elapsed / 1e6:.1f}M rows/s), mean {scores.mean():.4f}")
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
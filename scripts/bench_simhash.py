@@ -0,0 +1,79 @@
+"""
+Measure SimHash multi-index memory and k-bit neighbour query latency at scale.
+
+Usage:
+    python scripts/bench_simhash.py --hashes 10000000 --max-distance 5 --blocks 6
+
+Bulk-loads ``--hashes`` random 64-bit hashes (as a graph restore would), then
+times ``add`` and ``query`` for near copies (a planted hash with up to
+``--max-distance`` flipped bits) and for unrelated hashes. Also times
+``simhash64`` on a short post.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("HF_MODEL_NAME", "disabled")
+os.environ.setdefault("HF_TOKENIZER_NAME", "disabled")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from app.models.simhash import SimHashIndex, simhash64  # noqa: E402
+
+
+def _percentiles(run: Callable[[int], object], values: List[int]) -> Tuple[float, float]:
+    latencies = []
+    for value in values:
+        started = time.perf_counter()
+        run(value)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashes", type=int, default=10_000_000)
+    parser.add_argument("--max-distance", type=int, default=5)
+    parser.add_argument("--blocks", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    index = SimHashIndex(args.max_distance, args.blocks)
+    started = time.perf_counter()
+    values = np.random.default_rng(3).integers(0, 2**63, size=args.hashes, dtype=np.uint64) << np.uint64(1)
+    index.load((f"content::{i}", int(value)) for i, value in enumerate(values.tolist()))
+    stats = index.stats()
+    print(
+        f"loaded {args.hashes:,} hashes into {stats['tables']} tables in {time.perf_counter() - started:.1f}s; "
+        f"{stats['index_bytes'] / 2**20:,.0f} MiB of arrays ({stats['index_bytes'] / max(1, args.hashes):.0f} B/hash)"
+    )
+
+    planted = [int(values[rng.randrange(args.hashes)]) for _ in range(args.queries)]
+    near = []
+    for value in planted:
+        for _ in range(rng.randrange(args.max_distance + 1)):
+            value ^= 1 << rng.randrange(64)
+        near.append(value)
+    unrelated = [rng.getrandbits(64) for _ in range(args.queries)]
+    found = sum(1 for value in near if index.query(value))
+    for name, probes in (("near copy", near), ("unrelated", unrelated)):
+        p50, p99 = _percentiles(index.query, probes)
+        print(f"query {name:>9}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    counter = iter(range(len(unrelated)))
+    p50, p99 = _percentiles(lambda value: index.add(f"new::{next(counter)}", value), unrelated)
+    print(f"add: p50 {p50:.3f} ms, p99 {p99:.3f} ms; near copies found: {found / len(near):.3f}")
+
+    text = "Officials confirmed the polling stations in the northern district stay closed tomorrow so share this"
+    p50, p99 = _percentiles(lambda _: simhash64(text), list(range(args.queries)))
+    print(f"simhash64 ({len(text.split())} words): p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Compare concurrent intake writes on the pooled WAL layer, the write-behind
+queue and the old per-call layer.
+
+Usage:
+    python scripts/bench_sqlite_writers.py --threads 8 --writes 200
+
+Each simulated intake performs the three writes of the single-post path
+(save_case, log_action, store_fingerprint). The legacy run opens a fresh
+rollback-journal connection per call, as Database._cursor used to; the pooled
+run uses per-thread WAL connections and one unit_of_work per intake; the
+write-behind run queues each intake and lets the writer thread group-commit.
+Throughput and per-intake p50/p99 latency are reported for each.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _legacy_database(path: str):
+    from app.storage.database import Database
+
+    class LegacyDatabase(Database):
+        """Database with the previous connect/commit/close-per-call cursor."""
+
+        def __init__(self) -> None:
+            self.path = path
+            self._initialise()
+
+        @contextmanager
+        def _cursor(self):
+            conn = sqlite3.connect(self.path)
+            try:
+                cur = conn.cursor()
+                yield cur
+                conn.commit()
+            finally:
+                conn.close()
+
+        @contextmanager
+        def unit_of_work(self):
+            yield
+
+    return LegacyDatabase()
+
+
+def _write_direct(db, intake_id: str, text: str) -> None:
+    with db.unit_of_work():
+        db.save_case(intake_id, text, "medium-risk", 0.5, {"platform": "x"}, {}, {})
+        db.log_action(intake_id, "analysis_completed", "system", {"score": 0.5})
+        db.store_fingerprint(intake_id, text, f"hash-{intake_id}")
+
+
+def _write_behind(queue, intake_id: str, text: str) -> None:
+    queue.submit(
+        dict(
+            intake_id=intake_id,
+            raw_text=text,
+            classification="medium-risk",
+            composite_score=0.5,
+            metadata={"platform": "x"},
+            breakdown={},
+            provenance={},
+        ),
+        dict(intake_id=intake_id, action="analysis_completed", actor="system", payload={"score": 0.5}),
+        (intake_id, text, f"hash-{intake_id}"),
+    )
+
+
+def _run(write, target, threads: int, writes: int) -> Tuple[float, List[float]]:
+    errors = []
+    latencies: List[float] = []
+
+    def worker(n: int) -> None:
+        local = []
+        try:
+            for i in range(writes):
+                intake_id = f"{n}-{i}"
+                text = f"Post {intake_id}: share this now before it is censored!"
+                started = time.perf_counter()
+                write(target, intake_id, text)
+                local.append((time.perf_counter() - started) * 1000.0)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+        latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        print(f"  {len(errors)} worker(s) failed, first error: {errors[0]!r}")
+    return elapsed, sorted(latencies)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="intakes per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        legacy = _legacy_database(os.path.join(tmpdir, "legacy.db"))
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'pooled.db')}"
+        from app.config import get_settings
+        from app.storage.database import Database
+        from app.storage.write_behind import WriteBehindQueue
+
+        get_settings.cache_clear()
+        pooled = Database()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'write_behind.db')}"
+        get_settings.cache_clear()
+        queue = WriteBehindQueue(Database())
+
+        total = args.threads * args.writes
+        runs = (
+            ("legacy per-call", _write_direct, legacy),
+            ("pooled WAL + unit_of_work", _write_direct, pooled),
+            ("pooled WAL + write-behind", _write_behind, queue),
+        )
+        for name, write, target in runs:
+            elapsed, latencies = _run(write, target, args.threads, args.writes)
+            if target is queue:
+                # Count the drain so throughput reflects committed rows
+                drain_started = time.perf_counter()
+                queue.close()
+                elapsed += time.perf_counter() - drain_started
+            print(
+                f"{name:>28}: {total} intakes in {elapsed:.2f}s ({total / elapsed:,.0f} intakes/s), "
+                f"p50 {_percentile(latencies, 0.5):.3f} ms, p99 {_percentile(latencies, 0.99):.3f} ms"
+            )
+        stats = queue.stats()
+        print(f"  write-behind: {stats['batches']:.0f} batches, avg {stats['avg_batch']} rows, "
+              f"avg flush {stats['avg_flush_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.config import get_settings
+from app.schemas import ContentIntake, SourceMetadata
+from app.services.orchestrator import AnalysisOrchestrator
+
+get_settings.cache_clear()
+
+
+def test_batch_matches_single_post_scoring(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/batch.db")
+    get_settings.cache_clear()
+
+    orchestrator = AnalysisOrchestrator()
+    intakes = [
+        ContentIntake(
+            text=f"Breaking: share this now before it is censored! Post number {i} in the feed.",
+            source="telegram",
+            metadata=SourceMetadata(platform="telegram-channel", region="IN", actor_id=f"actor::{i % 2}"),
+            tags=["election"],
+        )
+        for i in range(4)
+    ]
+
+    batch_results = orchestrator._process_batch_sync(intakes)
+    single = orchestrator._process_sync(intakes[0])
+
+    assert len(batch_results) == len(intakes)
+    assert batch_results[0].composite_score == single.composite_score
+    assert batch_results[0].breakdown.heuristics == single.breakdown.heuristics
+    for result in batch_results:
+        assert orchestrator.db.fetch_case(result.intake_id) is not None
+    assert orchestrator.graph.graph.has_node(f"content::{batch_results[-1].intake_id}")
+
+    async def streamed():
+        return [result async for result in orchestrator.process_batch(intakes)]
+
+    assert [r.composite_score for r in asyncio.run(streamed())] == [r.composite_score for r in batch_results]
+
+
+def test_batch_goes_through_the_write_behind_queue(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/batch_wb.db")
+    monkeypatch.setenv("WRITE_BEHIND_ENABLED", "true")
+    get_settings.cache_clear()
+
+    orchestrator = AnalysisOrchestrator()
+    intakes = [ContentIntake(text=f"Batch post {i} asking everyone to share it now.") for i in range(3)]
+    try:
+        results = orchestrator._process_batch_sync(intakes)
+        assert orchestrator.write_behind.stats()["enqueued"] == 3
+        assert orchestrator.write_behind.flush(5)
+        for result in results:
+            assert orchestrator.db.fetch_case(result.intake_id) is not None
+        assert orchestrator.write_behind.stats()["committed"] == 3
+    finally:
+        orchestrator.close()
+        get_settings.cache_clear()
+
+
+def test_batch_upload_is_parsed_incrementally_and_capped(tmp_path, monkeypatch):
+    import json
+
+    import pytest
+    from fastapi import HTTPException
+    from starlette.requests import Request
+
+    monkeypatch.chdir(tmp_path)  # app.main opens its default databases on import
+    from app import main
+
+    def upload(chunks, content_type="application/x-ndjson"):
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": n < len(chunks) - 1}
+            for n, chunk in enumerate(chunks)
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        headers = [(b"content-type", content_type.encode())]
+        return Request({"type": "http", "method": "POST", "headers": headers}, receive), messages
+
+    post = {"text": "Share this before it is gone from every feed!", "metadata": {"platform": "x", "region": "IN"}}
+    body = b"\n".join(json.dumps(item).encode() for item in (post, {"text": "A post that names no region at all."}, post, {}))
+    request, _ = upload([body[:25], body[25:70], body[70:]])
+    accepted, rejected, count = asyncio.run(main._read_batch_items(request))
+    assert (count, [index for index, _, _ in accepted], [index for index, _ in rejected]) == (4, [0, 2], [1, 3])
+    assert accepted[0][2] == "IN"
+
+    request, _ = upload([json.dumps({"items": [post, post]}).encode()], "application/json")
+    assert len(asyncio.run(main._read_batch_items(request))[0]) == 2
+
+    # Over the item limit: rejected with 413 without reading the rest of the body
+    monkeypatch.setattr(get_settings(), "batch_intake_max_items", 2)
+    line = json.dumps(post).encode() + b"\n"
+    request, unread = upload([line, line, line, line, line])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main._read_batch_items(request))
+    assert error.value.status_code == 413 and len(unread) == 2
+
+    monkeypatch.setattr(get_settings(), "batch_intake_max_bytes", 100)
+    request, _ = upload([json.dumps([post] * 3).encode()], "application/json")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main._read_batch_items(request))
+    assert error.value.status_code == 413
@@ -1,4 +1,9 @@
+import asyncio
 import os
+import random
+import time
+
+import numpy as np
 
 os.environ["HF_MODEL_NAME"] = "disabled"
 os.environ["HF_TOKENIZER_NAME"] = "disabled"
@@ -9,6 +14,15 @@ from app.schemas import ContentIntake, SourceMetadata
 
 get_settings.cache_clear()
 
+CORPUS = [
+    "Breaking news: Coordinated civic unrest planned with tactical logistics. Join the secure channel now.",
+    "The weather is nice today. We walked to the park. The kids played on the swings. Then we went home.",
+    "URGENT!!! They censored the TRUTH. Share this now before it is banned! Click here to read more.",
+    "short text with no sentence punctuation at all but enough characters",
+]
+# Upper ends of the unbounded features; the rest are ratios in [0, 1]
+SCALES = {"avg_token_length": 20.0, "sentence_length_var": 5000.0, "entropy": 8.0, "readability_score": 80.0}
+
 
 def test_detection_scores_with_heuristics_only():
     engine = DetectorEngine()
@@ -27,3 +41,120 @@ def test_detection_scores_with_heuristics_only():
     assert classification in {"low-risk", "medium-risk", "high-risk"}
     assert breakdown.linguistic_score >= 0
     assert breakdown.behavioral_score > 0
+
+
+def test_linguistic_scores_match_scalar_path():
+    engine = DetectorEngine()
+    rng = random.Random(17)
+    rows = [engine._extract_features(text) for text in CORPUS]
+    for _ in range(500):
+        row = {name: rng.uniform(0.0, SCALES.get(name, 1.0)) for name in engine.FEATURE_COLUMNS}
+        row.pop(rng.choice(engine.FEATURE_COLUMNS))  # missing keys read as 0
+        rows.append(row)
+    expected = [engine._sigmoid(engine._score_features(row)) for row in rows]
+
+    scores = engine.linguistic_scores(rows, chunk_rows=64)
+    assert np.allclose(scores, expected, rtol=1e-12, atol=1e-15)
+    assert np.array_equal(engine.linguistic_scores(engine.feature_matrix(rows)), scores)
+
+    engine.weights["entropy"] = -3.0
+    retuned = engine.linguistic_scores(rows)
+    assert np.allclose(retuned, [engine._sigmoid(engine._score_features(row)) for row in rows], rtol=1e-12)
+
+
+class SlowDetector:
+    available = True
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def analyze_text(self, text):
+        time.sleep(self.delay)
+        return {"ai_probability": 0.9, "is_ai": True}, None
+
+
+class SlowOllama:
+    available = True
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.cancelled = 0
+
+    def risk_assessment(self, text):
+        time.sleep(self.delay)
+        return 0.6
+
+
+class SlowAsyncOllama(SlowOllama):
+    async def risk_assessment(self, text):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return 0.6
+
+
+def test_signals_run_concurrently_and_late_ones_are_dropped(monkeypatch):
+    engine = DetectorEngine()
+    engine._cache = None
+    intake = ContentIntake(text=CORPUS[2])
+    engine._ai_detector = SlowDetector(0.3)
+    engine._ollama_client = SlowOllama(0.3)
+    monkeypatch.setattr(engine.settings, "detector_deadline_ms", 0)
+    _, _, breakdown = engine.detect(intake)
+    assert (breakdown.ai_probability, breakdown.ollama_risk, breakdown.timed_out_signals) == (0.9, 0.6, [])
+    assert set(breakdown.stage_timings_ms) == {"features", "ai", "ollama", "total"}
+    assert breakdown.stage_timings_ms["total"] < 550  # not 600: the calls overlapped
+
+    engine._ai_detector = SlowDetector(1.0)
+    engine._ollama_client = SlowOllama(0.0)
+    monkeypatch.setattr(engine.settings, "detector_deadline_ms", 200)
+    composite, classification, breakdown = engine.detect(intake)
+    assert (breakdown.ai_probability, breakdown.ollama_risk, breakdown.timed_out_signals) == (None, 0.6, ["ai"])
+    assert breakdown.stage_timings_ms["total"] < 800
+    assert (composite, classification) == engine._compose(
+        intake, engine._features.extract(intake.text), None, None, 0.6
+    )[:2]
+    engine.close()
+
+
+def test_batch_fans_ollama_out_to_the_signal_pool(monkeypatch):
+    engine = DetectorEngine()
+    engine._cache = None
+    engine._ollama_client = SlowOllama(0.3)
+    intakes = [ContentIntake(text=text) for text in CORPUS]
+
+    started = time.perf_counter()
+    results = engine.detect_batch(intakes)
+    assert time.perf_counter() - started < 0.9  # four workers: about one call, not 1.2 s
+    assert [breakdown.ollama_risk for _, _, breakdown in results] == [0.6] * 4
+    assert [result[:2] for result in results] == [
+        engine._compose(intake, engine._features.extract(intake.text), None, None, 0.6)[:2] for intake in intakes
+    ]
+
+    engine._ollama_client = SlowOllama(1.0)
+    monkeypatch.setattr(engine.settings, "detector_deadline_ms", 200)
+    started = time.perf_counter()
+    results = engine.detect_batch(intakes)
+    assert time.perf_counter() - started < 0.8
+    assert all(
+        (breakdown.ollama_risk, breakdown.timed_out_signals) == (None, ["ollama"]) for _, _, breakdown in results
+    )
+    engine.close()
+
+
+def test_detect_async_cancels_late_ollama(monkeypatch):
+    engine = DetectorEngine()
+    engine._cache = None
+    engine._ai_detector = SlowDetector(0.0)
+    engine._ollama_async = SlowAsyncOllama(5.0)
+    monkeypatch.setattr(engine.settings, "detector_deadline_ms", 200)
+
+    started = time.perf_counter()
+    _, _, breakdown = asyncio.run(engine.detect_async(ContentIntake(text=CORPUS[0])))
+    assert time.perf_counter() - started < 1.0
+    assert (breakdown.ai_probability, breakdown.ollama_risk, breakdown.timed_out_signals) == (0.9, None, ["ollama"])
+    assert engine._ollama_async.cancelled == 1
+    assert "ollama" not in breakdown.stage_timings_ms
+    engine.close()
@@ -0,0 +1,73 @@
+import json
+import os
+import random
+from pathlib import Path
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.config import get_settings
+from app.models.detection import DetectorEngine
+from app.models.features import (
+    FeatureExtractor,
+    _matrix_coherence,
+    _pairwise_coherence,
+    exact_mattr,
+    mattr,
+)
+from app.models.lexicon import ReloadingLexicon
+from app.schemas import ContentIntake, SourceMetadata
+
+get_settings.cache_clear()
+
+# Stylometric features recorded before feature extraction became a single pass;
+# behavioural scores re-recorded when lexicon terms started matching whole words only
+GOLDEN = json.loads((Path(__file__).parent / "fixtures" / "detection_golden.json").read_text())["cases"]
+
+
+def test_features_and_scores_match_golden_corpus():
+    engine = DetectorEngine()
+    for case in GOLDEN:
+        intake = ContentIntake(
+            text=case["text"],
+            source="test",
+            metadata=SourceMetadata(**case["metadata"]) if case["metadata"] else None,
+            tags=case["tags"],
+        )
+        composite, classification, breakdown = engine.detect(intake)
+        assert engine._extract_features(case["text"]) == case["features"], case["text"][:60]
+        assert breakdown.linguistic_score == case["linguistic_score"]
+        assert breakdown.behavioral_score == case["behavioral_score"]
+        assert breakdown.heuristics == case["heuristics"]
+        assert breakdown.lexicon_hits == case["lexicon_hits"]
+        assert (composite, classification) == (case["composite"], case["classification"])
+
+
+def test_matrix_coherence_matches_pairwise_loop():
+    rng = random.Random(15)
+    vocabulary = [f"word{i}" for i in range(60)]
+    for clauses in (24, 57, 300, 600):
+        keywords = [
+            set(rng.sample(vocabulary, rng.choice([0, 1, 3, 6, 12]))) for _ in range(clauses)
+        ]
+        assert _matrix_coherence(keywords) == _pairwise_coherence(keywords)
+    assert _matrix_coherence([set() for _ in range(30)]) == _pairwise_coherence([set() for _ in range(30)])
+
+
+def test_exact_mattr_matches_step_one_windows():
+    rng = random.Random(18)
+    for size, vocabulary in ((0, 5), (7, 5), (50, 20), (51, 3), (400, 40), (1000, 300)):
+        tokens = [f"t{rng.randrange(vocabulary)}" for _ in range(size)]
+        window = 50
+        if size < window:
+            expected = len(set(tokens)) / size if tokens else 0.0
+        else:
+            ratios = [len(set(tokens[i : i + window])) / window for i in range(size - window + 1)]
+            expected = sum(ratios) / len(ratios)
+        assert abs(exact_mattr(tokens, window) - expected) < 1e-12
+
+    text = " ".join(f"w{rng.randrange(30)}" for _ in range(300))
+    legacy = FeatureExtractor([], ReloadingLexicon({}))
+    exact = FeatureExtractor([], ReloadingLexicon({}), mattr_mode="exact")
+    assert legacy.extract(text).stylometric["mattr"] == mattr(text.split())
+    assert exact.extract(text).stylometric["mattr"] == exact_mattr(text.split())
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import get_settings
+from app.federated.manager import LedgerManager
+from app.federated.node import Node
+from app.federated.routes import create_router
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+
+def _refuse(request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+async def _slow_peer(request):
+    await asyncio.sleep(0.4)
+    if request.url.path.endswith("/tip"):
+        return httpx.Response(200, json={"height": 0, "hash": "x", "length": 1})
+    return httpx.Response(200, json={"valid": True})
+
+
+def _node_app(tmp_path, name, peers, mounts):
+    ledger = LedgerManager(db_path=str(tmp_path / f"{name}.db"))
+    node = Node(
+        nodes=[f"http://{name}"] + peers,
+        my_url=f"http://{name}",
+        db_path=ledger.ledger_db_path,
+        client_factory=lambda: httpx.AsyncClient(mounts=mounts),
+    )
+    app = FastAPI()
+    app.include_router(create_router(ledger, node))
+    return ledger, node, app
+
+
+def test_broadcast_queues_per_peer_and_retries_with_backoff(tmp_path):
+    mounts = {"http://dead": httpx.MockTransport(_refuse)}
+    a, node, app = _node_app(tmp_path, "a", ["http://b", "http://dead"], mounts)
+    b, _, b_app = _node_app(tmp_path, "b", [], mounts)
+    mounts["http://a"] = httpx.ASGITransport(app=app)
+    mounts["http://b"] = httpx.ASGITransport(app=b_app)
+
+    async def add_blocks(count):
+        async with httpx.AsyncClient(mounts=mounts) as client:
+            for n in range(count):
+                response = await client.post("http://a/api/v1/federated/add_block", json={"n": n})
+                assert response.json()["queued_peers"] == 2
+        # Wait for the background deliveries started by add_block
+        await asyncio.gather(*list(node.client._tasks))
+
+    asyncio.run(add_blocks(1))
+    assert b.get_tip().hash == a.get_tip().hash
+    stats = node.client.stats()
+    assert (stats["http://b"]["delivered"], stats["http://b"]["pending"]) == (1, 0)
+    dead = stats["http://dead"]
+    assert (dead["pending"], dead["attempts"], dead["reachable"], dead["consecutive_failures"]) == (1, 1, False, 1)
+    assert dead["retry_in_s"] > 0
+
+    # The dead peer is backing off: its queue grows but is not retried yet
+    asyncio.run(add_blocks(1))
+    assert b.chain_length() == 3
+    stats = node.client.stats()["http://dead"]
+    assert (stats["pending"], stats["first_pending_index"], stats["attempts"]) == (2, 1, 1)
+
+    # The outbox survives a restart; once the peer is back and due, it gets both blocks in order
+    c, _, c_app = _node_app(tmp_path, "c", [], mounts)
+    mounts["http://dead"] = httpx.ASGITransport(app=c_app)
+    restarted = Node(nodes=["http://a", "http://dead"], my_url="http://a", db_path=a.ledger_db_path,
+                     client_factory=lambda: httpx.AsyncClient(mounts=mounts))
+    with a._cursor() as cur:
+        cur.execute("UPDATE peer_outbox SET next_attempt=0")
+    assert asyncio.run(restarted.client.flush()) == {"http://dead": 2}
+    assert c.get_chain() == a.get_chain()
+    assert restarted.client.stats()["http://dead"]["pending"] == 0
+    for ledger in (a, b, c):
+        close_pools(ledger.ledger_db_path)
+
+
+def test_validation_and_probes_fan_out_to_all_peers(tmp_path):
+    mounts = {"http://dead": httpx.MockTransport(_refuse)}
+    slow = [f"http://slow{n}" for n in range(3)]
+    for peer in slow:
+        mounts[peer] = httpx.MockTransport(_slow_peer)
+    ledger, node, app = _node_app(tmp_path, "a", slow + ["http://dead"], mounts)
+    mounts["http://a"] = httpx.ASGITransport(app=app)
+
+    async def call(method, url, **kwargs):
+        async with httpx.AsyncClient(mounts=mounts) as client:
+            return await client.request(method, url, **kwargs)
+
+    asyncio.run(call("POST", "http://a/api/v1/federated/add_block", json={"n": 1}))
+    started = time.perf_counter()
+    result = asyncio.run(call("GET", "http://a/api/v1/federated/validate")).json()
+    # Three peers answering in 0.4 s each take about 0.4 s together, not 1.2 s
+    assert time.perf_counter() - started < 1.0
+    assert result["self_valid"] and not result["network_valid"]
+    assert result["tampered_nodes"] == ["http://dead"]
+    assert all(result["nodes"][peer] for peer in slow)
+
+    health = asyncio.run(call("GET", "http://a/api/v1/federated/peers", params={"probe": "true"})).json()
+    assert health["height"] == 1
+    assert all(health["peers"][peer]["lag_blocks"] == 1 for peer in slow)
+    assert health["peers"]["http://dead"]["reachable"] is False
+    assert health["peers"]["http://slow0"]["avg_latency_ms"] >= 400
+    close_pools(ledger.ledger_db_path)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import get_settings
+from app.federated.ledger import Block
+from app.federated.manager import LedgerManager
+from app.federated.node import Node
+from app.federated.routes import create_router
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+NAMES = ("a", "b", "c")
+
+
+def _network(tmp_path):
+    """Three in-process nodes whose peer clients reach each other through ASGI transports."""
+    mounts = {}
+    ledgers = {}
+    for name in NAMES:
+        ledgers[name] = LedgerManager(db_path=str(tmp_path / f"{name}.db"))
+        node = Node(
+            nodes=[f"http://{peer}" for peer in NAMES],
+            my_url=f"http://{name}",
+            db_path=str(tmp_path / f"{name}.db"),
+            client_factory=lambda: httpx.AsyncClient(mounts=mounts),
+        )
+        app = FastAPI()
+        app.include_router(create_router(ledgers[name], node))
+        mounts[f"http://{name}"] = httpx.ASGITransport(app=app)
+    return ledgers, mounts
+
+
+def _append(ledger, count, tag):
+    previous = ledger.get_tip()
+    blocks = []
+    for _ in range(count):
+        previous = Block.create_new(previous.index + 1, f"{tag}-{previous.index + 1}", previous.hash)
+        blocks.append(previous)
+    ledger.save_blocks(blocks)
+
+
+def _call(mounts, method, url, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(mounts=mounts) as client:
+            return await client.request(method, url, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_delta_sync_fetches_only_the_divergent_suffix(tmp_path):
+    ledgers, mounts = _network(tmp_path)
+    a, b, c = (ledgers[name] for name in NAMES)
+    _append(a, 400, "shared")
+    b.replace_chain(a.get_chain())
+    _append(b, 3, "b")
+    c.replace_chain(a.get_range(0, 391))
+    _append(c, 14, "c")
+
+    full_chain = _call(mounts, "GET", "http://c/api/v1/federated/chain")
+    assert full_chain.json()["length"] == 405
+    page = _call(mounts, "GET", "http://c/api/v1/federated/chain", params={"from": 10, "limit": 5, "compact": "true"})
+    assert [row[0] for row in page.json()["chain"]] == list(range(10, 15)) and page.json()["next"] == 15
+
+    response = _call(mounts, "POST", "http://a/api/v1/federated/sync_chain")
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["synced_from"], result["fork_point"], result["fetched"], result["new_length"]) == (
+        "http://c", 390, 14, 405,
+    )
+    assert result["rounds"] <= 3
+    assert result["bytes_received"] < len(full_chain.content) / 10
+    assert a.get_chain() == c.get_chain()
+    assert a.checkpoint() == (404, c.get_tip().hash)
+
+    # b forked from the same point with a shorter suffix: it is rewritten above block 390
+    result = _call(mounts, "POST", "http://b/api/v1/federated/sync_chain").json()
+    assert (result["fork_point"], result["fetched"]) == (390, 14)
+    assert b.get_chain() == c.get_chain()
+
+    # Nobody is ahead any more
+    assert _call(mounts, "POST", "http://c/api/v1/federated/sync_chain").status_code == 400
+    for ledger in ledgers.values():
+        close_pools(ledger.ledger_db_path)
+
+
+def test_sync_repairs_a_tampered_local_chain(tmp_path):
+    ledgers, mounts = _network(tmp_path)
+    a, c = ledgers["a"], ledgers["c"]
+    _append(c, 50, "shared")
+    a.replace_chain(c.get_chain())
+    with a._cursor() as cur:
+        cur.execute("UPDATE blocks SET data_encrypted='forged' WHERE idx=45")
+
+    result = _call(mounts, "POST", "http://a/api/v1/federated/sync_chain").json()
+    assert (result["synced_from"], result["fork_point"], result["fetched"]) == ("http://c", 44, 6)
+    assert a.get_chain() == c.get_chain() and a.validate_incremental().valid
+    hashes = _call(mounts, "GET", "http://a/api/v1/federated/hashes", params={"at": "0,45,99"}).json()["hashes"]
+    assert hashes == {"0": c.get_block(0).hash, "45": c.get_block(45).hash}
+    for ledger in ledgers.values():
+        close_pools(ledger.ledger_db_path)
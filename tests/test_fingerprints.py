@@ -0,0 +1,85 @@
+import hashlib
+import os
+import sqlite3
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import pytest
+
+from app.config import get_settings
+from app.storage.database import Database, normalized_text_hash
+from app.storage.migrations import MIGRATIONS
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "fingerprints.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    get_settings.cache_clear()
+    yield path
+    close_pools(str(path))
+
+
+def test_repeats_are_counted_and_both_hashes_are_looked_up(db_path):
+    db = Database()
+    db.store_fingerprint("first", "Share  THIS now", _sha("Share  THIS now"))
+    db.store_fingerprint("second", "share this now", _sha("share this now"))
+    db.store_fingerprint("third", "Share  THIS now", _sha("Share  THIS now"))
+    # Content hash of an original that normalizes differently from the stored text
+    db.store_fingerprint("fourth", "edited copy", _sha("original copy"))
+
+    matches = {m["content_hash"]: m for m in db.check_fingerprint("share this NOW")}
+    assert set(matches) == {_sha("Share  THIS now"), _sha("share this now")}
+    repeated = matches[_sha("Share  THIS now")]
+    assert repeated["intake_id"] == "first"
+    assert repeated["last_intake_id"] == "third"
+    assert repeated["occurrences"] == 2
+    assert repeated["normalized_hash"] == normalized_text_hash("share this now")
+
+    assert [m["intake_id"] for m in db.check_fingerprint("original copy")] == ["fourth"]
+    assert db.check_fingerprint("unrelated") == []
+
+    with db._cursor() as cur:
+        plan = " ".join(
+            row[-1]
+            for row in cur.execute(
+                "EXPLAIN QUERY PLAN SELECT normalized_hash FROM fingerprints WHERE content_hash = ?", (b"x",)
+            )
+        )
+    assert "COVERING INDEX fingerprints_by_content" in plan
+
+
+def test_legacy_fingerprint_table_is_migrated(db_path):
+    conn = sqlite3.connect(db_path)
+    MIGRATIONS[0](conn.cursor())
+    rows = [
+        ("a", _sha("x"), normalized_text_hash("x"), "2024-01-01T00:00:00"),
+        ("b", _sha("y"), normalized_text_hash("y"), "2024-01-02T00:00:00"),
+        ("c", _sha("x"), normalized_text_hash("x"), "2024-01-03T00:00:00"),
+    ]
+    conn.executemany(
+        "INSERT INTO fingerprints (intake_id, content_hash, normalized_hash, created_at) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+    db = Database()
+    with db._cursor() as cur:
+        assert cur.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        assert cur.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0] == 2
+        assert cur.execute("SELECT typeof(normalized_hash) FROM fingerprints LIMIT 1").fetchone()[0] == "blob"
+    (match,) = db.check_fingerprint("x")
+    assert (match["intake_id"], match["last_intake_id"], match["occurrences"]) == ("a", "c", 2)
+    assert (match["created_at"], match["last_seen"]) == ("2024-01-01T00:00:00", "2024-01-03T00:00:00")
+    # Reopening an up-to-date file is a no-op
+    Database()
+    assert len(db.check_fingerprint("y")) == 1
@@ -0,0 +1,416 @@
+import math
+import random
+
+from app.models.graph_intel import GraphIntelEngine
+from app.schemas import ContentIntake, SourceMetadata
+
+
+def _intake(rng, i, actors=12):
+    return ContentIntake(
+        text=f"Synthetic post number {i} about the coordinated campaign narrative.",
+        source=rng.choice(["web", "telegram", "forum"]),
+        metadata=SourceMetadata(
+            platform=rng.choice(["x", "telegram-channel", "forum"]),
+            region=rng.choice(["IN", "EU", None]) if actors <= 12 else None,
+            actor_id=f"actor::{rng.randrange(actors)}",
+        ),
+        tags=rng.sample(["election", "leak", "riot", "health", "border"], rng.randrange(3)),
+    )
+
+
+def _populated_engine(count=60, seed=7, actors=12):
+    rng = random.Random(seed)
+    engine = GraphIntelEngine()
+    for i in range(count):
+        score = rng.random()
+        classification = "high-risk" if score > 0.6 else "medium-risk" if score > 0.35 else "low-risk"
+        engine.ingest(f"id-{i}", _intake(rng, i, actors), classification, score)
+    return engine
+
+
+def _dense_scores(engine):
+    """Reference: the original dense two-hop projection over the whole graph."""
+    nodes = list(engine.graph.nodes())
+    lookup = {node: idx for idx, node in enumerate(nodes)}
+    features = [engine._node_features(engine.graph.nodes[node]) for node in nodes]
+    adjacency = [[0.0] * len(nodes) for _ in nodes]
+    for source, target in engine.graph.edges():
+        adjacency[lookup[source]][lookup[target]] = adjacency[lookup[target]][lookup[source]] = 1.0
+    degrees = [max(sum(row), 1.0) for row in adjacency]
+
+    def propagate(matrix):
+        return [
+            [sum(adjacency[i][j] * matrix[j][k] for j in range(len(nodes))) / degrees[i] for k in range(5)]
+            for i in range(len(nodes))
+        ]
+
+    neighbor = propagate(features)
+    context = propagate(neighbor)
+    dot = lambda row, weights: sum(a * b for a, b in zip(row, weights))
+    scores = {}
+    for i, node in enumerate(nodes):
+        logit = (
+            dot(features[i], engine.FEATURE_WEIGHTS)
+            + dot(neighbor[i], engine.NEIGHBOR_WEIGHTS)
+            + 0.5 * dot(context[i], engine.NEIGHBOR_WEIGHTS)
+            + engine.GNN_BIAS
+        )
+        scores[node] = 1 / (1 + math.exp(-logit))
+    return scores
+
+
+def test_incremental_scores_match_dense_projection():
+    engine = _populated_engine()
+    reference = _dense_scores(engine)
+    incremental = dict(engine._gnn_projection().items())
+    assert incremental.keys() == reference.keys()
+    for node, score in reference.items():
+        assert math.isclose(incremental[node], score, abs_tol=1e-9), node
+
+
+def test_summary_and_feeds_are_memoized_per_version():
+    engine = _populated_engine(count=20)
+    first = engine.summary()
+    assert engine.summary() is first
+    assert engine.threat_intel_feed() is engine.threat_intel_feed()
+
+    version = engine.version
+    engine.ingest("id-new", _intake(random.Random(1), 999), "high-risk", 0.9)
+    assert engine.version == version + 1
+    assert engine.summary() is not first
+    assert engine.summary().node_count > first.node_count
+
+
+def test_stale_summary_is_served_from_background_refresher():
+    engine = _populated_engine(count=20)
+    engine.summary()
+    # Mutate without summarising: readers tolerating staleness keep the snapshot
+    engine._add_intake("id-late", _intake(random.Random(2), 1000), "low-risk", 0.1)
+    stale = engine.summary(max_staleness=60)
+    assert "content::id-late" not in {c for com in stale.communities for c in com.content}
+
+    engine._refresh_interval = 0.05
+    fresh = engine.summary(max_staleness=0)
+    assert "content::id-late" in {c for com in fresh.communities for c in com.content}
+    assert engine._refresher is not None
+    engine.close()
+    assert engine._refresher is None
+
+
+def test_component_tracker_matches_networkx():
+    import networkx as nx
+
+    # Many actors and no regions leave several disconnected components
+    engine = _populated_engine(count=80, seed=11, actors=400)
+    scores = dict(engine._gnn_projection().items())
+    expected = list(nx.connected_components(engine.graph))
+    tracked = list(engine._components.components())
+    assert len(tracked) == len(expected) > 1
+    for component, members in zip(tracked, expected):
+        assert {node for nodes in component.members.values() for node in nodes} == members
+        reference = sum(scores[node] for node in members) / len(members)
+        assert math.isclose(component.avg_score, reference, abs_tol=1e-9)
+
+    communities = engine.summary().communities
+    assert [set(c.content) for c in communities] == [
+        {n for n in members if n.startswith("content::")} for members in expected
+    ]
+
+
+def _reference_alerts(engine, scores, limit=10):
+    """The original full-graph scan the alert index replaces."""
+    graph = engine.graph
+    alerts = []
+    for actor, data in graph.nodes(data=True):
+        if data.get("type") != "actor":
+            continue
+        contents = [n for n in graph.neighbors(actor) if graph.nodes[n].get("type") == "content"]
+        copies = {
+            n for c in contents for n in graph.neighbors(c) if graph[c][n].get("relation") == "near_duplicate"
+        }
+        peers = sorted(
+            {
+                p
+                for c in set(contents) | copies
+                for p in graph.neighbors(c)
+                if graph.nodes[p].get("type") == "actor" and p != actor
+            }
+        )
+        tags = sorted(
+            {graph.nodes[t]["tag"] for c in contents for t in graph.neighbors(c) if graph.nodes[t].get("type") == "narrative"}
+        )
+        near = sorted(
+            {
+                n
+                for n in copies
+                if any(graph.nodes[p].get("type") == "actor" and p != actor for p in graph.neighbors(n))
+            }
+        )
+        if peers and (tags or near):
+            risk = max([scores[actor]] + [scores[p] for p in peers])
+            alerts.append((actor, peers[:5], tags[:5], near[:5], round(risk, 3)))
+    alerts.sort(key=lambda alert: alert[-1], reverse=True)
+    return alerts[:limit]
+
+
+def test_indexed_alerts_and_chains_track_the_graph():
+    rng = random.Random(3)
+    engine = GraphIntelEngine()
+    for i in range(90):
+        # Reusing intake ids attaches several actors to the same content node
+        engine.ingest(f"id-{i % 30}", _intake(rng, i), "medium-risk", rng.random())
+        if i % 15 == 14:
+            summary = engine.summary()
+            scores = dict(engine._index.items())
+            assert [
+                (a.actor, a.peer_actors, a.shared_tags, a.near_duplicates, a.risk)
+                for a in summary.coordination_alerts
+            ] == _reference_alerts(engine, scores)
+
+    assert engine.summary().coordination_alerts
+    chains = engine.siem_payload().propagation_chains
+    assert chains
+    for chain in chains:
+        first, content, narrative, last = chain.path
+        assert narrative in engine.graph[content]
+        assert first in engine.graph[content] or any(
+            first in engine.graph[c] for c in engine.graph[narrative]
+        )
+
+
+def _reference_risk_actors(engine, limit=5):
+    """The original scan over every actor and its content neighbours."""
+    graph = engine.graph
+    scores = dict(engine._index.items())
+    ranked = []
+    for actor, data in graph.nodes(data=True):
+        if data.get("type") != "actor":
+            continue
+        neighbor_scores = [
+            graph.nodes[n].get("score", 0.0) for n in graph.neighbors(actor) if graph.nodes[n].get("type") == "content"
+        ]
+        if neighbor_scores:
+            ranked.append((actor, 0.6 * sum(neighbor_scores) / len(neighbor_scores) + 0.4 * scores[actor]))
+    ranked.sort(key=lambda item: round(item[1], 9), reverse=True)
+    return [actor for actor, _ in ranked[:limit]]
+
+
+def test_high_risk_actors_track_the_graph(tmp_path):
+    from app.storage.graph_store import GraphStore
+
+    rng = random.Random(13)
+    engine = GraphIntelEngine(store=GraphStore(str(tmp_path)), max_content=25)
+    for i in range(150):
+        # Reused intake ids re-score content that several actors already published
+        engine.ingest(f"id-{i % 20 if i < 100 else i}", _intake(rng, i, actors=20), "medium-risk", rng.random())
+        if i % 10 == 9:
+            assert engine.summary().high_risk_actors == _reference_risk_actors(engine)
+            assert engine._top_risk_actors(engine._gnn_projection(), limit=50) == _reference_risk_actors(engine, 50)
+    assert engine.stats()["retention"]["evicted_actors"] > 0
+    engine.close()
+
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    assert restored.summary().high_risk_actors == _reference_risk_actors(restored)
+    restored.close()
+
+
+def test_graph_store_restores_engine_after_restart(tmp_path):
+    from app.storage.graph_store import GraphStore
+
+    rng = random.Random(5)
+    engine = GraphIntelEngine(store=GraphStore(str(tmp_path), snapshot_every=150))
+    for i in range(60):
+        engine.ingest(f"id-{i % 40}", _intake(rng, i), "high-risk", rng.random())
+    assert engine._store.stats()["snapshots_written"] >= 1
+    before = engine.summary()
+    engine.close()
+
+    # Simulate a crash mid-append: a torn frame at the end of the log is dropped
+    with open(tmp_path / GraphStore.LOG_NAME, "ab") as handle:
+        handle.write(b"\x40\x00\x00\x00partial")
+
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path), snapshot_every=150))
+    assert set(restored.graph.nodes) == set(engine.graph.nodes)
+    assert set(map(frozenset, restored.graph.edges)) == set(map(frozenset, engine.graph.edges))
+    scores = dict(engine._index.items())
+    for node, score in restored._gnn_projection().items():
+        assert math.isclose(score, scores[node], abs_tol=1e-9)
+    after = restored.summary()
+    assert [c.gnn_score for c in after.communities] == [c.gnn_score for c in before.communities]
+    assert {a.actor for a in after.coordination_alerts} == {a.actor for a in before.coordination_alerts}
+    restored.close()
+
+
+def test_retention_evicts_content_and_keeps_indexes_consistent(tmp_path):
+    import networkx as nx
+    from datetime import datetime, timedelta
+
+    from app.storage.graph_store import GraphStore
+
+    rng = random.Random(9)
+    engine = GraphIntelEngine(store=GraphStore(str(tmp_path)), max_content=25)
+    for i in range(120):
+        engine.ingest(f"id-{i % 70}", _intake(rng, i, actors=30), "medium-risk", rng.random())
+
+    retention = engine.stats()["retention"]
+    assert retention["evicted_content"] > 0 and retention["evicted_actors"] > 0
+    content = [node for node, data in engine.graph.nodes(data=True) if data["type"] == "content"]
+    assert len(content) <= 25 + 1
+    # Nothing is left dangling: actors and narratives keep content, regions keep actors
+    for node, data in engine.graph.nodes(data=True):
+        neighbor_types = {engine.graph.nodes[n]["type"] for n in engine.graph.neighbors(node)}
+        if data["type"] in ("actor", "narrative"):
+            assert "content" in neighbor_types, node
+        if data["type"] == "region":
+            assert "actor" in neighbor_types, node
+
+    scores = dict(engine._gnn_projection().items())
+    reference = _dense_scores(engine)
+    assert scores.keys() == reference.keys()
+    assert all(math.isclose(scores[n], reference[n], abs_tol=1e-9) for n in reference)
+    expected = list(nx.connected_components(engine.graph))
+    tracked = list(engine._components.components())
+    assert [{n for nodes in c.members.values() for n in nodes} for c in tracked] == expected
+    summary = engine.summary()
+    assert [(a.actor, a.peer_actors, a.shared_tags, a.risk) for a in summary.coordination_alerts] == (
+        _reference_alerts(engine, scores)
+    )
+
+    # Removals are logged, so a restart does not resurrect evicted nodes
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    assert set(restored.graph.nodes) == set(engine.graph.nodes)
+    assert set(map(frozenset, restored.graph.edges)) == set(map(frozenset, engine.graph.edges))
+    restored.close()
+
+    # Time-based window: from a week ahead every post is older than one day
+    engine.retention_days = 1
+    removed = engine.evict(now=datetime.utcnow() + timedelta(days=7))
+    assert removed["content"] == len(content)
+    assert engine.graph.number_of_nodes() == 0
+    engine.close()
+
+
+def test_simhash_index_matches_brute_force():
+    from app.models.simhash import SimHashIndex
+
+    rng = random.Random(11)
+    index = SimHashIndex(max_distance=4, blocks=5, merge_every=50)
+    hashes = {}
+    base = [rng.getrandbits(64) for _ in range(20)]
+    for i in range(300):
+        value = rng.choice(base)
+        for _ in range(rng.randrange(7)):
+            value ^= 1 << rng.randrange(64)
+        hashes[f"h{i}"] = value
+        index.add(f"h{i}", value)
+    for key in list(hashes)[::3]:
+        assert index.discard(key, hashes.pop(key))
+    for probe in base:
+        expected = sorted(
+            (bin(value ^ probe).count("1"), key)
+            for key, value in hashes.items()
+            if bin(value ^ probe).count("1") <= 4
+        )
+        got = index.query(probe, limit=len(hashes))
+        assert sorted((distance, key) for key, distance in got) == expected
+
+
+def test_near_duplicate_edges_raise_alerts_without_tags(tmp_path):
+    from app.storage.graph_store import GraphStore
+
+    campaign = "Officials confirmed the polling stations in the northern district stay closed tomorrow so share this"
+
+    def post(actor, text):
+        return ContentIntake(
+            text=text, source="telegram", metadata=SourceMetadata(platform="x", actor_id=actor)
+        )
+
+    engine = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    engine.ingest("a", post("actor::a", campaign), "high-risk", 0.9)
+    engine.ingest("b", post("actor::b", campaign.replace("northern", "southern")), "high-risk", 0.8)
+    engine.ingest("c", post("actor::c", "Completely unrelated note about a football match and the weather"), "low-risk", 0.1)
+
+    assert engine.graph["content::b"]["content::a"]["relation"] == "near_duplicate"
+    alerts = {alert.actor: alert for alert in engine.summary().coordination_alerts}
+    assert set(alerts) == {"actor::a", "actor::b"}
+    assert alerts["actor::a"].peer_actors == ["actor::b"]
+    assert alerts["actor::a"].shared_tags == []
+    assert alerts["actor::a"].near_duplicates == ["content::b"]
+    engine.close()
+
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    assert {alert.actor for alert in restored.summary().coordination_alerts} == {"actor::a", "actor::b"}
+    restored.ingest("d", post("actor::d", campaign.replace("tomorrow", "today")), "high-risk", 0.7)
+    assert set(restored.graph["content::d"]) >= {"content::a", "content::b"}
+
+    restored._remove_content(["content::a", "content::b"])
+    assert restored._simhash.query(restored.graph.nodes["content::d"]["simhash"]) == [("content::d", 0)]
+    assert restored.summary().coordination_alerts == []
+    restored.close()
+
+
+def test_snapshots_are_compacted_off_the_ingest_path(tmp_path):
+    import time
+
+    from app.storage.graph_store import GraphStore
+
+    store = GraphStore(str(tmp_path), snapshot_every=100)
+    write = store._write_snapshot_file
+
+    def slow_write(nodes, edges):
+        # Stands in for serializing and fsyncing a graph with millions of edges
+        time.sleep(0.6)
+        write(nodes, edges)
+
+    store._write_snapshot_file = slow_write
+    rng = random.Random(11)
+    engine = GraphIntelEngine(store=store)
+    latencies = []
+    for i in range(80):
+        started = time.perf_counter()
+        engine.ingest(f"id-{i}", _intake(rng, i), "medium-risk", rng.random())
+        latencies.append(time.perf_counter() - started)
+    assert store.snapshot_running
+    # Neither the ingest that sealed the log nor those during the compaction waited for it
+    assert max(latencies) < 0.3
+    started = time.perf_counter()
+    engine.summary()
+    assert time.perf_counter() - started < 0.3
+    assert store.wait_snapshot(5) and store.stats()["snapshots_written"] == 1
+    assert not store.sealed_path.exists()
+    engine.close()
+
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    assert set(restored.graph.nodes) == set(engine.graph.nodes)
+    assert set(map(frozenset, restored.graph.edges)) == set(map(frozenset, engine.graph.edges))
+    restored.close()
+
+
+def test_unfinished_compaction_is_replayed_on_restart(tmp_path):
+    from app.storage.graph_store import GraphStore
+
+    store = GraphStore(str(tmp_path), snapshot_every=60)
+
+    def crash(nodes, edges):
+        raise OSError("disk full")
+
+    store._write_snapshot_file = crash
+    rng = random.Random(12)
+    engine = GraphIntelEngine(store=store, max_content=30)
+    for i in range(70):
+        engine.ingest(f"id-{i}", _intake(rng, i), "high-risk", rng.random())
+    engine.close()
+    assert store.sealed_path.exists() and store.stats()["snapshot_errors"] >= 1
+
+    restored = GraphIntelEngine(store=GraphStore(str(tmp_path), snapshot_every=60))
+    assert set(restored.graph.nodes) == set(engine.graph.nodes)
+    assert set(map(frozenset, restored.graph.edges)) == set(map(frozenset, engine.graph.edges))
+    # The next seal appends to the leftover segment and the compaction then succeeds
+    for i in range(70, 100):
+        restored.ingest(f"id-{i}", _intake(rng, i), "high-risk", rng.random())
+    restored.close()
+    assert not restored._store.sealed_path.exists()
+    again = GraphIntelEngine(store=GraphStore(str(tmp_path)))
+    assert set(again.graph.nodes) == set(restored.graph.nodes)
+    assert set(map(frozenset, again.graph.edges)) == set(map(frozenset, restored.graph.edges))
+    again.close()
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+os.environ["DISABLE_AI_MODELS"] = "true"
+
+import torch
+
+from app.integrations.hf_detector import AIDetector
+from app.integrations.micro_batch import MicroBatcher
+
+
+class _Encoding(dict):
+    def to(self, device):
+        return self
+
+
+class _FakeTokenizer:
+    """Whitespace tokenizer exposing the two calls AIDetector relies on."""
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+    def pad(self, features, return_tensors="pt"):
+        width = max(len(f["input_ids"]) for f in features)
+        return _Encoding(
+            input_ids=torch.tensor([f["input_ids"] + [0] * (width - len(f["input_ids"])) for f in features]),
+            attention_mask=torch.tensor(
+                [f["attention_mask"] + [0] * (width - len(f["attention_mask"])) for f in features]
+            ),
+        )
+
+
+class _FakeModel:
+    """Scores a text as AI when its mean word length exceeds five characters."""
+
+    def __init__(self, labels):
+        self.config = type("Config", (), {"id2label": labels})()
+        self.calls = 0
+
+    def __call__(self, input_ids, attention_mask):
+        self.calls += 1
+        mean = (input_ids * attention_mask).sum(dim=1) / attention_mask.sum(dim=1)
+        logits = torch.stack([5.0 - mean, mean - 5.0], dim=1)
+        return type("Output", (), {"logits": logits})()
+
+
+def _detector(max_batch_size=16):
+    detector = AIDetector()
+    detector._max_batch_size = max_batch_size
+    detector._ai_human_tokenizer = detector._family_tokenizer = _FakeTokenizer()
+    detector._ai_human_model = _FakeModel({0: "human", 1: "AI"})
+    detector._family_model = _FakeModel({0: "gpt", 1: "llama"})
+    return detector
+
+
+def test_analyze_batch_matches_per_text_results_and_skips_family_for_humans():
+    detector = _detector(max_batch_size=2)
+    texts = [
+        "tiny words here and now",
+        "extraordinarily elaborate sentences everywhere " * 30,
+        "",
+        "a b c",
+        "considerable vocabulary deployment throughout",
+    ]
+    batched = detector.analyze_batch(texts)
+    assert batched[2] == (None, None)
+    for text, (ai_result, family_result) in zip(texts, batched):
+        if not text:
+            continue
+        solo_ai = detector.detect_ai_human(text)
+        assert abs(ai_result["ai_probability"] - solo_ai["ai_probability"]) < 1e-6
+        assert (family_result is not None) == ai_result["is_ai"]
+        if family_result:
+            assert set(family_result) == {"family", "confidence", "all_probabilities"}
+
+
+def test_length_buckets_group_similar_lengths_within_batch_limit():
+    buckets = AIDetector._length_buckets([300, 10, 70, 12, 500, 11], max_batch_size=2)
+    assert buckets == [[1, 5], [3], [2], [0, 4]]
+
+
+def test_micro_batcher_shares_one_call_between_threads():
+    seen = []
+
+    def handler(items):
+        seen.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=200)
+    results = {}
+    threads = [
+        threading.Thread(target=lambda n=n: results.__setitem__(n, batcher.submit(n)))
+        for n in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {0: 0, 1: 2, 2: 4, 3: 6}
+    assert len(seen) == 1 and sorted(seen[0]) == [0, 1, 2, 3]
@@ -0,0 +1,121 @@
+import os
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import pytest
+
+from app.config import get_settings
+from app.federated.ledger import Block
+from app.federated.manager import LedgerManager
+from app.federated.verify import BlockVerifier
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    manager = LedgerManager(db_path=str(tmp_path / "ledger.db"))
+    yield manager
+    close_pools(manager.ledger_db_path)
+
+
+def _append(ledger, count):
+    previous = ledger.get_latest_block()
+    for _ in range(count):
+        previous = Block.create_new(previous.index + 1, f"payload-{previous.index + 1}", previous.hash)
+        ledger.save_block(previous)
+
+
+def _tamper(ledger, index):
+    with ledger._cursor() as cur:
+        cur.execute("UPDATE blocks SET data_encrypted='forged' WHERE idx=?", (index,))
+
+
+def test_incremental_validation_only_checks_new_blocks(ledger):
+    _append(ledger, 30)
+    first = ledger.validate_incremental()
+    assert (first.valid, first.height, first.checked) == (True, 30, 31)
+    assert ledger.checkpoint() == (30, ledger.get_latest_block().hash)
+    assert ledger.validate_incremental().checked == 0
+
+    _append(ledger, 5)
+    assert ledger.validate_chain(ledger.get_chain())
+    again = ledger.validate_incremental()
+    assert (again.valid, again.height, again.checked) == (True, 35, 5)
+
+    _append(ledger, 2)
+    _tamper(ledger, 37)
+    broken = ledger.validate_incremental()
+    assert (broken.valid, broken.height, broken.first_invalid) == (False, 36, 37)
+
+
+def test_audit_catches_tampering_below_the_checkpoint(ledger):
+    _append(ledger, 20)
+    assert ledger.validate_incremental().valid
+    _tamper(ledger, 8)
+    # Below the checkpoint: only a full audit looks there
+    assert ledger.validate_incremental().valid
+
+    assert ledger.start_audit()
+    ledger._audit_thread.join(timeout=30)
+    status = ledger.audit_status()
+    assert (status["running"], status["valid"], status["first_invalid"], status["height"]) == (False, False, 8, 7)
+    after = ledger.validate_incremental()
+    assert (after.valid, after.first_invalid) == (False, 8)
+
+    ledger.reset_chain()
+    assert ledger.checkpoint() == (-1, "")
+    _append(ledger, 3)
+    assert ledger.audit_chain().valid and ledger.checkpoint()[0] == 3
+
+
+def test_verified_prefix_skips_known_blocks_of_a_peer_chain(ledger, tmp_path):
+    _append(ledger, 10)
+    ledger.validate_incremental()
+    peer = LedgerManager(db_path=str(tmp_path / "peer.db"))
+    peer.replace_chain(ledger.get_chain())
+    _append(peer, 4)
+    peer_chain = peer.get_chain()
+
+    start = ledger.verified_prefix(peer_chain)
+    assert start == 11
+    assert ledger.validate_chain(peer_chain, start=start)
+    peer_chain[12].data_encrypted = "forged"
+    assert not ledger.validate_chain(peer_chain, start=start)
+    peer_chain[12].data_encrypted = peer.get_chain()[12].data_encrypted
+    peer_chain[3].data_encrypted = "forged"
+    assert ledger.verified_prefix(peer_chain) == 3
+
+    peer_chain = peer.get_chain()
+    ledger.replace_chain(peer_chain, verified=True)
+    assert ledger.checkpoint() == (14, peer_chain[-1].hash)
+    assert ledger.validate_incremental().checked == 0
+    close_pools(peer.ledger_db_path)
+
+
+def test_pooled_verifier_stops_at_the_first_bad_signature(ledger):
+    _append(ledger, 60)
+    chain = ledger.get_chain()[1:]
+    inline = BlockVerifier(workers=1)
+    pooled = BlockVerifier(workers=2, chunk_size=8, min_parallel=1)
+    try:
+        assert inline.first_invalid(chain) is None and pooled.first_invalid(chain) is None
+        chain[41].signature = chain[40].signature
+        chain[50].data_encrypted = "forged"
+        assert inline.first_invalid(chain) == pooled.first_invalid(chain) == 41
+    finally:
+        pooled.close()
+
+
+def test_indexed_access_matches_full_chain(ledger):
+    _append(ledger, 25)
+    chain = ledger.get_chain()
+    assert ledger.chain_length() == 26
+    assert ledger.get_tip() == ledger.get_latest_block() == chain[-1]
+    assert ledger.get_block(7) == chain[7] and ledger.get_block(26) is None
+    assert ledger.get_range(5, 10) == chain[5:15]
+    assert ledger.get_range(20, 100) == chain[20:]
+    assert list(ledger.iter_blocks(24)) == chain[24:]
+    assert ledger.get_range(30, 5) == []
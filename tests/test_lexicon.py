@@ -0,0 +1,75 @@
+import json
+import os
+import random
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.models.lexicon import Lexicon, ReloadingLexicon, _TOKEN_RE
+
+
+def test_whole_word_phrases_groups_and_positions():
+    lexicon = Lexicon(
+        {
+            "urgency": ["hit", "now", "must-see"],
+            "cta": {"act": ["act now", "act fast"], "share": ["share this now"]},
+        }
+    )
+    text = "İİ WHITE house: Act  now, act fast! Share this. Now... share this\tnow, a MUST-SEE hit"
+    scan = lexicon.scan(text)
+
+    assert scan.hits == {"urgency": 3, "cta": 2}
+    assert scan.occurrences == {"urgency": 5, "cta": 3}
+    found = [(m.category, m.term, text[m.start : m.end]) for m in scan.matches]
+    assert found == [
+        ("cta", "act now", "Act  now"),
+        ("urgency", "now", "now"),
+        ("cta", "act fast", "act fast"),
+        ("urgency", "now", "Now"),
+        ("cta", "share this now", "share this\tnow"),
+        ("urgency", "now", "now"),
+        ("urgency", "must-see", "MUST-SEE"),
+        ("urgency", "hit", "hit"),
+    ]
+    # "Share this. Now" is split by punctuation, "WHITE" does not contain the word "hit"
+    assert Lexicon({"cta": ["share this now"]}, max_positions=0).scan("share this. now").hits == {"cta": 0}
+
+
+def test_large_lexicon_matches_token_window_reference():
+    rng = random.Random(16)
+    vocabulary = [f"w{i}" for i in range(400)]
+    terms = {" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(12000)}
+    lexicon = Lexicon({"terms": sorted(terms)}, max_positions=10**6)
+    assert len(lexicon) == len(terms)
+
+    text = " ".join(rng.choice(vocabulary) for _ in range(3000))
+    tokens = _TOKEN_RE.findall(text)
+    expected = sorted(
+        (i, size)
+        for size in (1, 2, 3)
+        for i in range(len(tokens) - size + 1)
+        if " ".join(tokens[i : i + size]) in terms
+    )
+    scan = lexicon.scan(text)
+    starts = {token.start(): i for i, token in enumerate(_TOKEN_RE.finditer(text))}
+    got = sorted((starts[m.start], len(m.term.split())) for m in scan.matches)
+    assert got == expected
+    assert scan.occurrences["terms"] == len(expected)
+
+
+def test_reloads_changed_file_and_keeps_previous_on_error(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"urgency": ["ahora"]}), encoding="utf-8")
+    lexicon = ReloadingLexicon({"urgency": ["now"], "cta": ["sign up"]}, path=str(path), reload_seconds=0)
+    assert lexicon.scan("sign up ahora now").hits == {"urgency": 1, "cta": 1}
+    assert lexicon.scan("now").hits["urgency"] == 0
+
+    path.write_text(json.dumps({"urgency": ["ahora", "urgente"], "cta": {"join": ["únete ya"]}}), encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert lexicon.scan("URGENTE ahora, únete ya").hits == {"urgency": 2, "cta": 1}
+    assert lexicon.stats()["reloads"] == 2
+
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, (2, 2))
+    assert lexicon.scan("urgente").hits["urgency"] == 1
+    assert lexicon.stats()["last_error"]
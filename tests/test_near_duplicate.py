@@ -0,0 +1,76 @@
+import os
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.config import get_settings
+from app.models.near_duplicate import NearDuplicateIndex
+from app.schemas import ContentIntake, SourceMetadata
+from app.services.orchestrator import AnalysisOrchestrator
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+CAMPAIGN = (
+    "Officials confirmed tonight that the polling stations in the northern district will stay "
+    "closed tomorrow, so share this now with everyone you know before the message gets removed"
+)
+
+
+def _edited(text, position, word):
+    words = text.split()
+    words[position] = word
+    return " ".join(words)
+
+
+def test_index_finds_edited_copies_and_survives_reload():
+    index = NearDuplicateIndex(merge_every=4)
+    first = index.add("first", CAMPAIGN)
+    assert first.cluster_id == "first" and first.matches == []
+    for i in range(6):
+        index.add(f"noise-{i}", f"unrelated post {i} about the weather and local football scores today")
+
+    edited = index.add("edited", _edited(CAMPAIGN, 8, "southern"))
+    assert edited.cluster_id == "first"
+    assert edited.matches[0].intake_id == "first"
+    assert edited.matches[0].similarity >= index.threshold
+    assert index.query("completely different text about cooking pasta at home") == []
+
+    reloaded = NearDuplicateIndex(merge_every=4)
+    reloaded.load(
+        [("first", "first", first.signature), ("edited", "first", edited.signature)]
+    )
+    assert [match.intake_id for match in reloaded.query(CAMPAIGN)] == ["first", "edited"]
+    assert reloaded.stats()["clusters"] == 1
+
+
+def test_intake_attaches_cluster_and_reloads_at_startup(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/near_duplicate.db")
+    get_settings.cache_clear()
+
+    def intake(text):
+        return ContentIntake(
+            text=text,
+            source="telegram",
+            metadata=SourceMetadata(platform="telegram-channel", region="IN", actor_id="actor::1"),
+        )
+
+    orchestrator = AnalysisOrchestrator()
+    original = orchestrator._process_sync(intake(CAMPAIGN))
+    copy = orchestrator._process_batch_sync([intake(_edited(CAMPAIGN, 12, "eastern"))])[0]
+    assert original.near_duplicate_cluster == original.intake_id
+    assert copy.near_duplicate_cluster == original.intake_id
+    assert copy.near_duplicates[0].intake_id == original.intake_id
+    assert orchestrator.db.fetch_case(copy.intake_id)["near_duplicate_cluster"] == original.intake_id
+    orchestrator.close()
+
+    restarted = AnalysisOrchestrator()
+    again = restarted._process_sync(intake(_edited(CAMPAIGN, 3, "denied")))
+    assert again.near_duplicate_cluster == original.intake_id
+    assert {m.intake_id for m in restarted.check_near_duplicates(CAMPAIGN)} == {
+        original.intake_id,
+        copy.intake_id,
+        again.intake_id,
+    }
+    restarted.close()
+    close_pools()
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.config import get_settings
+from app.integrations.ollama_client import AsyncOllamaClient
+from app.models.detection import DetectorEngine
+from app.schemas import ContentIntake
+
+get_settings.cache_clear()
+
+
+class StubOllama(ThreadingHTTPServer):
+    """Stands in for Ollama: answers /api/generate after ``delay`` seconds, tracking concurrency."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, reply: str = '{"risk": 0.7, "justification": "urgent"}'):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = delay
+        self.reply = reply
+        self.active = 0
+        self.peak = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._send({"models": [{"name": "llama3.2:3b"}]})
+
+    def do_POST(self):
+        stub = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with stub.lock:
+            stub.requests.append(body)
+            stub.active += 1
+            stub.peak = max(stub.peak, stub.active)
+        time.sleep(stub.delay)
+        with stub.lock:
+            stub.active -= 1
+        self._send({"model": body["model"], "response": stub.reply, "done": True})
+
+    def _send(self, payload):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass  # client gave up (timeout or cancellation)
+
+    def log_message(self, *args):
+        pass
+
+
+def _client(url: str, **kwargs) -> AsyncOllamaClient:
+    client = AsyncOllamaClient(host=url, **kwargs)
+    client.available = True  # the test environment disables Ollama
+    return client
+
+
+def test_concurrency_is_bounded_and_responses_parsed():
+    stub = StubOllama(delay=0.2)
+    client = _client(stub.url, max_concurrency=2, timeout=5)
+
+    async def run():
+        assert await client.probe()
+        risks = await asyncio.gather(*(client.risk_assessment(f"post {i}") for i in range(6)))
+        await client.aclose()
+        return risks
+
+    assert asyncio.run(run()) == [0.7] * 6
+    assert stub.peak == 2
+    assert stub.requests[0]["stream"] is False and "post 0" in stub.requests[0]["prompt"]
+    assert client.stats()["completed"] == 6 and client.stats()["in_flight"] == 0
+    stub.shutdown()
+
+
+def test_deadline_and_cancellation_release_the_slot():
+    stub = StubOllama(delay=1.0)
+    client = _client(stub.url, max_concurrency=1, timeout=5)
+
+    async def run():
+        started = time.perf_counter()
+        assert await client.risk_assessment("slow", timeout=0.2) is None
+        assert time.perf_counter() - started < 0.8
+
+        task = asyncio.ensure_future(client.risk_assessment("cancel me"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("cancellation was swallowed")
+
+        # The single slot is free again
+        stub.delay = 0.0
+        risk = await client.risk_assessment("fast", timeout=2)
+        await client.aclose()
+        return risk
+
+    assert asyncio.run(run()) == 0.7
+    stats = client.stats()
+    assert (stats["timeouts"], stats["cancelled"], stats["completed"], stats["in_flight"]) == (1, 1, 1, 0)
+    stub.shutdown()
+
+
+def test_unreachable_server_backs_off_and_detect_async_uses_client():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+    down = _client(f"http://127.0.0.1:{closed_port}", retry_seconds=60)
+
+    async def unreachable():
+        first = await down.risk_assessment("post")
+        second = await down.risk_assessment("post")
+        await down.aclose()
+        return first, second
+
+    assert asyncio.run(unreachable()) == (None, None)
+    assert (down.stats()["errors"], down.stats()["skipped"]) == (1, 1)
+
+    stub = StubOllama(reply="Risk: 8/10, heavy urgency")
+    engine = DetectorEngine()
+    engine._ollama_async = _client(stub.url)
+    intake = ContentIntake(text="URGENT: share this now before it is banned!", source="test")
+
+    async def detect():
+        result = await engine.detect_async(intake)
+        await engine.aclose()
+        return result
+
+    composite, classification, breakdown = asyncio.run(detect())
+    assert breakdown.ollama_risk == 0.8
+    assert (composite, classification) == engine._compose(
+        intake, engine._features.extract(intake.text), None, None, 0.8
+    )[:2]
+    stub.shutdown()
+
+
+def test_batch_ollama_calls_overlap_and_respect_the_deadline(monkeypatch):
+    stub = StubOllama(delay=0.3)
+    engine = DetectorEngine()
+    engine._cache = None
+    engine._ollama_async = _client(stub.url, max_concurrency=8, timeout=5)
+    intakes = [ContentIntake(text=f"Share batch post {i} before it is deleted!") for i in range(8)]
+    intakes.append(ContentIntake(text=intakes[0].text))  # repeats are asked once
+
+    async def detect(batch):
+        started = time.perf_counter()
+        results = await engine.detect_batch_async(batch)
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(detect(intakes))
+    # Eight calls of 0.3 s take about one call's latency, not 2.4 s
+    assert elapsed < 1.0
+    assert [breakdown.ollama_risk for _, _, breakdown in results] == [0.7] * 9
+    assert len(stub.requests) == 8 and stub.peak == 8
+    assert all(breakdown.timed_out_signals == [] for _, _, breakdown in results)
+
+    stub.delay = 5.0
+    monkeypatch.setattr(engine.settings, "detector_deadline_ms", 300)
+    results, elapsed = asyncio.run(detect(intakes[:4]))
+    assert elapsed < 1.5
+    assert all(breakdown.ollama_risk is None for _, _, breakdown in results)
+    assert all(breakdown.timed_out_signals == ["ollama"] for _, _, breakdown in results)
+    assert engine._ollama_async.stats()["in_flight"] == 0
+    engine.close()
+    stub.shutdown()
+
+
+def test_sync_client_backs_off_after_a_connect_failure(monkeypatch):
+    from app.integrations.ollama_client import OllamaClient
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+    client = OllamaClient(retry_seconds=0.3)
+    client.available = True  # the test environment disables Ollama
+    monkeypatch.setattr(client.settings, "ollama_host", f"http://127.0.0.1:{closed_port}")
+
+    assert client.risk_assessment("post") is None
+    calls = []
+    generate = client._client.generate
+    client._client.generate = lambda **kwargs: calls.append(kwargs) or generate(**kwargs)
+
+    # Short-circuited until the backoff expires, then tried again
+    started = time.perf_counter()
+    assert [client.risk_assessment("post") for _ in range(5)] == [None] * 5
+    assert calls == [] and time.perf_counter() - started < 0.1
+    time.sleep(0.35)
+    assert client.risk_assessment("post") is None
+    assert len(calls) == 1
@@ -0,0 +1,84 @@
+import os
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+from app.config import get_settings
+from app.models.detection import DetectorEngine
+from app.schemas import ContentIntake
+from app.storage.signal_cache import SignalCache
+
+get_settings.cache_clear()
+
+TTLS = {"ai": 60, "family": 60, "ollama": 60}
+TAGS = {"ai": "hf-a", "family": "hf-a", "ollama": "llama"}
+
+
+def test_lru_eviction_ttl_and_model_invalidation():
+    cache = SignalCache(max_entries=2, ttl_seconds={**TTLS, "family": -1}, model_tags=TAGS)
+    key = cache.key_for("Same   TEXT")
+    assert key == cache.key_for("same text")
+
+    cache.put(key, "ai", {"ai_probability": 0.9})
+    cache.put(key, "ollama", 0.4)
+    cache.put("other", "ollama", 0.1)
+    assert cache.get(key, "ai") == (False, None)  # evicted as least recently used
+    assert cache.get(key, "ollama") == (True, 0.4)
+
+    cache.put(key, "family", {"family": "gpt"})
+    assert cache.get(key, "family") == (False, None)  # already expired
+
+    cache.sync_models({**TAGS, "ollama": "mistral"})
+    assert cache.get(key, "ollama") == (False, None)
+
+    stats = cache.stats()
+    assert stats["evictions"] >= 1 and stats["expirations"] == 1 and stats["invalidations"] == 1
+
+
+def test_disk_tier_survives_restart_but_not_model_change(tmp_path):
+    path = str(tmp_path / "signals.db")
+    SignalCache(10, TTLS, TAGS, disk_path=path).put("k", "ollama", 0.7)
+
+    assert SignalCache(10, TTLS, TAGS, disk_path=path).get("k", "ollama") == (True, 0.7)
+    changed = SignalCache(10, TTLS, {**TAGS, "ollama": "other"}, disk_path=path)
+    assert changed.get("k", "ollama") == (False, None)
+
+
+def test_detector_reuses_cached_ollama_risk():
+    class CountingOllama:
+        calls = 0
+
+        def risk_assessment(self, text):
+            CountingOllama.calls += 1
+            return 0.8
+
+    engine = DetectorEngine()
+    engine._ollama_client = CountingOllama()
+    text = "Share this now! The hidden truth about the election is finally revealed."
+    first = engine.detect(ContentIntake(text=text))
+    second = engine.detect(ContentIntake(text=text.upper()))
+
+    assert CountingOllama.calls == 1
+    assert first[2].ollama_risk == second[2].ollama_risk == 0.8
+    assert engine.cache_stats()["by_signal"]["ollama"]["hits"] == 1
+
+
+def test_model_tags_are_checked_at_startup_not_per_lookup(tmp_path, monkeypatch):
+    monkeypatch.setenv("DETECTOR_CACHE_PATH", str(tmp_path / "signals.db"))
+    get_settings.cache_clear()
+    engine = DetectorEngine()
+    calls = []
+    monkeypatch.setattr(engine._cache, "sync_models", lambda tags: calls.append(tags))
+    engine.detect(ContentIntake(text="Plain text that only needs a cache key."))
+    assert calls == []
+    engine._cache.put("k", "ollama", 0.3)
+    engine.close()
+
+    # A restart with the same models keeps the disk tier; a new Ollama model drops its signals
+    for model, expected in (("llama3.2:3b", (True, 0.3)), ("another-model", (False, None))):
+        monkeypatch.setenv("OLLAMA_MODEL", model)
+        get_settings.cache_clear()
+        restarted = DetectorEngine()
+        assert restarted._cache.get("k", "ollama") == expected
+        restarted.close()
+    get_settings.cache_clear()
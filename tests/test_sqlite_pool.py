@@ -0,0 +1,72 @@
+import os
+import threading
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import pytest
+
+from app.config import get_settings
+from app.storage.database import Database
+from app.storage.sqlite_pool import close_pools
+
+get_settings.cache_clear()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/pool.db")
+    get_settings.cache_clear()
+    database = Database()
+    yield database
+    close_pools(database.path)
+
+
+def _save(db, intake_id):
+    db.save_case(intake_id, "text", "low-risk", 0.1, {}, {}, {})
+    db.log_action(intake_id, "analysis_completed", "system", {})
+    db.store_fingerprint(intake_id, "text", "hash")
+
+
+def test_pool_uses_wal_and_reuses_thread_connection(db):
+    with db._cursor() as cur:
+        assert cur.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db._pool.connection() is db._pool.connection()
+    assert Database()._pool is db._pool
+
+
+def test_unit_of_work_commits_or_rolls_back_all_writes(db):
+    with db.unit_of_work():
+        _save(db, "kept")
+    with pytest.raises(RuntimeError):
+        with db.unit_of_work():
+            _save(db, "dropped")
+            raise RuntimeError("boom")
+
+    assert db.fetch_case("kept") is not None
+    assert db.fetch_case("dropped") is None
+    with db._cursor() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0] == 1
+        assert cur.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0] == 1
+
+
+def test_concurrent_writers_do_not_lose_rows(db):
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(20):
+                with db.unit_of_work():
+                    _save(db, f"{n}-{i}")
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with db._cursor() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM cases").fetchone()[0] == 80
@@ -0,0 +1,139 @@
+import os
+import threading
+
+os.environ["HF_MODEL_NAME"] = "disabled"
+os.environ["HF_TOKENIZER_NAME"] = "disabled"
+
+import pytest
+
+from app.config import get_settings
+from app.storage.database import Database
+from app.storage.sqlite_pool import close_pools
+from app.storage.write_behind import WriteBehindQueue, active_queue
+
+get_settings.cache_clear()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/write_behind.db")
+    get_settings.cache_clear()
+    database = Database()
+    yield database
+    close_pools(database.path)
+
+
+def _submit(queue, intake_id, text="same text"):
+    queue.submit(
+        dict(
+            intake_id=intake_id,
+            raw_text=text,
+            classification="low-risk",
+            composite_score=0.1,
+            metadata={"region": "north"},
+            breakdown={},
+            provenance={},
+        ),
+        dict(intake_id=intake_id, action="analysis_completed", actor="system", payload={}),
+        (intake_id, text, f"hash-{intake_id}"),
+    )
+
+
+def _count(db, table):
+    with db._cursor() as cur:
+        return cur.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_pending_reads_are_served_before_the_batch_commits(db):
+    release = threading.Event()
+    save = db.save_analysis_batch
+
+    def blocked_save(*args, **kwargs):
+        release.wait(5)
+        return save(*args, **kwargs)
+
+    db.save_analysis_batch = blocked_save
+    queue = WriteBehindQueue(db, max_batch_rows=4, max_wait_ms=1)
+    try:
+        _submit(queue, "a")
+        _submit(queue, "b")
+        # Any Database on the same file sees the queued case
+        reader = Database()
+        assert _count(reader, "cases") == 0
+        assert reader.fetch_case("a")["metadata"] == {"region": "north"}
+        assert {row["intake_id"] for row in reader.check_fingerprint("Same  TEXT")} == {"a", "b"}
+        release.set()
+        assert queue.flush(5)
+        assert _count(db, "cases") == 2
+        assert _count(db, "audit_log") == 2
+        assert len(reader.check_fingerprint("same text")) == 2
+        assert queue.stats()["depth"] == 0
+    finally:
+        release.set()
+        queue.close()
+
+
+def test_close_drains_and_reports_group_commits(db):
+    queue = WriteBehindQueue(db, max_batch_rows=50, max_wait_ms=5)
+    for index in range(120):
+        _submit(queue, f"case-{index}", text=f"text {index}")
+    queue.close()
+    stats = queue.stats()
+    assert _count(db, "cases") == 120
+    assert _count(db, "fingerprints") == 120
+    assert stats["committed"] == 120
+    assert stats["max_batch"] <= 50
+    assert stats["batches"] < 120
+    assert active_queue(db.path) is None
+    with pytest.raises(RuntimeError):
+        _submit(queue, "late")
+
+
+def test_poison_rows_are_isolated_and_dead_lettered(db):
+    save = db.save_analysis_batch
+
+    def reject_poison(cases, *args, **kwargs):
+        if any(case["intake_id"].startswith("poison") for case in cases):
+            raise ValueError("constraint violated")
+        return save(cases, *args, **kwargs)
+
+    db.save_analysis_batch = reject_poison
+    queue = WriteBehindQueue(db, max_batch_rows=16, max_wait_ms=50, max_retries=2)
+    try:
+        for index in range(12):
+            _submit(queue, "poison-1" if index == 5 else f"case-{index}", text=f"text {index}")
+        assert queue.flush(10)
+        # Later intakes are not stuck behind the poison row
+        _submit(queue, "after")
+        assert queue.flush(10)
+    finally:
+        queue.close()
+    stats = queue.stats()
+    assert _count(db, "cases") == 12
+    assert (stats["dead_lettered"], stats["split_batches"], stats["flush_errors"]) == (1, 1, 3)
+    [letter] = db.fetch_dead_letters()
+    assert letter["intake_id"] == "poison-1" and "constraint violated" in letter["error"]
+    assert letter["payload"]["case"]["raw_text"] == "text 5"
+    assert db.fetch_case("poison-1") is None
+
+
+def test_close_dead_letters_rows_it_cannot_drain(db):
+    release = threading.Event()
+    save = db.save_analysis_batch
+
+    def stuck_save(*args, **kwargs):
+        release.wait(5)
+        return save(*args, **kwargs)
+
+    db.save_analysis_batch = stuck_save
+    queue = WriteBehindQueue(db, max_batch_rows=2, max_wait_ms=1)
+    for index in range(5):
+        _submit(queue, f"case-{index}", text=f"text {index}")
+    try:
+        assert queue.close(timeout=0.2) == 3
+    finally:
+        release.set()
+    queue._thread.join(5)
+    assert queue.stats()["undrained"] == 3
+    assert [letter["intake_id"] for letter in db.fetch_dead_letters()] == ["case-2", "case-3", "case-4"]
+    assert _count(db, "cases") == 2